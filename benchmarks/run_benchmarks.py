@@ -0,0 +1,339 @@
+# run_benchmarks.py
+#
+# Benchmarks for the hot paths of the Glide AI modules, on seeded synthetic workloads.
+#
+#   python benchmarks/run_benchmarks.py                          # print results as JSON
+#   python benchmarks/run_benchmarks.py --save-baseline base.json
+#   python benchmarks/run_benchmarks.py --baseline base.json     # exit 1 on regressions
+#
+# Each benchmark reports throughput (items per second), per-call latency percentiles and the
+# peak memory traced during one call. Fast operations are timed in samples of several calls,
+# and every benchmark runs for several interleaved rounds, so the gate compares the best
+# per-call time of each side rather than a single noisy measurement.
+#
+# Baselines are machine specific, so none is committed. To gate a change, record a baseline
+# from the commit it is based on and compare on the same machine, with nothing else running:
+#
+#   git stash && python benchmarks/run_benchmarks.py --save-baseline /tmp/base.json --output /dev/null
+#   git stash pop && python benchmarks/run_benchmarks.py --baseline /tmp/base.json --output /dev/null
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=20):
+    """
+    Register a benchmark.
+
+    The decorated function receives a seeded numpy Generator, prepares its workload and returns
+    (operation, items): a zero-argument callable timed on each repeat and the number of items
+    it processes per call.
+
+    :param name: Name of the benchmark.
+    :param repeat: Default number of timed calls.
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return decorator
+
+
+@benchmark("scan_numeric")
+def scan_numeric(rng):
+    from glide.scanner import DataScanner
+
+    scanner = DataScanner()
+    data = rng.random(100000).tolist()
+    return lambda: scanner.scan_numeric_data(data), len(data)
+
+
+@benchmark("filter")
+def filter_data(rng):
+    from glide.processor import DataProcessor
+
+    processor = DataProcessor()
+    processor.scan_data(rng.random(100000).tolist())
+    return lambda: processor.filter_data(lambda item: item > 0.5), 100000
+
+
+@benchmark("text_analysis")
+def text_analysis(rng):
+    from glide.processor import DataProcessor
+
+    vocabulary = np.array([f"word{index}" for index in range(1000)])
+    documents = [" ".join(vocabulary[rng.integers(0, 1000, 20)]) for _ in range(5000)]
+    processor = DataProcessor()
+    processor.scan_data(documents)
+    processor.filter_data(lambda item: True)
+    return processor.analyze_textual_data, len(documents)
+
+
+@benchmark("numeric_analysis")
+def numeric_analysis(rng):
+    from glide.processor import DataProcessor
+
+    processor = DataProcessor()
+    processor.scan_data(rng.random(100000).tolist())
+    processor.filter_data(lambda item: True)
+    return processor.analyze_numeric_data, 100000
+
+
+@benchmark("image_edge_detection")
+def image_edge_detection(rng):
+    import cv2
+    from glide.processor import DataProcessor
+
+    image_path = os.path.join(tempfile.mkdtemp(), "frame.png")
+    cv2.imwrite(image_path, rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))
+    processor = DataProcessor()
+    return lambda: processor.process_image_data(image_path), 1
+
+
+@benchmark("decision_inference")
+def decision_inference(rng):
+    from sklearn.tree import DecisionTreeClassifier
+    from glide.decision_maker import DecisionMaker
+
+    training_data = rng.random((1000, 3))
+    decision_maker = DecisionMaker(DecisionTreeClassifier(random_state=0))
+    decision_maker.train_model(training_data, (training_data[:, 0] > 0.5).astype(int))
+    features = rng.random((10000, 3))
+    return lambda: decision_maker.make_decisions(features), len(features)
+
+
+@benchmark("rule_based_decisions")
+def rule_based_decisions(rng):
+    from glide.decision_maker import DecisionMaker
+
+    decision_maker = DecisionMaker()
+    features = rng.random((100000, 3))
+    return lambda: decision_maker.rule_based_decisions(features), len(features)
+
+
+@benchmark("model_update", repeat=5)
+def model_update(rng):
+    from glide.feedback_loop import FeedbackLoop
+
+    feedback_loop = FeedbackLoop()
+    data = np.column_stack((rng.random((100, 3)), rng.integers(0, 2, 100)))
+    processed_data = feedback_loop.data_processor.preprocess(data)
+    feedback_loop.model.fit(*processed_data)  # Updates need an already fitted model
+    return lambda: feedback_loop.train_or_update_model(processed_data), 100
+
+
+@benchmark("game_physics")
+def game_physics(rng):
+    from glide.gaming_engine import GameState, PhysicsEngine
+
+    game_state = GameState(num_enemies=10000, rng=rng)
+    physics_engine = PhysicsEngine()
+    return lambda: physics_engine.update(game_state), 10001
+
+
+@benchmark("game_step")
+def game_step(rng):
+    from glide.gaming_engine import GamingEngine, HeadlessRenderBackend
+
+    engine = GamingEngine(seed=int(rng.integers(2 ** 32)), render_backend=HeadlessRenderBackend(), num_enemies=1000)
+    return engine.step, 1
+
+
+@benchmark("feedback_loop_iteration", repeat=10)
+def feedback_loop_iteration(rng):
+    from glide.feedback_loop import FeedbackLoop
+
+    feedback_loop = FeedbackLoop()
+    feedback_loop.collect_data()
+    feedback_loop.model.fit(*feedback_loop.preprocess_data())
+
+    def iteration():
+        # One pass of FeedbackLoop.run without its sleep
+        feedback_loop.collect_data()
+        processed_data = feedback_loop.preprocess_data()
+        feedback_loop.evaluate_model(processed_data)
+        feedback_loop.collect_feedback()
+        feedback_loop.adjust_model()
+    return iteration, 1
+
+
+def run_benchmark(name, seed, repeat=None, warmup=2, min_sample_seconds=0.005):
+    """
+    Run one benchmark and return its metrics.
+
+    Operations faster than min_sample_seconds are timed over several back-to-back calls per
+    sample, so timer resolution and scheduling noise do not dominate microsecond timings.
+
+    :param name: Registered benchmark name.
+    :param seed: Seed for the workload (and numpy's global generator, used by some modules).
+    :param repeat: Number of timed samples (default the benchmark's own).
+    :param warmup: Untimed calls made first.
+    :param min_sample_seconds: Shortest duration of one timed sample.
+    :return: A dictionary of metrics, or a 'skipped' reason if a dependency is missing.
+    """
+    setup, default_repeat = BENCHMARKS[name]
+    repeat = repeat if repeat else default_repeat
+    np.random.seed(seed)
+    try:
+        operation, items = setup(np.random.default_rng(seed))
+    except ImportError as e:
+        return {"skipped": f"missing dependency: {e.name}"}
+
+    for _ in range(warmup):
+        operation()
+
+    # Calls per sample, doubled until a sample lasts long enough to time reliably
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            operation()
+        if time.perf_counter() - start >= min_sample_seconds:
+            break
+        calls *= 2
+
+    # Garbage collection is paused while timing, as in timeit, so a collection triggered by
+    # earlier allocations is not charged to whichever sample happens to run into it
+    timings = np.empty(repeat)  # Seconds per call
+    gc.collect()
+    gc.disable()
+    try:
+        for index in range(repeat):
+            start = time.perf_counter()
+            for _ in range(calls):
+                operation()
+            timings[index] = (time.perf_counter() - start) / calls
+    finally:
+        gc.enable()
+
+    # Memory is traced in a separate call, as tracing slows the code down
+    tracemalloc.start()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1000
+    return {
+        "items_per_call": items,
+        "repeat": repeat,
+        "calls_per_sample": calls,
+        "throughput_per_second": items / np.median(timings),
+        "latency_ms": {"best": timings.min() * 1000, "mean": timings.mean() * 1000, "p50": p50, "p95": p95,
+                       "p99": p99, "max": timings.max() * 1000},
+        "peak_memory_mb": peak / (1024 * 1024)
+    }
+
+
+def run_benchmarks(names=None, seed=0, repeat=None, rounds=3):
+    """
+    Run benchmarks with the modules' status printing suppressed.
+
+    Every benchmark runs once per round, interleaved with the others, and the round with the
+    best per-call time is kept, so a burst of background load does not hit one benchmark only.
+
+    :param names: Benchmarks to run (default all).
+    :param seed: Workload seed.
+    :param repeat: Override of the number of timed samples per benchmark.
+    :param rounds: Number of rounds.
+    :return: A report with environment information and per-benchmark metrics.
+    """
+    results = {}
+    for _ in range(rounds):
+        for name in names if names else BENCHMARKS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_benchmark(name, seed, repeat)
+            best = results.get(name)
+            if best is None or ("skipped" not in result and result["latency_ms"]["best"] < best["latency_ms"]["best"]):
+                results[name] = result
+    return {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "platform": platform.platform(), "seed": seed, "rounds": rounds},
+        "benchmarks": results
+    }
+
+
+def compare(report, baseline, tolerance, floor_ms=0.05):
+    """
+    Compare a report against a baseline report.
+
+    A benchmark regresses when its throughput falls, or its peak memory grows, by more than
+    the tolerance. Throughput is compared on the best per-call time of each side, which is
+    far less sensitive to background load than the median, and a slowdown also has to exceed
+    floor_ms per call, so jitter on microsecond timings is not reported as a regression.
+    Benchmarks missing from either report are ignored.
+
+    :param report: Report returned by run_benchmarks.
+    :param baseline: A previously saved report.
+    :param tolerance: Allowed relative change (e.g. 0.2 for 20%).
+    :param floor_ms: Smallest per-call slowdown, in milliseconds, counted as a regression.
+    :return: A list of regression descriptions.
+    """
+    regressions = []
+    for name, result in report["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if not reference or "skipped" in result or "skipped" in reference:
+            continue
+        best_ms, reference_ms = result["latency_ms"]["best"], reference["latency_ms"]["best"]
+        ratio = reference_ms / best_ms if best_ms else 1.0
+        if ratio < 1 - tolerance and best_ms - reference_ms > floor_ms:
+            regressions.append(f"{name}: throughput {ratio:.0%} of baseline "
+                               f"({best_ms:.3f} ms vs {reference_ms:.3f} ms per call)")
+        if result["peak_memory_mb"] > reference["peak_memory_mb"] * (1 + tolerance) + 0.1:
+            regressions.append(f"{name}: peak memory {result['peak_memory_mb']:.2f} MB "
+                               f"vs {reference['peak_memory_mb']:.2f} MB baseline")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Glide AI benchmarks.")
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--seed", type=int, default=0, help="Workload seed.")
+    parser.add_argument("--repeat", type=int, help="Timed samples per benchmark.")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per benchmark, keeping the best (default 3).")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--baseline", help="Baseline report to compare against; exits with 1 on regressions.")
+    parser.add_argument("--save-baseline", help="Save this run as a baseline report.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default 0.2).")
+    parser.add_argument("--floor-ms", type=float, default=0.05,
+                        help="Smallest per-call slowdown in ms counted as a regression (default 0.05).")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    report = run_benchmarks(args.names, args.seed, args.repeat, args.rounds)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.floor_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
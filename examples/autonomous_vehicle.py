@@ -1,34 +1,65 @@
 # autonomous_vehicle.py
 
-import numpy as np
+import json
+import math
+import os
+import sys
 import time
+from contextlib import nullcontext
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from glide.gaming_engine import FrameProfiler
+
+
+class LatencyProfiler(FrameProfiler):
+    """
+    Rolling per-stage latencies of the control loop, kept like the game engine's frame timings.
+    """
+    PHASES = ("gather", "camera", "analyze", "decide", "execute", "cycle", "jitter")
+
 
 class AutonomousVehicle:
-    def __init__(self, sensors, decision_engine, controller):
+    def __init__(self, sensors, decision_engine, controller, span_profiler=None):
         """
         Initialize the autonomous vehicle system.
         
         :param sensors: An object that gathers and processes sensor data.
         :param decision_engine: The decision-making engine that processes sensor data and makes driving decisions.
         :param controller: The vehicle's control system for executing decisions (steering, throttle, braking).
+        :param span_profiler: Optional span profiler (e.g. glide.profiler.SpanProfiler) recording a span per stage.
         """
         self.sensors = sensors
         self.decision_engine = decision_engine
         self.controller = controller
         self.state = "IDLE"  # Possible states: IDLE, MOVING, STOPPED, etc.
+        self.profiler = LatencyProfiler()
+        self.cost_estimates = {}  # Smoothed recent cost of each stage, in seconds
+        self.stats = {"cycles": 0, "overruns": 0, "missed_periods": 0, "camera_skips": 0, "torn_reads": 0}
+        self.span_profiler = span_profiler
     
-    def gather_data(self):
+    def _span(self, name):
+        return self.span_profiler.span(name) if self.span_profiler else nullcontext()
+    
+    def gather_data(self, include_camera=True):
         """
         Gather data from the vehicle's sensors, such as cameras, lidar, and radar.
+        
+        :param include_camera: Whether to acquire a camera frame as well as the ranging sensors.
         """
-        self.sensors.collect_data()
+        self.sensors.collect_data(include_camera=include_camera)
     
     def process_data(self):
         """
         Process the sensor data and prepare it for decision-making.
         """
         sensor_data = self.sensors.get_data()
-        return self.decision_engine.analyze_data(sensor_data)
+        processed_data = self.decision_engine.analyze_data(sensor_data)
+        if not self.sensors.validate(sensor_data):
+            # The buffers were rewritten while being analyzed: analyze the latest readings instead
+            self.stats["torn_reads"] += 1
+            processed_data = self.decision_engine.analyze_data(self.sensors.get_data())
+        return processed_data
     
     def make_decision(self, processed_data):
         """
@@ -54,57 +85,365 @@ class AutonomousVehicle:
         elif decision['action'] == 'STOP':
             self.controller.stop()
     
-    def drive(self):
+    def _timed(self, stage, function, *args):
+        start = time.perf_counter()
+        with self._span(stage):
+            result = function(*args)
+        elapsed = time.perf_counter() - start
+        self.profiler.record(stage, elapsed)
+        previous = self.cost_estimates.get(stage, elapsed)
+        self.cost_estimates[stage] = 0.8 * previous + 0.2 * elapsed
+        return result
+
+    def camera_fits_budget(self, deadline):
         """
-        Main loop to autonomously drive the vehicle. This function runs continuously in a real-time loop.
+        Decide whether this cycle can afford camera acquisition and analysis before its deadline.
+        
+        :param deadline: Absolute perf_counter time by which the cycle must finish.
+        :return: True if the estimated cost of the rest of the cycle with the camera fits.
         """
-        while True:
-            self.gather_data()
+        estimated_cost = sum(self.cost_estimates.get(stage, 0.0)
+                             for stage in ("camera", "analyze_camera", "decide", "execute"))
+        return time.perf_counter() + estimated_cost <= deadline
+
+    def run_cycle(self, deadline):
+        """
+        Run one gather -> analyze -> decide -> execute cycle.
+        
+        Lidar, radar and GPS are always read and acted on. The camera is skipped for the cycle
+        when its estimated cost would push the cycle past its deadline.
+        
+        :param deadline: Absolute perf_counter time by which the cycle should finish.
+        :return: True if the camera was used in this cycle.
+        """
+        self._timed("gather", self.gather_data, False)
+        include_camera = self.camera_fits_budget(deadline)
+        if include_camera:
+            self._timed("camera", self.sensors.collect_camera_data)
+        else:
+            self.stats["camera_skips"] += 1
+            # Let the estimate decay so the camera is retried once the overload has passed
+            if "camera" in self.cost_estimates:
+                self.cost_estimates["camera"] *= 0.9
+
+        start = time.perf_counter()
+        with self._span("analyze"):
             processed_data = self.process_data()
-            decision = self.make_decision(processed_data)
-            self.execute_decision(decision)
-            time.sleep(0.1)  # Simulate real-time decision-making delay.
+        elapsed = time.perf_counter() - start
+        self.profiler.record("analyze", elapsed)
+        estimate = "analyze_camera" if include_camera else "analyze"
+        self.cost_estimates[estimate] = 0.8 * self.cost_estimates.get(estimate, elapsed) + 0.2 * elapsed
+
+        decision = self._timed("decide", self.make_decision, processed_data)
+        self._timed("execute", self.execute_decision, decision)
+        return include_camera
+
+    def drive(self, period=0.1, max_cycles=None):
+        """
+        Main loop to autonomously drive the vehicle. This function runs continuously in a real-time loop.
+        
+        Cycles are released on absolute deadlines (start + k * period), so the time spent working
+        does not stretch the period. Start jitter and every stage latency are recorded; a cycle that
+        finishes after its deadline counts as an overrun, and periods it ran into are skipped rather
+        than run back-to-back to catch up.
+        
+        :param period: Control period in seconds.
+        :param max_cycles: Number of cycles to run (None runs forever).
+        :return: The loop statistics.
+        """
+        self.state = "MOVING"
+        next_release = time.perf_counter()
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            now = time.perf_counter()
+            if now < next_release:
+                with self._span("sleep"):
+                    time.sleep(next_release - now)
+                now = time.perf_counter()
+            self.profiler.record("jitter", now - next_release)
+
+            deadline = next_release + period
+            with self._span("cycle"):
+                self.run_cycle(deadline)
+            finished = time.perf_counter()
+            self.profiler.record("cycle", finished - now)
+
+            periods_used = max(1, math.ceil((finished - next_release) / period))
+            if finished > deadline:
+                self.stats["overruns"] += 1
+                self.stats["missed_periods"] += periods_used - 1
+            next_release += periods_used * period
+            cycles += 1
+            self.stats["cycles"] = cycles
+        return self.stats
+
+    def export_latency_histograms(self, path=None, bins=20):
+        """
+        Export per-stage latency histograms and summaries of the control loop.
+        
+        :param path: Optional JSON file to write them to.
+        :param bins: Number of histogram bins.
+        :return: A dictionary with the loop statistics, summaries and histograms.
+        """
+        report = {"stats": self.stats, "summary": self.profiler.summary(), "histograms": self.profiler.histograms(bins)}
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, default=float)
+        return report
 
 # Placeholder classes to represent sensors, decision-making, and vehicle controller.
 
+class SensorBufferPool:
+    def __init__(self, camera_shape=(640, 480), num_beams=360, num_buffers=2):
+        """
+        Preallocated, multi-buffered storage for sensor readings.
+        
+        A producer fills the back buffer in place and then publishes it as the front buffer,
+        so a consumer keeps reading a complete set of readings while the next one is being
+        written. Each buffer has a sequence number that is odd while it is being written
+        (a seqlock): a consumer remembers the number at read time and validates it after
+        use to detect readings that were overwritten underneath it (torn reads).
+        
+        :param camera_shape: Shape of the camera frame (rows, columns).
+        :param num_beams: Number of lidar and radar beams.
+        :param num_buffers: Number of buffers in the pool (2 for double buffering).
+        """
+        self.num_buffers = num_buffers
+        self.cameras = [np.zeros(camera_shape) for _ in range(num_buffers)]
+        self.lidars = [np.zeros(num_beams) for _ in range(num_buffers)]
+        self.radars = [np.zeros(num_beams) for _ in range(num_buffers)]
+        self.has_camera = [False] * num_buffers
+        self.timestamps = [None] * num_buffers
+        self.sequences = [0] * num_buffers
+        self.front = 0
+        # Read-only views handed to consumers, created once
+        self.read_only_views = [tuple(self._read_only(array) for array in arrays)
+                                for arrays in zip(self.cameras, self.lidars, self.radars)]
+    
+    @staticmethod
+    def _read_only(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+    
+    def begin_write(self, buffer=None):
+        """
+        Start writing into a buffer (the back buffer by default) and mark it as in progress.
+        
+        :param buffer: Index of the buffer to write, e.g. the front buffer to add a camera frame.
+        :return: The buffer index and its writable camera, lidar and radar arrays.
+        """
+        if buffer is None:
+            buffer = (self.front + 1) % self.num_buffers
+        self.sequences[buffer] += 1  # Odd: write in progress
+        return buffer, self.cameras[buffer], self.lidars[buffer], self.radars[buffer]
+    
+    def end_write(self, buffer, timestamp, has_camera):
+        """
+        Finish writing a buffer and publish it as the latest readings.
+        
+        :param buffer: Index returned by begin_write.
+        :param timestamp: Time the readings were taken.
+        :param has_camera: Whether the buffer holds a fresh camera frame.
+        """
+        self.timestamps[buffer] = timestamp
+        self.has_camera[buffer] = has_camera
+        self.sequences[buffer] += 1  # Even: stable
+        self.front = buffer
+    
+    def read(self):
+        """
+        Return read-only views of the latest published readings, tagged with their sequence number.
+        
+        :return: A dictionary with the camera (None if not captured), lidar and radar views.
+        """
+        buffer = self.front
+        sequence = self.sequences[buffer]
+        camera, lidar, radar = self.read_only_views[buffer]
+        return {
+            'camera': camera if self.has_camera[buffer] else None,
+            'lidar': lidar,
+            'radar': radar,
+            'timestamp': self.timestamps[buffer],
+            'buffer': buffer,
+            'sequence': sequence
+        }
+    
+    def validate(self, readings):
+        """
+        Check that readings returned by read were not being written or overwritten since.
+        
+        :param readings: A dictionary returned by read.
+        :return: True if the readings are consistent.
+        """
+        sequence = readings['sequence']
+        return sequence % 2 == 0 and self.sequences[readings['buffer']] == sequence
+
 class Sensors:
-    def __init__(self):
-        self.data = None
+    def __init__(self, seed=None, camera_shape=(640, 480), num_beams=360, pool=None):
+        """
+        Simulated vehicle sensors.
+        
+        Readings are written in place into a preallocated SensorBufferPool, so the control
+        loop does not allocate a new camera frame and new range arrays on each cycle.
+        
+        :param seed: Optional seed for the simulated readings.
+        :param camera_shape: Shape of the camera frame (rows, columns).
+        :param num_beams: Number of lidar and radar beams, one per degree by default.
+        :param pool: Optional SensorBufferPool to write into (created if not given).
+        """
+        self.rng = np.random.default_rng(seed)
+        self.pool = pool if pool else SensorBufferPool(camera_shape, num_beams)
+        self.gps = {'lat': 37.7749, 'lon': -122.4194}  # Example GPS coordinates (San Francisco)
     
-    def collect_data(self):
+    def collect_data(self, include_camera=True):
         """
         Simulate collecting data from vehicle sensors such as cameras, lidar, etc.
+        
+        :param include_camera: Whether to also capture a camera frame.
         """
-        self.data = {
-            'camera': np.random.rand(640, 480),  # Example camera data (random)
-            'lidar': np.random.rand(360),        # Example lidar data (random distance values)
-            'radar': np.random.rand(360),        # Example radar data (random distance values)
-            'gps': {'lat': 37.7749, 'lon': -122.4194}  # Example GPS coordinates (San Francisco)
-        }
+        buffer, camera, lidar, radar = self.pool.begin_write()
+        self.rng.random(out=lidar)  # Example lidar data (random distance values)
+        self.rng.random(out=radar)  # Example radar data (random distance values)
+        if include_camera:
+            self.rng.random(out=camera)  # Example camera data (random normalized depth)
+        self.pool.end_write(buffer, time.perf_counter(), include_camera)
+    
+    def collect_camera_data(self):
+        """
+        Simulate capturing a camera frame, the most expensive sensor to acquire,
+        alongside the latest ranging readings.
+        """
+        buffer = self.pool.front
+        timestamp = self.pool.timestamps[buffer]
+        buffer, camera, _, _ = self.pool.begin_write(buffer)
+        self.rng.random(out=camera)
+        self.pool.end_write(buffer, timestamp, True)
     
     def get_data(self):
         """
-        Return the collected sensor data.
+        Return read-only views of the latest sensor data.
+        """
+        sensor_data = self.pool.read()
+        sensor_data['gps'] = self.gps
+        return sensor_data
+    
+    def validate(self, sensor_data):
+        """
+        Check that sensor data returned by get_data was not overwritten while in use.
         """
-        return self.data
+        return self.pool.validate(sensor_data)
 
 class DecisionEngine:
+    def __init__(self, num_sectors=12, num_beams=360, camera_columns=480, camera_fov=90.0,
+                 camera_step=16, camera_depth_scale=1.0, obstacle_distance=2.0, ttc_threshold=2.0):
+        """
+        Fuse lidar, radar and camera readings into per-sector obstacle distances.
+        
+        Beams are indexed by bearing in degrees (0 = straight ahead) and grouped into equal
+        sectors. The camera looks forward over camera_fov degrees and is downsampled by
+        camera_step before its columns are folded into the sectors they face. All work
+        buffers are preallocated, so analysis does not allocate per cycle.
+        
+        :param num_sectors: Number of angular sectors (must divide num_beams).
+        :param num_beams: Number of lidar and radar beams.
+        :param camera_columns: Number of columns in a camera frame.
+        :param camera_fov: Horizontal field of view of the camera in degrees.
+        :param camera_step: Downsampling step applied to camera rows and columns.
+        :param camera_depth_scale: Scale turning normalized camera depth into distance.
+        :param obstacle_distance: Distance below which an obstacle triggers full braking.
+        :param ttc_threshold: Time-to-collision (seconds) below which the vehicle brakes.
+        """
+        if num_beams % num_sectors:
+            raise ValueError("num_sectors must divide num_beams.")
+        self.num_sectors = num_sectors
+        self.camera_step = camera_step
+        self.camera_depth_scale = camera_depth_scale
+        self.obstacle_distance = obstacle_distance
+        self.ttc_threshold = ttc_threshold
+
+        # Sector faced by each downsampled camera column
+        sampled_columns = np.arange(0, camera_columns, camera_step)
+        bearings = (sampled_columns + 0.5) / camera_columns * camera_fov - camera_fov / 2
+        self.camera_sectors = (np.mod(bearings, 360) // (360 / num_sectors)).astype(np.intp)
+
+        self.lidar_minimums = np.empty(num_sectors)
+        self.radar_minimums = np.empty(num_sectors)
+        self.camera_minimums = np.empty(len(sampled_columns))
+        self.ranging_distances = np.empty(num_sectors)
+        self.previous_ranging_distances = np.empty(num_sectors)
+        self.sector_distances = np.empty(num_sectors)
+        self.closing_speeds = np.empty(num_sectors)
+        self.time_to_collision = np.empty(num_sectors)
+        self.previous_timestamp = None
+    
     def analyze_data(self, sensor_data):
         """
         Analyze the sensor data to extract important information (e.g., obstacles, speed, etc.).
         
+        The returned arrays are the engine's work buffers and are overwritten by the next call.
+        
         :param sensor_data: Raw sensor data collected from the sensors.
         :return: Processed data ready for decision-making.
         """
-        # Example processing: Find obstacles or identify important data points
-        obstacles_detected = np.any(sensor_data['lidar'] < 2)  # Check if there's any object < 2 meters
-        gps_location = sensor_data['gps']
-        
+        # Keep last cycle's ranging distances for the time-to-collision estimate
+        self.ranging_distances, self.previous_ranging_distances = \
+            self.previous_ranging_distances, self.ranging_distances
+
+        # Nearest return per sector for each ranging sensor, then fused
+        sensor_data['lidar'].reshape(self.num_sectors, -1).min(axis=1, out=self.lidar_minimums)
+        sensor_data['radar'].reshape(self.num_sectors, -1).min(axis=1, out=self.radar_minimums)
+        np.minimum(self.lidar_minimums, self.radar_minimums, out=self.ranging_distances)
+        self.sector_distances[:] = self.ranging_distances
+
+        camera_analyzed = sensor_data.get('camera') is not None
+        if camera_analyzed:
+            self.analyze_camera(sensor_data['camera'])
+            np.minimum.at(self.sector_distances, self.camera_sectors, self.camera_minimums)
+
+        self.update_time_to_collision(sensor_data.get('timestamp'))
+        nearest_sector = int(self.sector_distances.argmin())
         return {
-            'obstacles_detected': obstacles_detected,
-            'gps_location': gps_location
+            'obstacles_detected': bool(self.sector_distances[nearest_sector] < self.obstacle_distance),
+            'gps_location': sensor_data['gps'],
+            'camera_analyzed': camera_analyzed,
+            'sector_distances': self.sector_distances,
+            'time_to_collision': self.time_to_collision,
+            'nearest_obstacle': float(self.sector_distances[nearest_sector]),
+            'nearest_sector': nearest_sector,
+            'min_time_to_collision': float(self.time_to_collision.min())
         }
     
+    def analyze_camera(self, camera):
+        """
+        Estimate the nearest obstacle seen by each downsampled camera column.
+        
+        :param camera: A 2-D frame of normalized depth values.
+        :return: The per-column nearest distances (a work buffer).
+        """
+        # Strided view: no copy of the full-resolution frame
+        downsampled = camera[::self.camera_step, ::self.camera_step]
+        downsampled.min(axis=0, out=self.camera_minimums)
+        self.camera_minimums *= self.camera_depth_scale
+        return self.camera_minimums
+    
+    def update_time_to_collision(self, timestamp):
+        """
+        Estimate the time to collision per sector from how fast its nearest distance is shrinking.
+        
+        Only the lidar and radar distances are used: the camera is skipped on some cycles, and
+        comparing a cycle with camera depth to one without would look like a sudden approach.
+        
+        :param timestamp: Time the sensor readings were taken (perf_counter seconds).
+        """
+        self.time_to_collision.fill(np.inf)
+        if timestamp is not None and self.previous_timestamp is not None and timestamp > self.previous_timestamp:
+            np.subtract(self.previous_ranging_distances, self.ranging_distances, out=self.closing_speeds)
+            self.closing_speeds /= timestamp - self.previous_timestamp
+            np.divide(self.ranging_distances, self.closing_speeds, out=self.time_to_collision,
+                      where=self.closing_speeds > 0)
+        self.previous_timestamp = timestamp
+    
     def make_decision(self, processed_data):
         """
         Make a driving decision based on processed data.
@@ -114,6 +453,8 @@ class DecisionEngine:
         """
         if processed_data['obstacles_detected']:
             return {'action': 'BRAKE', 'brake_force': 1.0}  # Full brake if obstacle detected
+        elif processed_data['min_time_to_collision'] < self.ttc_threshold:
+            return {'action': 'BRAKE', 'brake_force': 0.5}  # Slow down if something is closing in
         else:
             # Example decision: Keep moving, accelerate slightly
             return {'action': 'THROTTLE', 'speed': 30}  # Accelerate to 30 km/h
@@ -156,4 +497,6 @@ if __name__ == "__main__":
     controller = VehicleController()
     
     vehicle = AutonomousVehicle(sensors, decision_engine, controller)
-    vehicle.drive()
+    stats = vehicle.drive(period=0.1, max_cycles=50)
+    print("Control loop stats:", stats)
+    print("Stage latencies:", vehicle.export_latency_histograms()["summary"])
@@ -2,23 +2,30 @@
 
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
 import time
+from collections import deque
+from contextlib import nullcontext
 
 class BusinessIntelligence:
-    def __init__(self, data_collector, analytics_engine, decision_maker):
+    def __init__(self, data_collector, analytics_engine, decision_maker, span_profiler=None):
         """
         Initialize the business intelligence system.
         
         :param data_collector: Object responsible for collecting market and business data.
         :param analytics_engine: Object responsible for analyzing and processing the collected data.
         :param decision_maker: Object responsible for making real-time business decisions based on analyzed data.
+        :param span_profiler: Optional span profiler (e.g. glide.profiler.SpanProfiler) recording a span per stage.
         """
         self.data_collector = data_collector
         self.analytics_engine = analytics_engine
         self.decision_maker = decision_maker
         self.state = "IDLE"
+        # Batched mode: the analytics engine analyzes many entities (e.g. SKUs) per tick
+        self.batched = getattr(analytics_engine, 'num_entities', None) is not None
+        self.span_profiler = span_profiler
+    
+    def _span(self, name):
+        return self.span_profiler.span(name) if self.span_profiler else nullcontext()
     
     def gather_data(self):
         """
@@ -40,6 +47,8 @@ class BusinessIntelligence:
         :param analysis_results: Results from the data analysis step.
         :return: Decision to be executed (e.g., marketing strategy, pricing change).
         """
+        if self.batched:
+            return self.decision_maker.make_decisions(analysis_results)
         return self.decision_maker.make_decision(analysis_results)
     
     def execute_decision(self, decision):
@@ -55,41 +64,235 @@ class BusinessIntelligence:
         elif decision['action'] == 'EXPAND_OPERATION':
             print(f"Expanding operations to {decision['region']}.")
     
-    def run(self):
+    def execute_decisions(self, decisions):
+        """
+        Execute batched decisions (one per entity), reporting how many entities get each action.
+        
+        :param decisions: A dictionary of arrays returned by the decision maker's make_decisions.
+        """
+        actions, counts = np.unique(decisions['action'], return_counts=True)
+        for action, count in zip(actions, counts):
+            print(f"{action}: {count} product lines.")
+    
+    def run(self, max_ticks=None):
         """
         Main loop to perform business intelligence tasks, from data gathering to decision execution.
+        
+        :param max_ticks: Number of ticks to run (None runs forever).
         """
-        while True:
-            self.gather_data()
-            analysis_results = self.analyze_data()
-            decision = self.make_decision(analysis_results)
-            self.execute_decision(decision)
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            ticks += 1
+            with self._span("tick"):
+                with self._span("gather"):
+                    self.gather_data()
+                with self._span("analyze"):
+                    analysis_results = self.analyze_data()
+                with self._span("decide"):
+                    decision = self.make_decision(analysis_results)
+                with self._span("execute"):
+                    if self.batched:
+                        self.execute_decisions(decision)
+                    else:
+                        self.execute_decision(decision)
             time.sleep(1)  # Simulate real-time loop (this could be adjusted as needed).
 
 # Placeholder classes to represent data collection, analysis, and decision-making.
 
 class DataCollector:
-    def __init__(self):
+    def __init__(self, num_entities=None, store=None):
+        """
+        Simulated source of business data.
+        
+        :param num_entities: Number of product lines (SKUs) to collect data for at once;
+                             None collects a single series.
+        :param store: Optional time-series store (e.g. glide.timeseries_store.TimeSeriesStore with
+                      the collected columns) that every collected single series is appended to.
+        """
+        if store is not None and num_entities is not None:
+            raise ValueError("A time-series store can only record a single series.")
+        self.num_entities = num_entities
+        self.store = store
+        self.last_collected = None
         self.data = None
     
     def collect_data(self):
         """
         Simulate collecting real-time business data (e.g., sales, trends, customer behavior).
         """
-        # Example: Simulating sales and market data collection
+        # Example: Simulating sales and market data collection, with a leading SKU axis in batched mode
+        shape = (100, 1) if self.num_entities is None else (self.num_entities, 100)
         self.data = {
-            'sales_data': np.random.rand(100, 1) * 10000,  # Simulating sales data (100 data points)
-            'market_trends': np.random.rand(100, 1) * 10,   # Simulating market trends (100 data points)
-            'consumer_behavior': np.random.rand(100, 1) * 5 # Simulating consumer behavior data
+            'sales_data': np.random.rand(*shape) * 10000,  # Simulating sales data (100 data points)
+            'market_trends': np.random.rand(*shape) * 10,   # Simulating market trends (100 data points)
+            'consumer_behavior': np.random.rand(*shape) * 5 # Simulating consumer behavior data
         }
+        if self.store is not None:
+            # Spread the tick's data points over the time since the previous tick
+            now = time.time()
+            previous = self.last_collected if self.last_collected is not None else now - 1
+            timestamps = previous + (now - previous) * np.arange(1, shape[0] + 1) / shape[0]
+            self.store.append(timestamps, self.data)
+            self.last_collected = now
     
     def get_data(self):
         """
         Return the collected business data.
         """
         return self.data
+    
+    def get_history(self, start=None, end=None, interval=None):
+        """
+        Return recorded data between two times, optionally downsampled to interval means.
+        
+        :param start: Start time (seconds since the epoch), or None for the beginning.
+        :param end: End time, exclusive, or None for the latest data.
+        :param interval: Rollup interval in seconds (None returns every data point).
+        :return: A dictionary of arrays keyed by column, plus 'timestamp'.
+        """
+        if self.store is None:
+            raise ValueError("No time-series store was given to this collector.")
+        if interval is None:
+            return self.store.query(start, end)
+        return self.store.rollup(interval, start, end)
+
+class SufficientStatistics:
+    def __init__(self, num_features, decay=1.0, window=None, num_entities=None):
+        """
+        Running sufficient statistics for least-squares regression with an intercept.
+        
+        Keeps the weighted cross-products X'X, X'y and y'y of [1, x] rows, so coefficients can be
+        re-solved after every batch without refitting on the whole history. Older batches can be
+        down-weighted exponentially (decay) or dropped after a fixed number of batches (window).
+        With num_entities, one independent regression is kept per entity in stacked arrays.
+        
+        :param num_features: Number of input features (excluding the intercept).
+        :param decay: Factor applied to the statistics before each new batch (1.0 keeps everything).
+        :param window: Number of most recent batches to keep (None keeps every batch).
+        :param num_entities: Number of independent regressions (None for a single one).
+        """
+        if not 0.0 < decay <= 1.0:
+            raise ValueError("decay must be in (0, 1].")
+        if window is not None and decay != 1.0:
+            raise ValueError("Use either decay or window, not both.")
+        dimension = num_features + 1
+        self.entity_shape = () if num_entities is None else (num_entities,)
+        self.decay = decay
+        self.window = window
+        self.xtx = np.zeros(self.entity_shape + (dimension, dimension))
+        self.xty = np.zeros(self.entity_shape + (dimension,))
+        self.yty = np.zeros(self.entity_shape)
+        self.batches = deque()
+    
+    def update(self, features, targets):
+        """
+        Fold one batch into the statistics in O(batch_size * features^2) per entity.
+        
+        :param features: An (n, num_features) array, or (num_entities, n, num_features) when stacked.
+        :param targets: An (n,) array, or (num_entities, n) when stacked.
+        """
+        # Cross-products of the [1, x] design, assembled blockwise to avoid materializing it
+        feature_sums = features.sum(axis=-2)
+        xtx = np.empty(self.xtx.shape)
+        xtx[..., 0, 0] = targets.shape[-1]
+        xtx[..., 0, 1:] = feature_sums
+        xtx[..., 1:, 0] = feature_sums
+        xtx[..., 1:, 1:] = np.einsum('...ni,...nj->...ij', features, features, optimize=True)
+        xty = np.empty(self.xty.shape)
+        xty[..., 0] = targets.sum(axis=-1)
+        xty[..., 1:] = np.einsum('...ni,...n->...i', features, targets, optimize=True)
+        batch = (xtx, xty, np.einsum('...n,...n->...', targets, targets))
+        if self.decay != 1.0:
+            self.xtx *= self.decay
+            self.xty *= self.decay
+            self.yty *= self.decay
+        self.xtx += batch[0]
+        self.xty += batch[1]
+        self.yty += batch[2]
+        if self.window is not None:
+            self.batches.append(batch)
+            if len(self.batches) > self.window:
+                oldest_xtx, oldest_xty, oldest_yty = self.batches.popleft()
+                self.xtx -= oldest_xtx
+                self.xty -= oldest_xty
+                self.yty -= oldest_yty
+    
+    def recenter(self, offsets):
+        """
+        Shift the origin of the features, as if offsets had been subtracted from every past row.
+        
+        Keeping the features centered near their mean keeps the cross-products small, so the
+        normal equations stay well conditioned however large the raw feature values grow.
+        Coefficients are unchanged; only the intercept moves to the new origin.
+        
+        :param offsets: A (num_features,) array, or (num_entities, num_features) when stacked.
+        """
+        # [1, x - offsets] = transform @ [1, x]
+        transform = np.broadcast_to(np.eye(self.xty.shape[-1]), self.xtx.shape).copy()
+        transform[..., 1:, 0] = -np.asarray(offsets, dtype=float)
+        transposed = np.swapaxes(transform, -1, -2)
+        self.xtx = transform @ self.xtx @ transposed
+        self.xty = np.einsum('...ij,...j->...i', transform, self.xty)
+        self.batches = deque((transform @ xtx @ transposed, np.einsum('...ij,...j->...i', transform, xty), yty)
+                             for xtx, xty, yty in self.batches)
+    
+    @property
+    def weight(self):
+        """
+        Effective number of observations held in the statistics (per entity).
+        """
+        return self.xtx[..., 0, 0]
+    
+    def solve(self, ridge=1e-9):
+        """
+        Solve the normal equations for the intercept and coefficients of every entity at once.
+        
+        :param ridge: Small regularization keeping the system solvable with little data.
+        :return: An array holding the intercept followed by the feature coefficients (per entity).
+        """
+        identity = np.eye(self.xty.shape[-1])
+        return np.linalg.solve(self.xtx + ridge * identity, self.xty[..., None])[..., 0]
+    
+    def r_squared(self, beta):
+        """
+        Coefficient of determination of the given solution over the (weighted) history.
+        """
+        residual = (self.yty - 2 * np.einsum('...i,...i->...', beta, self.xty)
+                    + np.einsum('...i,...ij,...j->...', beta, self.xtx, beta))
+        weight = self.weight
+        total = self.yty - np.divide(self.xty[..., 0] ** 2, weight, out=np.zeros_like(weight), where=weight > 0)
+        return np.where(total > 0, 1.0 - residual / np.where(total > 0, total, 1.0), 0.0)
 
 class AnalyticsEngine:
+    def __init__(self, feature_keys=('market_trends',), target_key='sales_data', decay=0.95, window=None,
+                 num_entities=None):
+        """
+        Online analytics over a stream of business data batches.
+        
+        Instead of refitting a scaler and a regression from scratch every tick, the engine keeps
+        sufficient statistics across ticks: one set regressing sales on the features, and one
+        regressing each batch's mean sales on the tick number to detect the sales trend.
+        
+        In batched mode (num_entities set) every array in the collected data has a leading
+        entity axis, e.g. one row per SKU, and all per-entity regressions are updated and
+        solved together; results then hold one value (or row) per entity.
+        
+        :param feature_keys: Keys of the collected data used as regression features.
+        :param target_key: Key of the collected data being predicted.
+        :param decay: Exponential forgetting factor per tick (1.0 for none).
+        :param window: Alternatively, number of recent ticks to keep (replaces decay when given).
+        :param num_entities: Number of series analyzed together (None for a single series).
+        """
+        if window is not None:
+            decay = 1.0
+        self.feature_keys = feature_keys
+        self.target_key = target_key
+        self.num_entities = num_entities
+        self.regression = SufficientStatistics(len(feature_keys), decay, window, num_entities)
+        self.trend = SufficientStatistics(1, decay, window, num_entities)
+        self.tick = 0
+        self.trend_origin = 0.0  # Tick the trend regressor is centered on
+    
     def analyze(self, data):
         """
         Analyze the collected business data and identify key insights.
@@ -97,27 +300,35 @@ class AnalyticsEngine:
         :param data: The data collected from various business systems.
         :return: Processed analysis results that help inform decision-making.
         """
-        # Example: Use a simple linear regression model to analyze trends in sales data
-        sales_data = data['sales_data']
-        market_trends = data['market_trends']
-        
-        # Preprocessing
-        scaler = StandardScaler()
-        sales_data_scaled = scaler.fit_transform(sales_data)
-        market_trends_scaled = scaler.fit_transform(market_trends)
+        entity_shape = self.regression.entity_shape
+        features = np.stack([np.reshape(data[key], entity_shape + (-1,)) for key in self.feature_keys], axis=-1)
+        sales = np.reshape(data[self.target_key], entity_shape + (-1,))
         
-        # Linear regression to predict future sales based on market trends
-        model = LinearRegression()
-        model.fit(market_trends_scaled, sales_data_scaled)
-        predicted_sales = model.predict(market_trends_scaled)
+        # Update the regression of sales on market data and re-solve it
+        self.regression.update(features, sales)
+        beta = self.regression.solve()
+        predicted_sales = beta[..., :1] + np.einsum('...nd,...d->...n', features, beta[..., 1:])
         
-        # Calculate the trend
-        trend = np.mean(predicted_sales - sales_data_scaled)
+        # Trend: slope of mean sales over ticks, relative to the current mean sales level. The
+        # ticks are regressed relative to their running mean: raw tick numbers grow without
+        # bound and would make the normal equations ill-conditioned in long-running sessions.
+        self.trend.update(np.full(entity_shape + (1, 1), self.tick - self.trend_origin),
+                          sales.mean(axis=-1, keepdims=True))
+        self.tick += 1
+        mean_tick = self.trend.xtx[..., 0, 1:] / self.trend.weight[..., None]
+        self.trend.recenter(mean_tick)
+        self.trend_origin += mean_tick.flat[0]  # Every entity shares the same ticks
+        trend_beta = self.trend.solve() if self.tick > 1 else np.zeros(entity_shape + (2,))
+        level = self.trend.xty[..., 0] / self.trend.weight
+        sales_trend = np.divide(trend_beta[..., 1], level, out=np.zeros_like(level), where=level != 0)
         
         return {
-            'sales_trend': trend,
+            'sales_trend': sales_trend[()],
+            'intercept': beta[..., 0],
+            'coefficients': beta[..., 1:],
+            'r_squared': self.regression.r_squared(beta)[()],
             'predicted_sales': predicted_sales,
-            'actual_sales': sales_data_scaled
+            'actual_sales': sales
         }
 
 class DecisionMaker:
@@ -142,6 +353,20 @@ class DecisionMaker:
             }
         
         return decision
+    
+    def make_decisions(self, analysis_results):
+        """
+        Vectorized version of make_decision for batched analysis results (one entry per entity).
+        
+        :param analysis_results: Batched results from the analytics engine.
+        :return: A dictionary of arrays with one decision per entity.
+        """
+        growing = np.asarray(analysis_results['sales_trend']) > 0
+        return {
+            'action': np.where(growing, 'MARKETING_CAMPAIGN', 'PRICE_ADJUSTMENT'),
+            'campaign_name': np.where(growing, 'Spring Sale', ''),
+            'percentage_change': np.where(growing, 0, 10)  # Reduce prices by 10% where sales decline
+        }
 
 # Example of using the BusinessIntelligence class.
 if __name__ == "__main__":
@@ -1,7 +1,14 @@
 # game_simulation.py
 
+import os
 import random
+import sys
 import time
+from functools import partial
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from glide.gaming_engine import SimulationFarm
 
 class GameSimulation:
     def __init__(self, game_environment, ai_player, decision_maker):
@@ -166,6 +173,90 @@ class DecisionMaker:
             }
         return decision
 
+# Actions of the batched simulation, as integer codes
+LEFT, RIGHT, ATTACK, DEFEND = range(4)
+
+def rule_based_policy(enemy_position, position, health):
+    """
+    Vectorized DecisionMaker.make_decision: attack an enemy on the same position,
+    otherwise move towards it.
+
+    :param enemy_position: Enemy position of every world.
+    :param position: AI player position of every world.
+    :param health: AI player health of every world.
+    :return: An array of action codes (LEFT, RIGHT, ATTACK or DEFEND), one per world.
+    """
+    return np.select([enemy_position == position, enemy_position > position], [ATTACK, RIGHT], default=LEFT)
+
+class BatchGameSimulation:
+    def __init__(self, num_worlds, seed=None, policy=rule_based_policy):
+        """
+        Run many independent GameSimulation worlds in lockstep with numpy arrays.
+
+        Each world follows the rules of GameEnvironment and AIPlayer, with a policy
+        choosing the action of every world in one call. A world ends when the AI
+        player's health reaches zero.
+
+        :param num_worlds: Number of worlds to simulate.
+        :param seed: Seed, or numpy Generator, for the worlds' random generator.
+        :param policy: Callable(enemy_position, position, health) returning an array of action
+                       codes (default rule_based_policy, the rules of DecisionMaker). Must be
+                       picklable to run in a simulation farm with several workers.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.policy = policy
+        self.enemy_position = self.rng.integers(0, 11, size=num_worlds)
+        self.position = np.full(num_worlds, 5)
+        self.health = np.full(num_worlds, 100)
+        self.scores = np.zeros(num_worlds, dtype=np.int64)  # Attacks made
+        self.frames_survived = np.zeros(num_worlds, dtype=np.int64)
+        self.alive = np.ones(num_worlds, dtype=bool)
+
+    def step(self):
+        """
+        Make and execute one decision in every live world, then update the environments.
+        """
+        actions = np.where(self.alive, self.policy(self.enemy_position, self.position, self.health), -1)
+        attack = actions == ATTACK
+        self.position += (actions == RIGHT).astype(int) - (actions == LEFT)
+        self.health += 5 * (actions == DEFEND) - 10 * attack  # AIPlayer.defend and AIPlayer.attack
+        self.scores += attack
+        self.frames_survived += self.alive
+        self.alive &= self.health > 0
+        self.enemy_position = self.rng.integers(0, 11, size=len(self.enemy_position))
+
+    def run(self, max_frames=1000):
+        """
+        Step until every world has ended or max_frames have elapsed.
+
+        :return: A dictionary of per-world result arrays.
+        """
+        for _ in range(max_frames):
+            if not self.alive.any():
+                break
+            self.step()
+        return {
+            'scores': self.scores,
+            'frames_survived': self.frames_survived,
+            'health': self.health
+        }
+
+def run_simulation_farm(num_worlds, max_frames=1000, workers=1, seed=None, policy=rule_based_policy):
+    """
+    Evaluate a policy on many seeded worlds with glide's SimulationFarm, sharded across a
+    process pool when workers > 1.
+
+    :param num_worlds: Total number of worlds to simulate.
+    :param max_frames: Maximum number of frames per world.
+    :param workers: Number of worker processes.
+    :param seed: Seed for the worlds; each shard receives an independent child seed.
+    :param policy: Policy to evaluate (see BatchGameSimulation).
+    :return: Summary statistics (count, mean, std, min, max) of scores, survival frames and health.
+    """
+    farm = SimulationFarm(num_worlds, seed=seed, workers=workers,
+                          batch_factory=partial(BatchGameSimulation, policy=policy))
+    return farm.run(max_frames)
+
 # Example of using the GameSimulation class.
 if __name__ == "__main__":
     game_environment = GameEnvironment()
@@ -1,24 +1,31 @@
 # medical_analysis.py
 
+import os
+import pickle
 import numpy as np
 import pandas as pd
+from collections import deque
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
 import time
 
 class MedicalAnalysis:
-    def __init__(self, data_collector, model_trainer, diagnosis_maker):
+    def __init__(self, data_collector, model_trainer, diagnosis_maker, diagnosis_service=None):
         """
         Initialize the medical analysis system.
         
         :param data_collector: Object responsible for collecting medical data (e.g., patient records, medical tests).
         :param model_trainer: Object responsible for training a machine learning model on the data.
         :param diagnosis_maker: Object responsible for generating a diagnosis based on model predictions.
+        :param diagnosis_service: Optional DiagnosisService serving the model (created from the trainer if not given).
         """
         self.data_collector = data_collector
         self.model_trainer = model_trainer
         self.diagnosis_maker = diagnosis_maker
+        self.diagnosis_service = diagnosis_service if diagnosis_service else DiagnosisService(model_trainer)
     
     def gather_data(self):
         """
@@ -49,16 +56,29 @@ class MedicalAnalysis:
         """
         return self.diagnosis_maker.make_diagnosis(model, processed_data)
     
-    def run(self):
+    def run(self, max_iterations=None):
         """
         Main loop for medical analysis, from data gathering to diagnosis generation.
+        
+        The model is loaded or trained once; after that each iteration only diagnoses the new
+        batch of patient records, and the service retrains on its schedule or when the incoming
+        data drifts away from the training data.
+        
+        :param max_iterations: Number of iterations to run (None runs forever).
         """
-        while True:
+        iterations = 0
+        while max_iterations is None or iterations < max_iterations:
+            iterations += 1
             self.gather_data()
-            processed_data = self.preprocess_data()
-            model = self.train_model(processed_data)
-            diagnosis = self.make_diagnosis(model, processed_data)
-            print(f"Diagnosis: {diagnosis}")
+            data = self.data_collector.get_data()
+            if self.diagnosis_service.model is None:
+                self.diagnosis_service.load_or_train(data)
+            else:
+                self.diagnosis_service.maybe_retrain(data)
+            
+            probabilities = self.diagnosis_service.predict_proba(data.drop(columns='disease'))
+            diagnoses = self.diagnosis_maker.make_diagnoses(probabilities)
+            print(f"Diagnosed {len(diagnoses)} patients: {np.count_nonzero(diagnoses == 'Diseased')} diseased.")
             time.sleep(1)  # Simulate real-time loop.
 
 # Placeholder classes for data collection, model training, and diagnosis generation.
@@ -115,24 +135,258 @@ class ModelTrainer:
         model = RandomForestClassifier(n_estimators=100)
         model.fit(features, labels)
         return model
+    
+    def train_serving_model(self, features, labels, calibration='sigmoid'):
+        """
+        Train a model that includes its own scaling, so it can diagnose raw patient records later.
+        
+        Random forest vote fractions are poorly calibrated, so by default the forest is wrapped in
+        cross-validated probability calibration and its probabilities can be read as risk scores.
+        
+        :param features: Raw patient features.
+        :param labels: Disease labels.
+        :param calibration: 'sigmoid', 'isotonic' (needs more data), or None for raw forest probabilities.
+        :return: A fitted scikit-learn model.
+        """
+        model = make_pipeline(StandardScaler(), RandomForestClassifier(n_estimators=100, n_jobs=-1))
+        if calibration:
+            model = CalibratedClassifierCV(model, method=calibration, cv=3)
+        model.fit(features, labels)
+        return model
+
+class DiagnosisService:
+    def __init__(self, model_trainer, model_path=None, retrain_interval=3600.0, drift_threshold=0.5,
+                 latency_window=1000, calibration='sigmoid'):
+        """
+        Serve diagnoses from a model that is trained once and reused across requests.
+        
+        The model is retrained only when it is older than retrain_interval or when the feature
+        means of new data drift from the training data by more than drift_threshold standard
+        deviations. Latency of every prediction batch is recorded per diagnosis.
+        
+        :param model_trainer: Trainer whose train_serving_model builds and fits the model.
+        :param model_path: Optional pickle file the model is loaded from and saved to.
+        :param retrain_interval: Maximum model age in seconds before retraining.
+        :param drift_threshold: Largest tolerated shift of a feature mean, in training standard deviations.
+        :param latency_window: Number of recent batches kept for latency statistics.
+        :param calibration: Probability calibration passed to the trainer ('sigmoid', 'isotonic' or None).
+        """
+        self.model_trainer = model_trainer
+        self.calibration = calibration
+        self.model_path = model_path
+        self.retrain_interval = retrain_interval
+        self.drift_threshold = drift_threshold
+        self.model = None
+        self.reference_mean = None
+        self.reference_std = None
+        self.trained_at = None
+        self.train_count = 0
+        self.latencies = deque(maxlen=latency_window)  # (seconds per diagnosis, batch size)
+    
+    def train(self, data):
+        """
+        Train the model on labelled data and remember the training feature distribution.
+        
+        :param data: Labelled patient records with a 'disease' column.
+        """
+        features = data.drop(columns='disease').to_numpy(dtype=float)
+        self.model = self.model_trainer.train_serving_model(features, data['disease'].to_numpy(), self.calibration)
+        self.reference_mean = features.mean(axis=0)
+        self.reference_std = features.std(axis=0)
+        self.trained_at = time.time()
+        self.train_count += 1
+        if self.model_path:
+            self.save(self.model_path)
+    
+    def load_or_train(self, data):
+        """
+        Load the saved model if there is one, otherwise train on the given data.
+        
+        :param data: Labelled patient records used when no saved model exists.
+        """
+        if self.model_path and os.path.exists(self.model_path):
+            self.load(self.model_path)
+        else:
+            self.train(data)
+    
+    def drift_score(self, features):
+        """
+        Return the largest shift of a feature mean from training, in training standard deviations.
+        
+        :param features: Patient records without labels.
+        """
+        features = np.asarray(features, dtype=float)
+        shift = np.abs(features.mean(axis=0) - self.reference_mean)
+        return float(np.max(shift / np.where(self.reference_std > 0, self.reference_std, 1.0)))
+    
+    def maybe_retrain(self, data):
+        """
+        Retrain the model if it is due on schedule or the data has drifted.
+        
+        :param data: Latest labelled patient records.
+        :return: The reason for retraining ('schedule' or 'drift'), or None.
+        """
+        reason = None
+        if time.time() - self.trained_at >= self.retrain_interval:
+            reason = 'schedule'
+        elif self.drift_score(data.drop(columns='disease')) > self.drift_threshold:
+            reason = 'drift'
+        if reason:
+            print(f"Retraining diagnosis model ({reason})...")
+            self.train(data)
+        return reason
+    
+    def predict_proba(self, features):
+        """
+        Return the probability of disease for a batch of patient records in one model call.
+        
+        :param features: Patient records without labels (DataFrame or 2-D array).
+        :return: An array with one probability per patient.
+        """
+        if self.model is None:
+            raise ValueError("The diagnosis model has not been trained or loaded.")
+        features = np.asarray(features, dtype=float)
+        start = time.perf_counter()
+        probabilities = self.model.predict_proba(features)[:, 1]
+        elapsed = time.perf_counter() - start
+        self.latencies.append((elapsed / len(features), len(features)))
+        return probabilities
+    
+    def latency_stats(self):
+        """
+        Summarize recent prediction latency.
+        
+        :return: A dictionary of per-diagnosis latency statistics in milliseconds.
+        """
+        if not self.latencies:
+            return {"batches": 0}
+        per_diagnosis = np.array([latency for latency, _ in self.latencies]) * 1000
+        p50, p95, p99 = np.percentile(per_diagnosis, [50, 95, 99])
+        return {
+            "batches": len(self.latencies),
+            "diagnoses": sum(size for _, size in self.latencies),
+            "mean_ms": per_diagnosis.mean(),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99
+        }
+    
+    def save(self, path):
+        """
+        Save the model and its training statistics with pickle.
+        """
+        with open(path, 'wb') as f:
+            pickle.dump({
+                'model': self.model,
+                'reference_mean': self.reference_mean,
+                'reference_std': self.reference_std,
+                'trained_at': self.trained_at
+            }, f)
+    
+    def load(self, path):
+        """
+        Load a model saved with save (only load files from trusted sources: this unpickles).
+        """
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        self.model = state['model']
+        self.reference_mean = state['reference_mean']
+        self.reference_std = state['reference_std']
+        self.trained_at = state['trained_at']
 
 class DiagnosisMaker:
+    def __init__(self, threshold=0.5):
+        """
+        Turn model risk scores into diagnoses.
+        
+        :param threshold: Risk score at or above which a patient is diagnosed as diseased.
+        """
+        self.threshold = threshold
+    
     def make_diagnosis(self, model, processed_data):
         """
-        Generate a diagnosis based on the trained model and processed data.
+        Diagnose the most recent patient in processed data (the single-patient path).
         
-        :param model: The trained machine learning model.
-        :param processed_data: Preprocessed data for making predictions.
-        :return: A diagnosis result based on the model's prediction.
+        Only the last record is sent to the model, through diagnose_batch, so the diagnosis uses
+        the same risk score and threshold as batch diagnoses. Use diagnose_batch for many patients.
+        
+        :param model: The trained machine learning model (with predict_proba).
+        :param processed_data: Preprocessed (features, labels) for making predictions.
+        :return: The diagnosis of the last patient ('Diseased' or 'Healthy').
         """
         features, labels = processed_data
+        return str(self.diagnose_batch(model, np.asarray(features)[-1:])['diagnosis'][0])
+    
+    def make_diagnoses(self, probabilities, threshold=None):
+        """
+        Turn a batch of disease probabilities into diagnoses in one vectorized pass.
+        
+        :param probabilities: Array of disease probabilities, one per patient.
+        :param threshold: Probability at or above which a patient is diagnosed as diseased (default self.threshold).
+        :return: An array of diagnoses ('Diseased' or 'Healthy').
+        """
+        threshold = self.threshold if threshold is None else threshold
+        return np.where(np.asarray(probabilities) >= threshold, 'Diseased', 'Healthy')
+    
+    def diagnose_batch(self, model, features, threshold=None):
+        """
+        Diagnose every patient in a batch with a single model call.
+        
+        :param model: A trained model with predict_proba (calibrated for meaningful risk scores).
+        :param features: Patient records without labels.
+        :param threshold: Risk score cutoff (default self.threshold).
+        :return: A dictionary with the per-patient 'risk_score' and 'diagnosis' arrays.
+        """
+        risk_scores = model.predict_proba(np.asarray(features, dtype=float))[:, 1]
+        return {'risk_score': risk_scores, 'diagnosis': self.make_diagnoses(risk_scores, threshold)}
+    
+    def threshold_sweep(self, risk_scores, labels, thresholds=None):
+        """
+        Compute precision and recall at many thresholds in one pass over sorted scores.
         
-        # Predict the condition for the new patients
-        predictions = model.predict(features)
+        Scores are sorted once; for each threshold a binary search gives how many patients score
+        at or above it, and a cumulative count of diseased patients gives how many of those are true
+        positives. The cost is O(n log n + t log n) with no model calls.
         
-        # Assuming we're predicting a disease condition, 0 = healthy, 1 = diseased
-        diagnosis = 'Diseased' if predictions[-1] == 1 else 'Healthy'
-        return diagnosis
+        :param risk_scores: Risk scores of labelled patients.
+        :param labels: True labels (1 for diseased).
+        :param thresholds: Thresholds to evaluate (default 1001 evenly spaced in [0, 1]).
+        :return: A dictionary of arrays: thresholds, precision, recall, f1 and flagged (patients at or above).
+        """
+        thresholds = np.linspace(0, 1, 1001) if thresholds is None else np.asarray(thresholds, dtype=float)
+        order = np.argsort(risk_scores, kind='stable')
+        sorted_scores = np.asarray(risk_scores)[order]
+        positives_below = np.concatenate(([0], np.cumsum(np.asarray(labels)[order] == 1)))
+        total_positives = positives_below[-1]
+
+        first_flagged = np.searchsorted(sorted_scores, thresholds, side='left')
+        flagged = len(sorted_scores) - first_flagged
+        true_positives = total_positives - positives_below[first_flagged]
+
+        precision = np.divide(true_positives, flagged, out=np.ones(len(thresholds)), where=flagged > 0)
+        recall = np.divide(true_positives, total_positives, out=np.zeros(len(thresholds)), where=total_positives > 0)
+        denominator = precision + recall
+        f1 = np.divide(2 * precision * recall, denominator, out=np.zeros(len(thresholds)), where=denominator > 0)
+        return {'thresholds': thresholds, 'precision': precision, 'recall': recall, 'f1': f1, 'flagged': flagged}
+    
+    def tune_threshold(self, risk_scores, labels, min_recall=0.95, thresholds=None):
+        """
+        Pick the triage cutoff with the best precision among those catching at least min_recall of cases.
+        
+        :param risk_scores: Risk scores of labelled patients.
+        :param labels: True labels (1 for diseased).
+        :param min_recall: Minimum fraction of diseased patients that must be flagged.
+        :param thresholds: Candidate thresholds (default 1001 evenly spaced in [0, 1]).
+        :return: The chosen threshold, which also becomes the default for later diagnoses.
+        """
+        sweep = self.threshold_sweep(risk_scores, labels, thresholds)
+        eligible = np.flatnonzero(sweep['recall'] >= min_recall)
+        if len(eligible) == 0:
+            raise ValueError(f"No threshold reaches a recall of {min_recall}.")
+        # Highest precision; ties go to the highest threshold (fewest patients flagged)
+        best = eligible[np.lexsort((sweep['thresholds'][eligible], sweep['precision'][eligible]))[-1]]
+        self.threshold = float(sweep['thresholds'][best])
+        return self.threshold
 
 # Example of using the MedicalAnalysis class.
 if __name__ == "__main__":
@@ -141,4 +395,12 @@ if __name__ == "__main__":
     diagnosis_maker = DiagnosisMaker()
     
     medical_analysis = MedicalAnalysis(data_collector, model_trainer, diagnosis_maker)
-    medical_analysis.run()
+    medical_analysis.run(max_iterations=5)
+    print("Diagnosis latency:", medical_analysis.diagnosis_service.latency_stats())
+    
+    # Tune the triage cutoff on a labelled batch without further model calls
+    data_collector.collect_data()
+    validation = data_collector.get_data()
+    risk_scores = medical_analysis.diagnosis_service.predict_proba(validation.drop(columns='disease'))
+    threshold = diagnosis_maker.tune_threshold(risk_scores, validation['disease'].to_numpy(), min_recall=0.9)
+    print(f"Triage threshold for 90% recall: {threshold:.3f}")
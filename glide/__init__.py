@@ -1,22 +1,44 @@
 # __init__.py
 
-# Importing important modules from the Glide AI package
-from .game_simulation import GameSimulation
-from .business_intelligence import BusinessIntelligence
-from .medical_analysis import MedicalAnalysis
-from .autonomous_vehicle import AutonomousVehicle
-from .glide_system import GlideSystem
-from .research_tools import ResearchTools
+import importlib
+
+# Important classes of the Glide AI package and the submodules they live in.
+# Submodules are only imported when one of their classes is first accessed (PEP 562),
+# so `import glide` stays fast and does not pull in numpy, scikit-learn, pandas or OpenCV.
+# For the same reason the submodules import scikit-learn, pandas and OpenCV inside the
+# functions that first need them rather than at module level.
+_LAZY_ATTRIBUTES = {
+    'DataScanner': '.scanner',
+    'DataProcessor': '.processor',
+    'DecisionMaker': '.decision_maker',
+    'AdaptiveLearningSystem': '.adaptive_learning',
+    'FeedbackLoop': '.feedback_loop',
+    'GamingEngine': '.gaming_engine',
+    'OutOfCoreTrainer': '.out_of_core',
+    'GlideSystem': '.glide_system',
+    'SharedFrameRing': '.shared_frames',
+    'TimeSeriesStore': '.timeseries_store',
+    'SpanProfiler': '.profiler',
+    'WorkloadGenerator': '.workload',
+    'ShardedFeedbackService': '.feedback_service'
+}
 
 # Expose important classes and functions to the package level
-__all__ = [
-    'GameSimulation', 
-    'BusinessIntelligence', 
-    'MedicalAnalysis', 
-    'AutonomousVehicle', 
-    'GlideSystem',
-    'ResearchTools'
-]
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    """
+    Import the submodule defining a package-level class on first access.
+    """
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups no longer go through __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 # Optional: You can also add some initial setup or configuration here
 def initialize_glide():
@@ -1,25 +1,31 @@
 # adaptive_learning.py
 
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score
 import time
 
+try:
+    from . import feedback_loop
+    from .profiler import span
+except ImportError:  # Imported as a top-level module
+    import feedback_loop
+    from profiler import span
+
 class AdaptiveLearningSystem:
-    def __init__(self, model=None):
+    def __init__(self, model=None, span_profiler=None):
         """
         Initialize the adaptive learning system with an optional pre-trained model.
         
         :param model: A pre-trained machine learning model (default is None).
+        :param span_profiler: Optional glide.profiler.SpanProfiler recording a span per loop stage.
         """
+        from sklearn.ensemble import RandomForestClassifier
+
         self.model = model if model else RandomForestClassifier(n_estimators=100)
         self.data_collector = DataCollector()
         self.model_trainer = ModelTrainer()
         self.data_processor = DataProcessor()
         self.model_updater = ModelUpdater(self.model)
+        self.span_profiler = span_profiler
 
     def collect_data(self):
         """
@@ -55,22 +61,33 @@ class AdaptiveLearningSystem:
         :param processed_data: Preprocessed data for model evaluation.
         :return: Accuracy score of the model on the processed data.
         """
+        from sklearn.metrics import accuracy_score
+
         features, labels = processed_data
         predictions = self.model.predict(features)
         accuracy = accuracy_score(labels, predictions)
         return accuracy
 
-    def run(self):
+    def run(self, max_iterations=None):
         """
         Main loop for adaptive learning.
         Continuously collects data, preprocesses it, trains or updates the model, 
         and evaluates its performance.
-        """
-        while True:
-            self.collect_data()
-            processed_data = self.preprocess_data()
-            self.train_or_update_model(processed_data)
-            accuracy = self.evaluate_model(processed_data)
+
+        :param max_iterations: Number of iterations to run (None runs forever).
+        """
+        iterations = 0
+        while max_iterations is None or iterations < max_iterations:
+            iterations += 1
+            with span(self.span_profiler, "iteration"):
+                with span(self.span_profiler, "collect_data"):
+                    self.collect_data()
+                with span(self.span_profiler, "preprocess"):
+                    processed_data = self.preprocess_data()
+                with span(self.span_profiler, "train"):
+                    self.train_or_update_model(processed_data)
+                with span(self.span_profiler, "evaluate"):
+                    accuracy = self.evaluate_model(processed_data)
             print(f"Model accuracy: {accuracy:.2f}")
             time.sleep(5)  # Simulate a delay before collecting new data.
 
@@ -84,6 +101,8 @@ class DataCollector:
         """
         Simulate the collection of new data (e.g., sensor data, user interactions, etc.).
         """
+        import pandas as pd
+
         # Simulated data: Generating random data with features and a label (0 or 1).
         self.data = pd.DataFrame({
             'feature_1': np.random.rand(100),
@@ -106,6 +125,8 @@ class DataProcessor:
         :param data: Raw data collected by the data collector.
         :return: Preprocessed features and labels for model training or evaluation.
         """
+        from sklearn.preprocessing import StandardScaler
+
         features = data.drop(columns='label')
         labels = data['label']
         
@@ -123,11 +144,16 @@ class ModelTrainer:
         :param features: The feature set for training the model.
         :param labels: The labels (targets) for training the model.
         """
+        from sklearn.ensemble import RandomForestClassifier
+
         model = RandomForestClassifier(n_estimators=100)
         model.fit(features, labels)
         print("Model trained successfully!")
         return model
 
+    # Shared with the feedback loop's trainer
+    train_out_of_core = feedback_loop.ModelTrainer.train_out_of_core
+
 class ModelUpdater:
     def __init__(self, model):
         """
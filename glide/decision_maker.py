@@ -1,10 +1,102 @@
 # decision_maker.py
 
 import numpy as np
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.metrics import accuracy_score
 import random
 
+class LinUCBPolicy:
+    def __init__(self, actions=("Action_A", "Action_B", "Action_C"), num_features=3, alpha=1.0, ridge=1.0):
+        """
+        Contextual bandit choosing actions with LinUCB.
+
+        Each action has a ridge regression of reward on the scenario features (plus an
+        intercept). The policy picks the action with the highest predicted reward plus
+        alpha times its uncertainty, so it keeps exploring actions it knows little about.
+        The inverse of each action's design matrix is kept up to date with the
+        Sherman-Morrison formula, so learning from one feedback event costs O(d^2) and
+        never refits anything. Has predict() and fit(), so it can be the model of a
+        DecisionMaker.
+
+        :param actions: Names of the actions.
+        :param num_features: Number of scenario features.
+        :param alpha: Exploration weight of the confidence bound.
+        :param ridge: Ridge regularization (the initial design matrix is ridge * I).
+        """
+        if ridge <= 0:
+            raise ValueError("ridge must be positive.")
+        self.actions = np.asarray(actions)
+        self.action_index = {action: index for index, action in enumerate(actions)}
+        self.n_features_in_ = num_features  # Usable before any feedback, like a fitted model
+        self.alpha = alpha
+        dimensions = num_features + 1
+        self.A_inv = np.tile(np.eye(dimensions) / ridge, (len(actions), 1, 1))
+        self.b = np.zeros((len(actions), dimensions))
+        self.theta = np.zeros((len(actions), dimensions))
+        self.updates = 0
+
+    def _design(self, features):
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        if features.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {features.shape[1]}.")
+        return np.column_stack((features, np.ones(len(features))))
+
+    def scores(self, features):
+        """
+        Return the upper confidence bound of every action for a batch of scenarios.
+
+        :param features: An (n, num_features) array of scenarios.
+        :return: An (n, num_actions) array of scores.
+        """
+        x = self._design(features)
+        means = x @ self.theta.T
+        # x' A_inv x for every (scenario, action) pair in one call
+        variances = np.einsum('nd,kde,ne->nk', x, self.A_inv, x, optimize=True)
+        return means + self.alpha * np.sqrt(np.maximum(variances, 0))
+
+    def select(self, features):
+        """
+        Choose an action for each scenario of a batch.
+
+        :param features: An (n, num_features) array of scenarios.
+        :return: An array with the chosen action for each scenario.
+        """
+        return self.actions[np.argmax(self.scores(features), axis=1)]
+
+    predict = select
+
+    def update(self, features, actions, rewards):
+        """
+        Learn from feedback on chosen actions, one Sherman-Morrison update per event.
+
+        :param features: An (n, num_features) array of scenarios.
+        :param actions: The action taken in each scenario.
+        :param rewards: The reward observed for each action (e.g. 1 for success, 0 for failure).
+        """
+        x = self._design(features)
+        indices = [self.action_index[action] for action in np.atleast_1d(actions)]
+        rewards = np.atleast_1d(np.asarray(rewards, dtype=float))
+        if not len(x) == len(indices) == len(rewards):
+            raise ValueError("features, actions and rewards must have the same length.")
+        for row, index, reward in zip(x, indices, rewards):
+            A_inv = self.A_inv[index]
+            projected = A_inv @ row
+            A_inv -= np.outer(projected, projected) / (1.0 + row @ projected)
+            self.b[index] += reward * row
+            self.theta[index] = A_inv @ self.b[index]
+        self.updates += len(x)
+
+    def fit(self, features, actions, rewards=None):
+        """
+        Warm-start the policy from logged decisions.
+
+        :param features: An (n, num_features) array of scenarios.
+        :param actions: The action taken (or known to be right) in each scenario.
+        :param rewards: Reward of each logged action (default 1, treating the actions as labels).
+        :return: The policy.
+        """
+        actions = np.atleast_1d(actions)
+        self.update(features, actions, np.ones(len(actions)) if rewards is None else rewards)
+        return self
+
 class DecisionMaker:
     def __init__(self, model=None):
         """
@@ -12,7 +104,10 @@ class DecisionMaker:
         
         :param model: Pretrained machine learning model (optional).
         """
-        self.model = model if model else DecisionTreeClassifier()
+        if not model:
+            from sklearn.tree import DecisionTreeClassifier
+            model = DecisionTreeClassifier()
+        self.model = model
         self.history = []
         
     def collect_data(self, scenario):
@@ -49,6 +144,47 @@ class DecisionMaker:
 
         return decision[0]
 
+    def make_decisions(self, features):
+        """
+        Make decisions for a whole batch of scenarios with a single model call.
+        
+        :param features: An (n, 3) array with one row of factors per scenario.
+        :return: An array with the chosen action for each scenario.
+        """
+        features = np.asarray(features, dtype=float)
+        if self.model:
+            return self.model.predict(features)
+        return self.rule_based_decisions(features)
+
+    def record_feedback(self, features, actions, rewards):
+        """
+        Feed the outcome of decisions back to a model that learns online (e.g. LinUCBPolicy).
+        
+        :param features: A scenario dictionary, or an (n, 3) array of factors.
+        :param actions: The action taken, or one action per scenario.
+        :param rewards: The reward observed, or one reward per scenario.
+        """
+        if not hasattr(self.model, 'update'):
+            raise ValueError("The decision model does not learn from feedback; use a LinUCBPolicy.")
+        if isinstance(features, dict):
+            features = self.collect_data(features)
+        self.model.update(features, actions, rewards)
+        self.history.extend(zip(np.atleast_1d(actions), np.atleast_1d(rewards)))
+
+    def rule_based_decisions(self, features):
+        """
+        Vectorized version of rule_based_decision over a batch of scenarios.
+        
+        :param features: An (n, 3) array with one row of factors per scenario.
+        :return: An array of chosen actions (as strings).
+        """
+        factor_1, factor_2, factor_3 = features[:, 0], features[:, 1], features[:, 2]
+        return np.select(
+            [(factor_1 > 0.7) & (factor_2 < 0.3), (factor_1 < 0.4) & (factor_3 > 0.5)],
+            ["Action_A", "Action_B"],
+            default="Action_C"
+        )
+
     def rule_based_decision(self, scenario):
         """
         A simple rule-based decision engine based on predefined conditions.
@@ -72,6 +208,8 @@ class DecisionMaker:
         :param test_labels: The expected labels for the test dataset.
         :return: The accuracy score of the model.
         """
+        from sklearn.metrics import accuracy_score
+
         predictions = self.model.predict(test_data)
         accuracy = accuracy_score(test_labels, predictions)
         return accuracy
@@ -2,21 +2,28 @@
 
 import numpy as np
 import time
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score
+
+try:
+    from .profiler import span
+except ImportError:  # Imported as a top-level module
+    from profiler import span
 
 class FeedbackLoop:
-    def __init__(self, model=None):
+    def __init__(self, model=None, span_profiler=None):
         """
         Initialize the feedback loop system with an optional pre-trained model.
         
         :param model: A pre-trained machine learning model (default is None).
+        :param span_profiler: Optional glide.profiler.SpanProfiler recording a span per loop stage.
         """
+        from sklearn.ensemble import RandomForestClassifier
+
         self.model = model if model else RandomForestClassifier(n_estimators=100)
         self.data_collector = DataCollector()
         self.data_processor = DataProcessor()
         self.model_trainer = ModelTrainer()
         self.model_updater = ModelUpdater(self.model)
+        self.span_profiler = span_profiler
         self.feedback_data = []
     
     def collect_data(self):
@@ -53,6 +60,8 @@ class FeedbackLoop:
         :param processed_data: Preprocessed data for model evaluation.
         :return: Accuracy score of the model on the processed data.
         """
+        from sklearn.metrics import accuracy_score
+
         features, labels = processed_data
         predictions = self.model.predict(features)
         accuracy = accuracy_score(labels, predictions)
@@ -81,26 +90,36 @@ class FeedbackLoop:
             self.train_or_update_model(processed_data)
             self.feedback_data = []  # Reset feedback data after retraining
 
-    def run(self):
+    def run(self, max_iterations=None):
         """
         Main loop for the feedback loop system.
         Continuously collects data, evaluates model performance, collects feedback,
         and adjusts the model based on feedback.
-        """
-        while True:
-            self.collect_data()  # Collect new data for training or feedback
-            processed_data = self.preprocess_data()
-            
-            # Evaluate the current model
-            accuracy = self.evaluate_model(processed_data)
-            print(f"Model accuracy: {accuracy:.2f}")
-            
-            # Collect feedback on the model's performance
-            feedback = self.collect_feedback()
-            print(f"Received feedback: {'Success' if feedback == 1 else 'Failure'}")
-            
-            # Adjust the model based on feedback
-            self.adjust_model()
+        
+        :param max_iterations: Number of iterations to run (None runs forever).
+        """
+        iterations = 0
+        while max_iterations is None or iterations < max_iterations:
+            iterations += 1
+            with span(self.span_profiler, "iteration"):
+                with span(self.span_profiler, "collect_data"):
+                    self.collect_data()  # Collect new data for training or feedback
+                with span(self.span_profiler, "preprocess"):
+                    processed_data = self.preprocess_data()
+                
+                # Evaluate the current model
+                with span(self.span_profiler, "evaluate"):
+                    accuracy = self.evaluate_model(processed_data)
+                print(f"Model accuracy: {accuracy:.2f}")
+                
+                # Collect feedback on the model's performance
+                with span(self.span_profiler, "collect_feedback"):
+                    feedback = self.collect_feedback()
+                print(f"Received feedback: {'Success' if feedback == 1 else 'Failure'}")
+                
+                # Adjust the model based on feedback
+                with span(self.span_profiler, "adjust_model"):
+                    self.adjust_model()
             
             time.sleep(5)  # Simulate a delay before the next iteration
 
@@ -147,11 +166,34 @@ class ModelTrainer:
         :param features: The feature set for training the model.
         :param labels: The labels (targets) for training the model.
         """
+        from sklearn.ensemble import RandomForestClassifier
+
         model = RandomForestClassifier(n_estimators=100)
         model.fit(features, labels)
         print("Model trained successfully!")
         return model
 
+    def train_out_of_core(self, shard_paths, mode='incremental', chunk_size=50000):
+        """
+        Train a model on shards stored on disk without loading the whole dataset into memory.
+
+        :param shard_paths: Paths to .npy or .parquet shard files.
+        :param mode: 'incremental' (partial_fit per chunk) or 'bagging' (a forest per shard).
+        :param chunk_size: Number of rows read from disk at a time.
+        :return: The trained model.
+        """
+        try:
+            from .out_of_core import OutOfCoreTrainer
+        except ImportError:  # Imported as a top-level module
+            from out_of_core import OutOfCoreTrainer
+
+        trainer = OutOfCoreTrainer(mode=mode, chunk_size=chunk_size)
+        model = trainer.train(shard_paths)
+        self.stats = trainer.stats
+        print(f"Model trained successfully on {trainer.stats['rows']} rows "
+              f"({trainer.stats['rows_per_second']:.0f} rows/sec)!")
+        return model
+
 class ModelUpdater:
     def __init__(self, model):
         """
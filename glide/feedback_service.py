@@ -0,0 +1,350 @@
+# feedback_service.py
+
+import multiprocessing
+import queue
+import time
+import numpy as np
+
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)  # 2^64 / golden ratio, for Fibonacci hashing
+
+
+class FeedbackShard:
+    def __init__(self, shard, failure_threshold=3, capacity=1024, retrain_function=None):
+        """
+        Feedback state of the agents owned by one shard.
+
+        Each agent gets the next free slot the first time it sends feedback, so per-agent state
+        is a row of compact arrays rather than a Python list per agent, and memory grows with
+        the number of agents seen, whatever their ids. The arrays double in size when a new
+        agent does not fit.
+
+        :param shard: Index of this shard.
+        :param failure_threshold: Consecutive failures after which an agent is retrained.
+        :param capacity: Initial number of agent slots.
+        :param retrain_function: Optional callable receiving the global ids of the agents to
+                                 retrain, called once per batch of feedback.
+        """
+        self.shard = shard
+        self.failure_threshold = failure_threshold
+        self.retrain_function = retrain_function
+        self.slots = {}  # Agent id -> slot
+        self.agent_ids = np.zeros(capacity, dtype=np.int64)  # Slot -> agent id
+        self.successes = np.zeros(capacity, dtype=np.int64)
+        self.failures = np.zeros(capacity, dtype=np.int64)
+        self.failure_streaks = np.zeros(capacity, dtype=np.int32)
+        self.retrains = np.zeros(capacity, dtype=np.int32)
+        self.events = 0
+        self.busy_seconds = 0.0
+
+    def _ensure_capacity(self, size):
+        capacity = len(self.agent_ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('agent_ids', 'successes', 'failures', 'failure_streaks', 'retrains'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def _slots_of(self, agent_ids):
+        # One dictionary lookup per distinct agent in the batch, new agents taking the next slots
+        unique_ids, inverse = np.unique(agent_ids, return_inverse=True)
+        first_new = len(self.slots)
+        slots = np.empty(len(unique_ids), dtype=np.int64)
+        for index, agent_id in enumerate(unique_ids.tolist()):
+            slot = self.slots.get(agent_id)
+            if slot is None:
+                slot = self.slots[agent_id] = len(self.slots)
+            slots[index] = slot
+        self._ensure_capacity(len(self.slots))
+        new = slots >= first_new
+        self.agent_ids[slots[new]] = unique_ids[new]
+        return slots[inverse.ravel()]
+
+    def record(self, agent_ids, feedback):
+        """
+        Record a batch of feedback and decide which agents to retrain.
+
+        Events are applied in batch order per agent. An agent is retrained when its failure
+        streak reaches the threshold at any point in the batch; its streak then restarts at
+        zero from the end of the batch.
+
+        :param agent_ids: Ids of the agents, one per event.
+        :param feedback: 1 for success and 0 for failure, one per event.
+        :return: Ids of the agents to retrain.
+        """
+        start = time.perf_counter()
+        failed = np.asarray(feedback) == 0
+        if len(agent_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        local_ids = self._slots_of(np.asarray(agent_ids, dtype=np.int64))
+
+        self.failures += np.bincount(local_ids[failed], minlength=len(self.failures))
+        self.successes += np.bincount(local_ids[~failed], minlength=len(self.successes))
+
+        # Group the events by agent, keeping batch order within each group
+        order = np.argsort(local_ids, kind='stable')
+        ids, failed = local_ids[order], failed[order]
+        positions = np.arange(len(ids))
+        group_starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        group_ends = np.r_[group_starts[1:], len(ids)] - 1
+        group_start = np.repeat(group_starts, np.diff(np.r_[group_starts, len(ids)]))
+
+        # Streak after each event: events since the last success of the group, or, before the
+        # group's first success, the agent's stored streak plus the failures so far
+        last_success = np.maximum.accumulate(np.where(failed, -1, positions))
+        streaks = np.where(last_success >= group_start, positions - last_success,
+                           self.failure_streaks[ids] + positions - group_start + 1)
+
+        agents = ids[group_starts]
+        retrain = np.maximum.reduceat(streaks, group_starts) >= self.failure_threshold
+        self.failure_streaks[agents] = np.where(retrain, 0, streaks[group_ends])
+        self.retrains[agents[retrain]] += 1
+        self.events += len(ids)
+
+        retrain_ids = self.agent_ids[agents[retrain]]
+        if self.retrain_function is not None and len(retrain_ids):
+            self.retrain_function(retrain_ids)
+        self.busy_seconds += time.perf_counter() - start
+        return retrain_ids
+
+    def agent(self, agent_id):
+        """
+        Return the feedback counters of one agent, or None if it has sent no feedback.
+        """
+        slot = self.slots.get(agent_id)
+        if slot is None:
+            return None
+        return {"successes": int(self.successes[slot]), "failures": int(self.failures[slot]),
+                "failure_streak": int(self.failure_streaks[slot]), "retrains": int(self.retrains[slot])}
+
+    def metrics(self):
+        """
+        Return the totals of this shard.
+        """
+        return {
+            "agents": len(self.slots),
+            "events": self.events,
+            "successes": int(self.successes.sum()),
+            "failures": int(self.failures.sum()),
+            "retrains": int(self.retrains.sum()),
+            "agents_failing": int(np.count_nonzero(self.failure_streaks)),
+            "max_failure_streak": int(self.failure_streaks.max()),
+            "busy_seconds": self.busy_seconds
+        }
+
+
+def _shard_worker(shard, command_queue, result_queue):
+    """
+    Process loop of one shard; None on the command queue stops it.
+
+    Retrain decisions are reported as they are made, and queries are answered in command
+    order, so a reply also means every earlier batch has been applied.
+    """
+    while True:
+        command = command_queue.get()
+        if command is None:
+            return
+        kind, payload = command
+        if kind == 'record':
+            retrain_ids = shard.record(*payload)
+            if len(retrain_ids):
+                result_queue.put(('retrain', shard.shard, retrain_ids))
+        elif kind == 'agent':
+            result_queue.put(('reply', shard.shard, shard.agent(payload)))
+        elif kind == 'metrics':
+            result_queue.put(('reply', shard.shard, shard.metrics()))
+
+
+class ShardedFeedbackService:
+    def __init__(self, num_shards=None, failure_threshold=3, executor='process', capacity=1024,
+                 retrain_function=None, timeout=None):
+        """
+        Feedback handling for many agents, partitioned into shards by a hash of the agent id.
+
+        Each shard keeps its agents' feedback counters and failure streaks in numpy arrays and
+        makes retrain decisions for a whole batch of feedback at once. In process mode every
+        shard runs in its own worker process, so feedback handling scales with cores; in
+        inline mode the shards are updated in the calling process, which is cheaper for
+        small loads and easier to debug. Metrics are aggregated across shards on request.
+
+        :param num_shards: Number of shards (default the number of CPUs).
+        :param failure_threshold: Consecutive failures after which an agent is retrained
+                                  (FeedbackLoop retrains after 3).
+        :param executor: 'process' or 'inline'.
+        :param capacity: Initial number of agent slots per shard.
+        :param retrain_function: Optional callable receiving a batch of agent ids to retrain.
+                                 It runs in the shard's process, so it must be picklable in
+                                 process mode.
+        :param timeout: Seconds to wait for the shard processes to answer a query before
+                        raising TimeoutError (default no limit). A shard process that has died
+                        raises RuntimeError as soon as it is noticed, whatever the timeout.
+        """
+        if executor not in ('process', 'inline'):
+            raise ValueError("executor must be 'process' or 'inline'.")
+        self.num_shards = num_shards if num_shards else multiprocessing.cpu_count()
+        self.executor = executor
+        self.timeout = timeout
+        self.shards = [FeedbackShard(index, failure_threshold, capacity, retrain_function)
+                       for index in range(self.num_shards)]
+        self.pending_retrains = []
+        self.events = 0
+        self.start_time = time.perf_counter()
+
+        if executor == 'process':
+            self.context = multiprocessing.get_context()
+            self.result_queue = self.context.Queue()
+            self.command_queues = [self.context.Queue() for _ in self.shards]
+            self.workers = [self.context.Process(target=_shard_worker, args=(shard, command_queue, self.result_queue),
+                                                 name=f"glide-feedback-{shard.shard}", daemon=True)
+                            for shard, command_queue in zip(self.shards, self.command_queues)]
+            for worker in self.workers:
+                worker.start()
+            self.shards = None  # The shards now live in the worker processes
+
+    def shard_of(self, agent_ids):
+        """
+        Return the shard owning each agent id.
+
+        Ids are hashed before being split across shards, so sequential or strided ids (e.g.
+        all multiples of the shard count) still spread evenly.
+
+        :param agent_ids: An agent id or array of non-negative integer agent ids.
+        :return: The shard index of each id.
+        """
+        hashed = np.asarray(agent_ids, dtype=np.int64).astype(np.uint64) * HASH_MULTIPLIER
+        return ((hashed >> np.uint64(32)) % np.uint64(self.num_shards)).astype(np.int64)
+
+    def submit(self, agent_ids, feedback):
+        """
+        Submit a batch of feedback events.
+
+        In process mode the batch is handed to the shards asynchronously; retrain decisions
+        are collected by retrain_requests() and metrics().
+
+        :param agent_ids: Agent ids, one per event.
+        :param feedback: 1 for success and 0 for failure, one per event.
+        """
+        agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        feedback = np.asarray(feedback, dtype=np.int8)
+        if agent_ids.shape != feedback.shape:
+            raise ValueError("agent_ids and feedback must have the same length.")
+        if np.any(agent_ids < 0):
+            raise ValueError("Agent ids must be non-negative.")
+
+        shards = self.shard_of(agent_ids)
+        order = np.argsort(shards, kind='stable')  # Keeps event order within each shard
+        boundaries = np.searchsorted(shards[order], np.arange(self.num_shards + 1))
+        for shard in range(self.num_shards):
+            selected = order[boundaries[shard]:boundaries[shard + 1]]
+            if len(selected) == 0:
+                continue
+            payload = (agent_ids[selected], feedback[selected])
+            if self.executor == 'process':
+                self.command_queues[shard].put(('record', payload))
+            else:
+                retrain_ids = self.shards[shard].record(*payload)
+                if len(retrain_ids):
+                    self.pending_retrains.append(retrain_ids)
+        self.events += len(agent_ids)
+
+    def _query(self, shard_commands):
+        # Send one query per shard and wait for all replies; retrain decisions made by
+        # earlier batches arrive first and are kept aside. The wait polls, so a shard process
+        # that died (e.g. its retrain_function raised) fails the query instead of hanging it.
+        for shard, command in shard_commands.items():
+            self.command_queues[shard].put(command)
+        replies = {}
+        deadline = None if self.timeout is None else time.perf_counter() + self.timeout
+        while len(replies) < len(shard_commands):
+            try:
+                kind, shard, payload = self.result_queue.get(timeout=0.1)
+            except queue.Empty:
+                for shard in shard_commands:
+                    worker = self.workers[shard]
+                    if shard not in replies and not worker.is_alive():
+                        raise RuntimeError(f"Feedback shard {shard} stopped (exit code {worker.exitcode}).")
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise TimeoutError(f"Feedback shards did not answer within {self.timeout} seconds.")
+                continue
+            if kind == 'retrain':
+                self.pending_retrains.append(payload)
+            else:
+                replies[shard] = payload
+        return replies
+
+    def retrain_requests(self):
+        """
+        Return the ids of the agents due for retraining since the last call.
+
+        In process mode this waits until every submitted batch has been applied.
+        """
+        if self.executor == 'process':
+            self._query({shard: ('metrics', None) for shard in range(self.num_shards)})
+        retrain_ids = np.concatenate(self.pending_retrains) if self.pending_retrains else np.empty(0, dtype=np.int64)
+        self.pending_retrains = []
+        return np.sort(retrain_ids)
+
+    def agent(self, agent_id):
+        """
+        Return the feedback counters of one agent, or None if it has sent no feedback.
+        """
+        agent_id = int(agent_id)
+        shard = int(self.shard_of(agent_id))
+        if self.executor == 'process':
+            return self._query({shard: ('agent', agent_id)})[shard]
+        return self.shards[shard].agent(agent_id)
+
+    def metrics(self):
+        """
+        Aggregate the metrics of every shard.
+
+        :return: A dictionary of totals across shards, the overall success rate and event
+                 throughput, and the per-shard metrics under 'shards'.
+        """
+        if self.executor == 'process':
+            replies = self._query({shard: ('metrics', None) for shard in range(self.num_shards)})
+            shard_metrics = [replies[shard] for shard in range(self.num_shards)]
+        else:
+            shard_metrics = [shard.metrics() for shard in self.shards]
+
+        totals = {name: sum(metrics[name] for metrics in shard_metrics)
+                  for name in ("agents", "events", "successes", "failures", "retrains", "agents_failing")}
+        totals["max_failure_streak"] = max(metrics["max_failure_streak"] for metrics in shard_metrics)
+        totals["success_rate"] = totals["successes"] / totals["events"] if totals["events"] else 0.0
+        elapsed = time.perf_counter() - self.start_time
+        totals["events_per_second"] = totals["events"] / elapsed if elapsed else 0.0
+        totals["shards"] = shard_metrics
+        return totals
+
+    def close(self):
+        """
+        Stop the shard processes once they have applied every submitted batch.
+        """
+        if self.executor == 'process' and self.workers:
+            for command_queue in self.command_queues:
+                command_queue.put(None)
+            for worker in self.workers:
+                worker.join()
+            self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    with ShardedFeedbackService(num_shards=4) as service:
+        for _ in range(100):
+            agent_ids = rng.integers(0, 10000, 10000)
+            service.submit(agent_ids, rng.random(10000) < 0.8)  # Succeeds 80% of the time
+        print(f"Agents due for retraining: {len(service.retrain_requests())}")
+        metrics = service.metrics()
+        print(f"{metrics['events']} events from {metrics['agents']} agents, "
+              f"success rate {metrics['success_rate']:.2f}, {metrics['events_per_second']:.0f} events/sec")
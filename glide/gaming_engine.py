@@ -1,44 +1,171 @@
 # gaming_engine.py
 
+import copy
+import json
 import time
-import random
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
+try:
+    from .profiler import span
+except ImportError:  # Imported as a top-level module
+    from profiler import span
+
 class GamingEngine:
-    def __init__(self):
+    def __init__(self, tick_rate=10.0, max_steps_per_frame=5, interpolation_hook=None, profile_window=1000,
+                 render_backend=None, seed=None, num_enemies=5, span_profiler=None):
         """
         Initialize the gaming engine with essential game states and mechanics.
+
+        :param tick_rate: Fixed simulation rate in steps per second.
+        :param max_steps_per_frame: Cap on catch-up steps per frame, so a slow frame cannot
+                                    snowball into ever longer frames.
+        :param interpolation_hook: Optional callable(game_state, alpha) invoked before each render,
+                                   where alpha in [0, 1) is how far the clock is into the next step.
+        :param profile_window: Number of recent frames kept per phase by the frame profiler.
+        :param render_backend: RenderBackend used for output (default prints to the console).
+        :param seed: Seed making the world, the player inputs and the AI deterministic.
+        :param num_enemies: Number of enemies in the world.
+        :param span_profiler: Optional glide.profiler.SpanProfiler recording a span per loop stage.
         """
-        self.game_state = GameState()
-        self.input_handler = InputHandler()
-        self.ai_decision_maker = AIDecisionMaker()
+        if tick_rate <= 0:
+            raise ValueError("tick_rate must be positive.")
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy  # Recorded so that unseeded sessions can be replayed
+        world_seed, input_seed, ai_seed = seed_sequence.spawn(3)
+        self.game_state = GameState(num_enemies, np.random.default_rng(world_seed))
+        self.input_handler = InputHandler(seed=input_seed)
+        self.ai_decision_maker = AIDecisionMaker(seed=ai_seed)
         self.physics_engine = PhysicsEngine()
-        self.render_engine = RenderEngine()
+        self.render_engine = RenderEngine(render_backend)
+        self.tick_rate = tick_rate
+        self.max_steps_per_frame = max_steps_per_frame
+        self.interpolation_hook = interpolation_hook
+        self.profiler = FrameProfiler(profile_window)
+        self.span_profiler = span_profiler
+        self.frame = 0
+        self.journal = None
 
-    def update(self):
+    def step(self, inputs=None, ai_actions=None):
         """
-        Main update loop of the game engine. Continuously processes inputs, updates the game state,
-        and makes real-time decisions based on the current game world.
+        Advance the simulation by exactly one fixed timestep.
+
+        :param inputs: Player input to apply instead of polling the input handler (used by replay).
+        :param ai_actions: Enemy actions to apply instead of asking the AI (used by replay).
         """
-        while True:
-            # Step 1: Handle user input
-            inputs = self.input_handler.get_inputs()
+        timer = time.perf_counter
+        if self.journal is not None:
+            player = self.game_state.player
+            before = (player.x_position, player.y_position, player.health, self.game_state.score)
+
+        # Step 1: Handle user input
+        start = timer()
+        with span(self.span_profiler, "input"):
+            if inputs is None:
+                inputs = self.input_handler.get_inputs()
             self.game_state.apply_inputs(inputs)
-            
-            # Step 2: AI decision-making
-            ai_actions = self.ai_decision_maker.make_decision(self.game_state)
+
+        # Step 2: AI decision-making
+        ai_start = timer()
+        with span(self.span_profiler, "ai"):
+            if ai_actions is None:
+                ai_actions = self.ai_decision_maker.make_decision(self.game_state)
+            ai_actions = encode_actions(ai_actions)
             self.game_state.apply_ai_actions(ai_actions)
-            
-            # Step 3: Update physics and game logic
+
+        # Step 3: Update physics and game logic
+        physics_start = timer()
+        with span(self.span_profiler, "physics"):
             self.physics_engine.update(self.game_state)
-            
-            # Step 4: Render the current state of the game
-            self.render_engine.render(self.game_state)
 
-            # Step 5: Add some game logic (e.g., collision detection, level completion)
+        # Step 4: Add some game logic (e.g., collision detection, level completion)
+        game_over_start = timer()
+        with span(self.span_profiler, "game_over"):
             self.check_game_over_conditions()
+        end = timer()
+
+        self.profiler.record("input", ai_start - start)
+        self.profiler.record("ai", physics_start - ai_start)
+        self.profiler.record("physics", game_over_start - physics_start)
+        self.profiler.record("game_over", end - game_over_start)
 
-            time.sleep(0.1)  # Simulate frame rate
+        if self.journal is not None:
+            player = self.game_state.player
+            self.journal.record(self.frame, INPUTS.index(inputs), ai_actions,
+                                player.x_position - before[0], player.y_position - before[1],
+                                player.health - before[2], self.game_state.score - before[3])
+        self.frame += 1
+
+    def start_journal(self, path):
+        """
+        Record every following frame's inputs, AI actions and state deltas to a replay journal.
+        The journal starts with a snapshot of the current state, so a session can be journaled
+        from any frame, not only from the start.
+
+        :param path: Path of the journal file to create.
+        :return: The ReplayJournal; close it (or use it as a context manager) to flush the file.
+        """
+        self.journal = ReplayJournal(path, self.game_state.entities.num_enemies, self.seed,
+                                     start_frame=self.frame, snapshot=self.snapshot())
+        return self.journal
+
+    def render(self, alpha=0.0):
+        """
+        Render the current state of the game, after giving the interpolation hook a chance to run.
+
+        :param alpha: Fraction of a timestep elapsed since the last simulation step.
+        """
+        start = time.perf_counter()
+        with span(self.span_profiler, "render"):
+            if self.interpolation_hook is not None:
+                self.interpolation_hook(self.game_state, alpha)
+            self.render_engine.render(self.game_state)
+        self.profiler.record("render", time.perf_counter() - start)
+
+    def update(self, max_steps=None, realtime=True):
+        """
+        Main update loop of the game engine. Continuously processes inputs, updates the game state,
+        and makes real-time decisions based on the current game world.
+
+        The simulation advances in fixed timesteps of 1 / tick_rate seconds driven by an
+        accumulator, so the game speed does not depend on how long each frame takes.
+
+        :param max_steps: Stop after this many simulation steps (None runs forever).
+        :param realtime: Pace steps against the wall clock; False runs headless as fast as possible.
+        :return: The number of simulation steps taken.
+        """
+        timestep = 1.0 / self.tick_rate
+        steps = 0
+        accumulator = 0.0
+        previous_time = time.perf_counter()
+
+        while max_steps is None or steps < max_steps:
+            if realtime:
+                now = time.perf_counter()
+                accumulator = min(accumulator + now - previous_time, timestep * self.max_steps_per_frame)
+                previous_time = now
+            else:
+                accumulator += timestep
+
+            with span(self.span_profiler, "frame"):
+                while accumulator >= timestep and (max_steps is None or steps < max_steps):
+                    with span(self.span_profiler, "step"):
+                        self.step()
+                    accumulator -= timestep
+                    steps += 1
+
+                self.render(accumulator / timestep)
+
+            if realtime:
+                # Sleep only for what is left of the timestep after this frame's work
+                remaining = timestep - accumulator - (time.perf_counter() - previous_time)
+                if remaining > 0:
+                    with span(self.span_profiler, "sleep"):
+                        time.sleep(remaining)
+
+        return steps
 
     def check_game_over_conditions(self):
         """
@@ -53,19 +180,200 @@ class GamingEngine:
         Reset the game state to its initial configuration.
         """
         print("Resetting game state...")
-        self.game_state = GameState()
+        # Keep drawing from the same generator so that resets stay deterministic
+        self.game_state = GameState(self.game_state.entities.num_enemies, self.game_state.entities.rng)
+
+    def generators(self):
+        """
+        Return the random generators that drive the simulation, keyed by component.
+        """
+        generators = {
+            "world": self.game_state.entities.rng,
+            "input": self.input_handler.rng
+        }
+        policy_rng = getattr(self.ai_decision_maker.policy, 'rng', None)
+        if policy_rng is not None:
+            generators["ai"] = policy_rng
+        return generators
+
+    def snapshot(self, into=None):
+        """
+        Capture the world and every random generator so the simulation can be rewound.
+
+        :param into: A previous snapshot of the same world size to overwrite instead of allocating.
+        :return: A GameSnapshot.
+        """
+        snapshot = self.game_state.snapshot(into)
+        snapshot.frame = self.frame
+        for name, generator in self.generators().items():
+            snapshot.rng_states[name] = generator.bit_generator.state
+        return snapshot
+
+    def restore(self, snapshot):
+        """
+        Rewind the world, every random generator and the frame number to a snapshot.
+
+        :param snapshot: A GameSnapshot taken from this engine.
+        """
+        self.game_state.restore(snapshot)
+        self.frame = snapshot.frame
+        for name, generator in self.generators().items():
+            generator.bit_generator.state = snapshot.rng_states[name]
+
+
+class GameSnapshot:
+    __slots__ = ('buffer', 'score', 'rng_states', 'frame')
+
+    def __init__(self, buffer, score, rng_states, frame=0):
+        """
+        Copy of a game world: the entity store's backing buffer, the score, the
+        states of the random generators and the engine's frame number.
+        """
+        self.buffer = buffer
+        self.score = score
+        self.rng_states = rng_states
+        self.frame = frame
+
+
+class SnapshotRing:
+    def __init__(self, capacity=64):
+        """
+        Fixed-size ring of snapshots indexed by frame number, for rollback and re-simulation.
+        Slots are reused, so saving a frame does not allocate once the ring has filled.
+
+        :param capacity: Number of most recent frames that can be restored.
+        """
+        self.capacity = capacity
+        self.snapshots = [None] * capacity
+        self.frames = np.full(capacity, -1, dtype=np.int64)
+
+    def save(self, engine, frame):
+        """
+        Save the engine's state for a frame, overwriting the oldest slot.
+        """
+        slot = frame % self.capacity
+        self.snapshots[slot] = engine.snapshot(into=self.snapshots[slot])
+        self.frames[slot] = frame
+
+    def restore(self, engine, frame):
+        """
+        Rewind the engine to a saved frame.
+
+        :raises KeyError: If the frame is no longer held by the ring.
+        """
+        slot = frame % self.capacity
+        if self.frames[slot] != frame:
+            raise KeyError(f"Frame {frame} is not in the snapshot ring.")
+        engine.restore(self.snapshots[slot])
+
+
+class FrameProfiler:
+    PHASES = ("input", "ai", "physics", "render", "game_over")
+
+    def __init__(self, window=1000):
+        """
+        Keep rolling per-phase frame timings for the most recent frames.
+
+        :param window: Number of recent samples kept for each phase.
+        """
+        self.window = window
+        self.timings = {phase: deque(maxlen=window) for phase in self.PHASES}
+
+    def record(self, phase, seconds):
+        """
+        Record how long one phase of one frame took.
+
+        :param phase: One of FrameProfiler.PHASES.
+        :param seconds: Duration of the phase in seconds.
+        """
+        self.timings[phase].append(seconds)
+
+    def histogram(self, phase, bins=20):
+        """
+        Return a histogram of the rolling timings for one phase, in milliseconds.
+
+        :param phase: One of FrameProfiler.PHASES.
+        :param bins: Number of histogram bins.
+        :return: A dictionary with the bin counts and bin edges.
+        """
+        samples = np.fromiter(self.timings[phase], dtype=float) * 1000
+        counts, edges = np.histogram(samples, bins=bins)
+        return {"counts": counts.tolist(), "bin_edges_ms": edges.tolist()}
+
+    def histograms(self, bins=20):
+        """
+        Return the rolling histogram of every phase.
+        """
+        return {phase: self.histogram(phase, bins) for phase in self.PHASES}
+
+    def summary(self):
+        """
+        Summarize the rolling timings of every phase.
+
+        :return: A dictionary of per-phase statistics in milliseconds.
+        """
+        summary = {}
+        for phase in self.PHASES:
+            samples = np.fromiter(self.timings[phase], dtype=float) * 1000
+            if len(samples) == 0:
+                summary[phase] = {"count": 0}
+                continue
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            summary[phase] = {
+                "count": len(samples),
+                "mean_ms": samples.mean(),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "max_ms": samples.max()
+            }
+        return summary
 
 
 class GameState:
-    def __init__(self):
+    def __init__(self, num_enemies=5, rng=None):
         """
         Initialize the game state with player attributes, world state, and game objects.
+
+        Entity attributes live in a struct-of-arrays EntityStore; `player` and `enemies`
+        are lightweight proxy views over it.
+
+        :param num_enemies: Number of enemies to spawn.
+        :param rng: Optional numpy Generator used for spawning and enemy movement.
         """
-        self.player = Player()
+        self.entities = EntityStore(num_enemies, rng)
+        self.player = Player(self.entities)
         self.world = World()
-        self.enemies = [Enemy() for _ in range(5)]
+        self.enemies = EnemyViews(self.entities)
         self.score = 0
 
+    def snapshot(self, into=None):
+        """
+        Copy the entity arrays (a single buffer copy) and the score.
+
+        :param into: A previous snapshot of the same world size to overwrite instead of allocating.
+        :return: A GameSnapshot.
+        """
+        buffer = self.entities.buffer
+        if into is not None and into.buffer.shape == buffer.shape:
+            np.copyto(into.buffer, buffer)
+            into.score = self.score
+            into.rng_states["world"] = self.entities.rng.bit_generator.state
+            return into
+        return GameSnapshot(buffer.copy(), self.score, {"world": self.entities.rng.bit_generator.state})
+
+    def restore(self, snapshot):
+        """
+        Restore the entity arrays and the score from a snapshot of the same world size.
+
+        :param snapshot: A GameSnapshot taken from a world with the same number of enemies.
+        """
+        if snapshot.buffer.shape != self.entities.buffer.shape:
+            raise ValueError("Snapshot was taken from a world with a different number of enemies.")
+        np.copyto(self.entities.buffer, snapshot.buffer)
+        self.score = snapshot.score
+        self.entities.rng.bit_generator.state = snapshot.rng_states["world"]
+
     def apply_inputs(self, inputs):
         """
         Apply user inputs to the game state (e.g., player movement, actions).
@@ -78,13 +386,20 @@ class GameState:
         """
         Apply AI actions to the game state (e.g., enemy movements, decisions).
         
-        :param ai_actions: List of AI actions.
+        :param ai_actions: Action names or integer action codes, one per enemy.
         """
-        for enemy, action in zip(self.enemies, ai_actions):
-            enemy.perform_action(action)
+        self.entities.apply_actions(encode_actions(ai_actions))
 
 
 class InputHandler:
+    def __init__(self, seed=None):
+        """
+        Initialize the input handler.
+
+        :param seed: Seed for the simulated input generator.
+        """
+        self.rng = np.random.default_rng(seed)
+
     def get_inputs(self):
         """
         Simulate receiving player inputs (e.g., from keyboard, controller, etc.).
@@ -92,26 +407,124 @@ class InputHandler:
         :return: A list of inputs (in a real scenario, this would come from the hardware).
         """
         # Simulate basic input actions (move up, down, left, right)
-        return random.choice(["UP", "DOWN", "LEFT", "RIGHT", "SHOOT"])
+        return INPUTS[self.rng.integers(len(INPUTS))]
 
 
 class AIDecisionMaker:
+    def __init__(self, policy=None, seed=None):
+        """
+        Initialize the NPC decision maker with a batched policy.
+
+        :param policy: An NPCPolicy deciding for every enemy at once (default is RandomPolicy).
+        :param seed: Seed for the default policy's random generator.
+        """
+        self.policy = policy if policy is not None else RandomPolicy(np.random.default_rng(seed))
+
     def make_decision(self, game_state):
         """
         Simulate an AI decision-making process for non-player characters (NPCs) or enemies.
         
         :param game_state: The current state of the game (e.g., player position, game objects).
-        :return: A list of decisions for each enemy or NPC.
+        :return: An array of action codes, one for each enemy or NPC.
         """
-        # Example AI decision-making logic
-        actions = []
-        for enemy in game_state.enemies:
-            action = random.choice(["ATTACK", "MOVE", "IDLE"])  # Random decision for the enemy
-            actions.append(action)
-        return actions
+        return self.policy.decide(game_state.entities)
+
+
+class NPCPolicy:
+    def decide(self, entities):
+        """
+        Choose an action for every enemy in one call.
+
+        :param entities: The EntityStore holding the array-form game state, or a WorldBatch
+                         (whose arrays have an extra leading world axis).
+        :return: An int8 array of action codes shaped like entities.enemy_health.
+        """
+        raise NotImplementedError
+
+    def spawn(self, seed_sequence):
+        """
+        Return the copy of this policy used by one shard of a simulation farm.
+
+        A policy holding a random generator in `rng` gets a copy with a fresh generator
+        seeded from the shard's seed sequence, so shards do not replay the same random
+        stream. Policies without an `rng` are shared as they are.
+
+        :param seed_sequence: A numpy SeedSequence owned by the shard.
+        """
+        if not hasattr(self, 'rng'):
+            return self
+        policy = copy.copy(self)
+        policy.rng = np.random.default_rng(seed_sequence)
+        return policy
+
+
+class RandomPolicy(NPCPolicy):
+    def __init__(self, rng=None):
+        """
+        Pick uniformly random actions for every enemy.
+
+        :param rng: A numpy Generator (default is an unseeded generator).
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def decide(self, entities):
+        return self.rng.integers(0, len(ACTIONS), size=entities.enemy_health.shape, dtype=np.int8)
+
+
+class ModelPolicy(NPCPolicy):
+    def __init__(self, model):
+        """
+        Decide for every enemy with one batched model call.
+
+        Each enemy is described by three features: its x and y offset from the player
+        and its health. The model's outputs must be action names or action codes.
+
+        :param model: A batched decision maker (e.g. decision_maker.DecisionMaker) exposing
+                      make_decisions(features), or any estimator exposing predict(features).
+        """
+        self.model = model
+
+    @staticmethod
+    def features(entities):
+        """
+        Build the feature matrix for the model, with one row of 3 features per enemy.
+        """
+        enemy_health = entities.enemy_health
+        features = np.empty((enemy_health.size, 3))
+        offsets = entities.enemy_positions - entities.player_position[..., None, :]
+        features[:, :2] = offsets.reshape(-1, 2)
+        features[:, 2] = enemy_health.ravel()
+        return features
+
+    def decide(self, entities):
+        features = self.features(entities)
+        if hasattr(self.model, 'make_decisions'):
+            decisions = self.model.make_decisions(features)
+        else:
+            decisions = self.model.predict(features)
+        return encode_actions(np.asarray(decisions)).reshape(entities.enemy_health.shape)
 
 
 class PhysicsEngine:
+    def __init__(self, cell_size=1.0, enemy_collisions=False):
+        """
+        Initialize the physics engine with a spatial-hash broad phase.
+
+        The broad phase only serves the many-vs-many enemy checks (find_enemy_collisions and
+        separate_enemies). The default update tests the single player against every enemy in
+        one vectorized pass, which is cheaper than building the grid, so it gains nothing from
+        the broad phase unless enemy_collisions is enabled.
+
+        :param cell_size: Broad-phase cell size; must be at least the collision extent (1 unit).
+        :param enemy_collisions: Also push overlapping enemies apart on every update. The
+                                 enemy pairs are found through the broad phase, so the cost
+                                 grows with the number of enemies rather than of pairs.
+        """
+        if cell_size < 1:
+            raise ValueError("cell_size must be at least the collision extent of 1 unit.")
+        self.broad_phase = SpatialHashGrid(cell_size)
+        self.enemy_collisions = enemy_collisions
+
     def update(self, game_state):
         """
         Update the game state based on physical interactions, such as player movement and collisions.
@@ -120,25 +533,66 @@ class PhysicsEngine:
         """
         self.apply_gravity(game_state)
         self.check_collisions(game_state)
+        if self.enemy_collisions:
+            self.separate_enemies(game_state)
 
     def apply_gravity(self, game_state):
         """
         Apply gravity to the player and enemies (simple physics).
         """
-        if game_state.player.y_position > 0:
-            game_state.player.y_position -= 0.1  # Simulating gravity
-
-        for enemy in game_state.enemies:
-            if enemy.y_position > 0:
-                enemy.y_position -= 0.1
+        apply_gravity(game_state.entities.positions)
 
     def check_collisions(self, game_state):
         """
         Check for and resolve collisions (e.g., player colliding with enemies).
         """
-        for enemy in game_state.enemies:
-            if self.detect_collision(game_state.player, enemy):
-                game_state.player.health -= 10  # Damage to player on collision
+        entities = game_state.entities
+        # One query point is tested against every enemy in a single O(n) pass; building the
+        # grid alone costs O(n log n), so the broad phase is only used for the many-vs-many
+        # enemy checks (see separate_enemies).
+        entities.health[PLAYER] -= collision_damage(entities.enemy_positions, entities.player_position)
+
+    def find_enemy_collisions(self, game_state):
+        """
+        Find every pair of enemies that currently overlap.
+
+        :param game_state: The current state of the game.
+        :return: An (n, 2) array of colliding enemy index pairs, each with first < second.
+        """
+        enemy_positions = game_state.entities.enemy_positions
+        self.broad_phase.build(enemy_positions)
+        pairs = self.broad_phase.candidate_pairs()
+        hits = self.overlaps(enemy_positions[pairs[:, 0]], enemy_positions[pairs[:, 1]])
+        return pairs[hits]
+
+    def separate_enemies(self, game_state):
+        """
+        Push every pair of overlapping enemies apart horizontally until they just touch.
+
+        :param game_state: The current state of the game.
+        :return: The number of colliding pairs that were resolved.
+        """
+        pairs = self.find_enemy_collisions(game_state)
+        if len(pairs) == 0:
+            return 0
+        x_positions = game_state.entities.enemy_positions[:, 0]
+        firsts, seconds = pairs[:, 0], pairs[:, 1]
+        offsets = x_positions[seconds] - x_positions[firsts]
+        directions = np.where(offsets < 0, -1.0, 1.0)  # Coincident enemies are split along +x
+        pushes = directions * (1 - np.abs(offsets)) / 2
+        # An enemy can be in several pairs, so the pushes are accumulated
+        np.subtract.at(x_positions, firsts, pushes)
+        np.add.at(x_positions, seconds, pushes)
+        return len(pairs)
+
+    @staticmethod
+    def overlaps(first_positions, second_positions):
+        """
+        Vectorized narrow phase: the same test as detect_collision applied element-wise.
+
+        :return: A boolean array, True where the two positions collide.
+        """
+        return (np.abs(first_positions - second_positions) < 1).all(axis=-1)
 
     def detect_collision(self, player, enemy):
         """
@@ -151,25 +605,467 @@ class PhysicsEngine:
         return abs(player.x_position - enemy.x_position) < 1 and abs(player.y_position - enemy.y_position) < 1
 
 
+class SpatialHashGrid:
+    # Half of the 3x3 neighbourhood, so each pair of neighbouring cells is visited once.
+    HALF_NEIGHBOURHOOD = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+    FULL_NEIGHBOURHOOD = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+    def __init__(self, cell_size=1.0):
+        """
+        Uniform-grid broad phase. Entities are bucketed by cell and only entities in the
+        same or adjacent cells are reported as candidates, so the cost of finding
+        candidates grows with the number of entities rather than the number of pairs.
+
+        :param cell_size: Width and height of a grid cell.
+        """
+        self.cell_size = cell_size
+        self.cells = np.empty((0, 2), dtype=np.int64)
+        self.order = np.empty(0, dtype=np.int64)
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+
+    @staticmethod
+    def cell_keys(cell_x, cell_y):
+        """
+        Pack integer cell coordinates into a single sortable int64 key.
+        """
+        return (cell_x << 32) + (cell_y & 0xFFFFFFFF)
+
+    def build(self, positions):
+        """
+        Rebuild the grid from the current positions. Called once per frame.
+
+        :param positions: An (n, 2) array of entity positions.
+        """
+        self.cells = np.floor(positions / self.cell_size).astype(np.int64)
+        keys = self.cell_keys(self.cells[:, 0], self.cells[:, 1])
+        if len(self.order) == len(keys):
+            # Entities rarely change cell between frames, so the keys in last frame's order are
+            # nearly sorted, and the stable sort (a merge sort that detects runs) is close to linear
+            order = self.order[np.argsort(keys[self.order], kind='stable')]
+        else:
+            order = np.argsort(keys, kind='stable')
+        self.order = order
+        self.sorted_keys = keys[order]
+
+    def query(self, points):
+        """
+        Find the indexed entities in the cells surrounding each query point.
+
+        :param points: An (m, 2) array of query positions.
+        :return: Two index arrays (point indices, entity indices) of candidate pairs.
+        """
+        cells = np.floor(np.asarray(points) / self.cell_size).astype(np.int64)
+        return self._gather(cells, self.FULL_NEIGHBOURHOOD)
+
+    def candidate_pairs(self):
+        """
+        Find candidate pairs among the indexed entities themselves.
+
+        :return: A (k, 2) array of entity index pairs, each with first < second.
+        """
+        firsts, seconds = self._gather(self.cells, self.HALF_NEIGHBOURHOOD, skip_self=True)
+        return np.column_stack((np.minimum(firsts, seconds), np.maximum(firsts, seconds)))
+
+    def _gather(self, cells, offsets, skip_self=False):
+        firsts, seconds = [], []
+        for dx, dy in offsets:
+            keys = self.cell_keys(cells[:, 0] + dx, cells[:, 1] + dy)
+            lows = np.searchsorted(self.sorted_keys, keys, side='left')
+            counts = np.searchsorted(self.sorted_keys, keys, side='right') - lows
+            total = counts.sum()
+            if total == 0:
+                continue
+            # Expand each cell's [low, low + count) range into flat candidate indices
+            query_indices = np.repeat(np.arange(len(keys)), counts)
+            group_starts = np.repeat(lows - (np.cumsum(counts) - counts), counts)
+            entity_indices = self.order[group_starts + np.arange(total)]
+            if skip_self and dx == 0 and dy == 0:
+                keep = query_indices < entity_indices
+                query_indices, entity_indices = query_indices[keep], entity_indices[keep]
+            firsts.append(query_indices)
+            seconds.append(entity_indices)
+        if not firsts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(firsts), np.concatenate(seconds)
+
+
 class RenderEngine:
+    def __init__(self, backend=None):
+        """
+        Initialize the render engine with a render backend.
+
+        :param backend: A RenderBackend instance (default is ConsoleRenderBackend).
+        """
+        self.backend = backend if backend is not None else ConsoleRenderBackend()
+
     def render(self, game_state):
         """
         Render the current game state to the screen (or console).
         
         :param game_state: The current state of the game.
         """
+        self.backend.render(game_state)
+
+    def close(self):
+        """
+        Release any resources held by the render backend.
+        """
+        self.backend.close()
+
+
+class RenderBackend:
+    def render(self, game_state):
+        """
+        Output one frame of the game state.
+
+        :param game_state: The current state of the game.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release any resources held by the backend.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ConsoleRenderBackend(RenderBackend):
+    def render(self, game_state):
+        """
+        Print the current game state, including which enemies attacked this frame.
+        """
         print(f"Player Health: {game_state.player.health} | Score: {game_state.score}")
         print(f"Player Position: ({game_state.player.x_position}, {game_state.player.y_position})")
         for enemy in game_state.enemies:
             print(f"Enemy at ({enemy.x_position}, {enemy.y_position}) with action {enemy.action}")
+            if enemy.action == "ATTACK":
+                print(f"Enemy at ({enemy.x_position}, {enemy.y_position}) attacks!")
         print("-" * 40)
 
 
-class Player:
-    def __init__(self):
-        self.health = 100
-        self.x_position = 0
-        self.y_position = 0
+class HeadlessRenderBackend(RenderBackend):
+    def render(self, game_state):
+        """
+        Discard the frame; used for simulations where no output is needed.
+        """
+
+
+# Per-frame header of the binary frame log: frame index, entity count, score.
+FRAME_HEADER = struct.Struct('<IId')
+FRAME_LOG_MAGIC = b'GLFL'
+FRAME_LOG_VERSION = 1
+
+
+def frame_size(entity_count):
+    """
+    Return the size in bytes of one binary frame log record.
+
+    :param entity_count: Number of entities (player included) in the frame.
+    """
+    # float32 x/y + float32 health + int8 action per entity
+    return FRAME_HEADER.size + entity_count * 13
+
+
+class BinaryFrameLogBackend(RenderBackend):
+    def __init__(self, path, buffer_size=1 << 20):
+        """
+        Write each frame as a compact binary record for offline replay.
+
+        Frames are packed into a preallocated buffer that is reused as long as the
+        entity count does not change, then handed to a buffered file.
+
+        :param path: Path of the frame log to create.
+        :param buffer_size: Size of the file write buffer in bytes.
+        """
+        self.file = open(path, 'wb', buffering=buffer_size)
+        self.file.write(FRAME_LOG_MAGIC + struct.pack('<H', FRAME_LOG_VERSION))
+        self.frame_index = 0
+        self.entity_count = None
+
+    def _allocate(self, entity_count):
+        self.entity_count = entity_count
+        self.buffer = bytearray(frame_size(entity_count))
+        offset = FRAME_HEADER.size
+        self.positions = np.frombuffer(self.buffer, np.float32, entity_count * 2, offset).reshape(entity_count, 2)
+        offset += self.positions.nbytes
+        self.health = np.frombuffer(self.buffer, np.float32, entity_count, offset)
+        offset += self.health.nbytes
+        self.actions = np.frombuffer(self.buffer, np.int8, entity_count, offset)
+        self.frame = memoryview(self.buffer)
+
+    def render(self, game_state):
+        """
+        Append the current frame to the log.
+        """
+        entities = game_state.entities
+        if len(entities.health) != self.entity_count:
+            self._allocate(len(entities.health))
+        FRAME_HEADER.pack_into(self.buffer, 0, self.frame_index, self.entity_count, game_state.score)
+        self.positions[...] = entities.positions
+        self.health[...] = entities.health
+        self.actions[...] = entities.actions
+        self.file.write(self.frame)
+        self.frame_index += 1
+
+    def close(self):
+        """
+        Flush and close the frame log.
+        """
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_frame_log(path):
+    """
+    Replay a binary frame log written by BinaryFrameLogBackend.
+
+    :param path: Path of the frame log.
+    :return: A generator of per-frame dictionaries (frame, score, positions, health, actions).
+    """
+    with open(path, 'rb') as log_file:
+        preamble = log_file.read(len(FRAME_LOG_MAGIC) + 2)
+        if preamble[:len(FRAME_LOG_MAGIC)] != FRAME_LOG_MAGIC:
+            raise ValueError(f"{path} is not a Glide frame log.")
+        while True:
+            header = log_file.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            frame_index, entity_count, score = FRAME_HEADER.unpack(header)
+            payload = log_file.read(frame_size(entity_count) - FRAME_HEADER.size)
+            positions_end = entity_count * 8
+            health_end = positions_end + entity_count * 4
+            yield {
+                "frame": frame_index,
+                "score": score,
+                "positions": np.frombuffer(payload, np.float32, entity_count * 2).reshape(entity_count, 2),
+                "health": np.frombuffer(payload, np.float32, entity_count, positions_end),
+                "actions": np.frombuffer(payload, np.int8, entity_count, health_end)
+            }
+
+
+# Action codes shared by the AI, the entity store and the renderers.
+ACTIONS = ("IDLE", "MOVE", "ATTACK")
+IDLE, MOVE, ATTACK = range(len(ACTIONS))
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+# Player inputs and the position change each one causes.
+INPUTS = ("UP", "DOWN", "LEFT", "RIGHT", "SHOOT")
+INPUT_DELTAS = np.array([(0, 1), (0, -1), (-1, 0), (1, 0), (0, 0)], dtype=float)
+
+# Row of the player in the entity store; enemies occupy the rows after it.
+PLAYER = 0
+
+
+def encode_actions(actions):
+    """
+    Convert a sequence of action names or codes into an int8 array of action codes.
+
+    :param actions: Action names ("ATTACK", "MOVE", "IDLE") or integer codes.
+    :return: A numpy array of action codes.
+    """
+    if isinstance(actions, np.ndarray):
+        if actions.dtype.kind in 'iu':
+            return actions.astype(np.int8, copy=False)
+        if actions.dtype.kind == 'U':
+            # Map names through a sorted lookup instead of one dict access per element
+            names = np.array(ACTIONS)
+            order = np.argsort(names)
+            positions = np.searchsorted(names[order], actions)
+            positions = np.minimum(positions, len(names) - 1)
+            if not np.all(names[order][positions] == actions):
+                raise KeyError(f"Unknown actions: {set(actions[names[order][positions] != actions])}")
+            return order[positions].astype(np.int8)
+    return np.array([ACTION_CODES[action] if isinstance(action, str) else action for action in actions],
+                    dtype=np.int8)
+
+
+# Game rules on position arrays, shared by a single world (GameState) and by WorldBatch,
+# whose arrays have an extra leading world axis.
+
+def move_enemies(enemy_positions, codes, rng):
+    """
+    Move every enemy whose action is MOVE one unit diagonally, in a random direction.
+
+    :param enemy_positions: Enemy positions, shaped (..., num_enemies, 2); updated in place.
+    :param codes: Action codes shaped (..., num_enemies).
+    :param rng: The numpy Generator choosing the directions.
+    """
+    movers = codes == MOVE
+    count = np.count_nonzero(movers)
+    if count:
+        enemy_positions[movers] += rng.choice((-1, 1), size=(count, 2))
+
+
+def apply_gravity(positions, mask=None):
+    """
+    Pull every airborne entity down by 0.1 units.
+
+    :param positions: Entity positions shaped (..., 2); updated in place.
+    :param mask: Optional boolean array broadcastable to positions[..., 1] selecting the
+                 entities to move.
+    """
+    y_positions = positions[..., 1]
+    airborne = y_positions > 0
+    if mask is not None:
+        airborne &= mask
+    np.subtract(y_positions, 0.1, out=y_positions, where=airborne)
+
+
+def collision_damage(enemy_positions, player_position):
+    """
+    Return the damage dealt to the player: 10 per overlapping enemy.
+
+    :param enemy_positions: Enemy positions shaped (..., num_enemies, 2).
+    :param player_position: Player position shaped (..., 2).
+    :return: The damage, shaped like the leading axes.
+    """
+    hits = PhysicsEngine.overlaps(enemy_positions, player_position[..., None, :])
+    return 10 * np.count_nonzero(hits, axis=-1)
+
+
+class EntityStore:
+    def __init__(self, num_enemies=5, rng=None):
+        """
+        Struct-of-arrays storage for the player (row 0) and every enemy (rows 1..n).
+
+        Positions, health and action codes are held in contiguous numpy arrays so that
+        gravity, movement and damage are whole-array operations. The three arrays are views
+        into one byte buffer, so the whole world can be snapshotted with a single copy.
+
+        :param num_enemies: Number of enemies to spawn.
+        :param rng: Optional numpy Generator used for spawning and enemy movement.
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
+        count = num_enemies + 1
+        self.buffer = np.zeros(count * 25, dtype=np.uint8)  # 16 bytes position + 8 health + 1 action
+        self.positions = self.buffer[:count * 16].view(np.float64).reshape(count, 2)
+        self.health = self.buffer[count * 16:count * 24].view(np.int64)
+        self.actions = self.buffer[count * 24:].view(np.int8)
+        self.health[:] = 50
+        self.health[PLAYER] = 100
+        self.positions[PLAYER + 1:] = self.rng.integers(-10, 11, size=(num_enemies, 2))
+
+    @property
+    def num_enemies(self):
+        return len(self.health) - 1
+
+    @property
+    def player_position(self):
+        return self.positions[PLAYER]
+
+    @property
+    def enemy_positions(self):
+        return self.positions[PLAYER + 1:]
+
+    @property
+    def enemy_health(self):
+        return self.health[PLAYER + 1:]
+
+    @property
+    def enemy_actions(self):
+        return self.actions[PLAYER + 1:]
+
+    def apply_actions(self, codes):
+        """
+        Apply one action code per enemy; moving enemies step diagonally by one unit.
+
+        :param codes: Integer action codes, one per enemy.
+        """
+        self.enemy_actions[:] = codes
+        move_enemies(self.enemy_positions, self.enemy_actions, self.rng)
+
+
+class EntityView:
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        """
+        Lightweight proxy exposing one row of an EntityStore as object attributes.
+
+        :param store: The EntityStore holding the entity.
+        :param index: Row of the entity in the store.
+        """
+        self._store = store
+        self._index = index
+
+    @property
+    def x_position(self):
+        return self._store.positions[self._index, 0]
+
+    @x_position.setter
+    def x_position(self, value):
+        self._store.positions[self._index, 0] = value
+
+    @property
+    def y_position(self):
+        return self._store.positions[self._index, 1]
+
+    @y_position.setter
+    def y_position(self, value):
+        self._store.positions[self._index, 1] = value
+
+    @property
+    def health(self):
+        return self._store.health[self._index]
+
+    @health.setter
+    def health(self, value):
+        self._store.health[self._index] = value
+
+    @property
+    def action(self):
+        return ACTIONS[self._store.actions[self._index]]
+
+    @action.setter
+    def action(self, value):
+        self._store.actions[self._index] = ACTION_CODES[value]
+
+
+class EnemyViews:
+    def __init__(self, store):
+        """
+        Read-only sequence of Enemy proxies, created on access rather than stored.
+
+        :param store: The EntityStore holding the enemies.
+        """
+        self._store = store
+
+    def __len__(self):
+        return self._store.num_enemies
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("enemy index out of range")
+        return Enemy(self._store, PLAYER + 1 + index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Enemy(self._store, PLAYER + 1 + index)
+
+
+class World:
+    def __init__(self, width=20, height=20):
+        """
+        Initialize the world bounds the entities move within.
+        """
+        self.width = width
+        self.height = height
+
+
+class Player(EntityView):
+    __slots__ = ()
+
+    def __init__(self, store=None, index=PLAYER):
+        super().__init__(store if store is not None else EntityStore(num_enemies=0), index)
 
     def move(self, direction):
         """
@@ -187,12 +1083,11 @@ class Player:
             self.x_position += 1
 
 
-class Enemy:
-    def __init__(self):
-        self.health = 50
-        self.x_position = random.randint(-10, 10)
-        self.y_position = random.randint(-10, 10)
-        self.action = "IDLE"
+class Enemy(EntityView):
+    __slots__ = ()
+
+    def __init__(self, store=None, index=PLAYER + 1):
+        super().__init__(store if store is not None else EntityStore(num_enemies=1), index)
 
     def perform_action(self, action):
         """
@@ -202,10 +1097,318 @@ class Enemy:
         """
         self.action = action
         if action == "MOVE":
-            self.x_position += random.choice([-1, 1])  # Move the enemy
-            self.y_position += random.choice([-1, 1])  # Move the enemy
-        elif action == "ATTACK":
-            print(f"Enemy at ({self.x_position}, {self.y_position}) attacks!")
+            self.x_position += self._store.rng.choice((-1, 1))  # Move the enemy
+            self.y_position += self._store.rng.choice((-1, 1))  # Move the enemy
+        # Attacks are recorded in the action code and reported by the render backend
+
+
+class WorldBatch:
+    def __init__(self, num_worlds, num_enemies=5, rng=None, policy=None):
+        """
+        Many independent game worlds stepped in lockstep as whole-array operations.
+
+        Each world follows the GamingEngine rules (the same move_enemies, apply_gravity and
+        collision_damage functions), with random player inputs and an NPC policy deciding
+        for the enemies of every world in one call. A world ends when its player dies
+        instead of being reset; ended worlds no longer change.
+
+        :param num_worlds: Number of worlds to simulate.
+        :param num_enemies: Number of enemies per world.
+        :param rng: A numpy Generator (default is an unseeded generator).
+        :param policy: NPCPolicy under evaluation (default is a RandomPolicy drawing from rng).
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.policy = policy if policy is not None else RandomPolicy(self.rng)
+        self.player_position = np.zeros((num_worlds, 2))
+        self.player_health = np.full(num_worlds, 100, dtype=np.int64)
+        self.enemy_positions = self.rng.integers(-10, 11, size=(num_worlds, num_enemies, 2)).astype(float)
+        self.enemy_health = np.full((num_worlds, num_enemies), 50, dtype=np.int64)
+        self.frames_survived = np.zeros(num_worlds, dtype=np.int64)
+        self.alive = np.ones(num_worlds, dtype=bool)
+
+    def step(self):
+        """
+        Advance every live world by one frame.
+        """
+        alive = self.alive
+
+        # Inputs and AI decisions for every world at once
+        inputs = self.rng.integers(0, len(INPUTS), size=len(alive))
+        self.player_position[alive] += INPUT_DELTAS[inputs[alive]]
+        codes = np.where(alive[:, None], encode_actions(self.policy.decide(self)), IDLE)
+        move_enemies(self.enemy_positions, codes, self.rng)
+
+        # Physics and game over
+        apply_gravity(self.player_position, alive)
+        apply_gravity(self.enemy_positions, alive[:, None])
+        self.player_health -= collision_damage(self.enemy_positions, self.player_position) * alive
+        self.frames_survived += alive
+        self.alive &= self.player_health > 0
+
+    def run(self, max_frames):
+        """
+        Step until every world has ended or max_frames have elapsed.
+
+        :param max_frames: Maximum number of frames per world.
+        :return: A dictionary of per-world result arrays.
+        """
+        for _ in range(max_frames):
+            if not self.alive.any():
+                break
+            self.step()
+        return {
+            "frames_survived": self.frames_survived,
+            "health": self.player_health
+        }
+
+
+def _run_world_shard(num_worlds, num_enemies, seed_sequence, max_frames, policy, batch_factory):
+    rng = np.random.default_rng(seed_sequence)
+    if batch_factory is not None:
+        return batch_factory(num_worlds, rng).run(max_frames)
+    if policy is not None:
+        policy = policy.spawn(seed_sequence.spawn(1)[0])
+    return WorldBatch(num_worlds, num_enemies, rng, policy).run(max_frames)
+
+
+def summarize_results(results):
+    """
+    Aggregate per-world result arrays into summary statistics.
+
+    :param results: A dictionary of per-world result arrays.
+    :return: A dictionary with count, mean, std, min and max for each result.
+    """
+    summary = {}
+    for name, values in results.items():
+        summary[name] = {
+            "count": int(len(values)),
+            "mean": float(np.mean(values)),
+            "std": float(np.std(values)),
+            "min": float(np.min(values)),
+            "max": float(np.max(values))
+        }
+    return summary
+
+
+class SimulationFarm:
+    def __init__(self, num_worlds, num_enemies=5, seed=None, workers=1, policy=None, batch_factory=None):
+        """
+        Headless batch runner that evaluates an NPC policy on thousands of independent, seeded worlds.
+
+        With one worker every world runs in lockstep in this process; with more, the
+        worlds are split into shards that each run in lockstep in a process pool.
+
+        :param num_worlds: Total number of worlds to simulate.
+        :param num_enemies: Number of enemies per world.
+        :param seed: Seed for the world generators; each shard gets an independent child seed.
+        :param workers: Number of worker processes.
+        :param policy: NPCPolicy to evaluate (default is a RandomPolicy seeded per shard).
+                       Every shard gets its own copy (see NPCPolicy.spawn), so it must be
+                       picklable when workers > 1.
+        :param batch_factory: Optional callable(num_worlds, rng) building another kind of
+                              lockstep batch in place of WorldBatch; its run(max_frames) must
+                              return per-world result arrays including 'frames_survived'.
+                              num_enemies and policy are then left to the factory.
+        """
+        self.num_worlds = num_worlds
+        self.num_enemies = num_enemies
+        self.seed = seed
+        self.workers = max(1, workers)
+        self.policy = policy
+        self.batch_factory = batch_factory
+        self.stats = {}
+
+    def run(self, max_frames=1000):
+        """
+        Simulate every world and aggregate the results.
+
+        :param max_frames: Maximum number of frames per world.
+        :return: A dictionary of summary statistics for every per-world result (for WorldBatch,
+                 frames survived and health).
+        """
+        start_time = time.perf_counter()
+        shard_sizes = [len(shard) for shard in np.array_split(np.arange(self.num_worlds), self.workers)]
+        shard_sizes = [size for size in shard_sizes if size > 0]
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(len(shard_sizes))
+
+        if len(shard_sizes) == 1:
+            shard_results = [_run_world_shard(shard_sizes[0], self.num_enemies, seed_sequences[0], max_frames,
+                                              self.policy, self.batch_factory)]
+        else:
+            with ProcessPoolExecutor(max_workers=len(shard_sizes)) as executor:
+                futures = [executor.submit(_run_world_shard, size, self.num_enemies, seed_sequence, max_frames,
+                                           self.policy, self.batch_factory)
+                           for size, seed_sequence in zip(shard_sizes, seed_sequences)]
+                shard_results = [future.result() for future in futures]
+
+        results = {name: np.concatenate([shard[name] for shard in shard_results]) for name in shard_results[0]}
+        elapsed_time = time.perf_counter() - start_time
+        frames = int(results["frames_survived"].sum())
+        self.stats = {
+            "worlds": self.num_worlds,
+            "shards": len(shard_sizes),
+            "frames_simulated": frames,
+            "elapsed_seconds": elapsed_time,
+            "frames_per_second": frames / elapsed_time if elapsed_time > 0 else float('inf')
+        }
+        self.results = results
+        return summarize_results(results)
+
+
+# Journal record header: frame, input code, player dx/dy, health delta, score delta.
+JOURNAL_RECORD = struct.Struct('<IBffii')
+JOURNAL_MAGIC = b'GLRJ'
+JOURNAL_VERSION = 3
+# Version 2 header, after the seed: start frame, score, snapshot buffer length, RNG states length.
+JOURNAL_START = struct.Struct('<QqII')
+
+
+class ReplayJournal:
+    def __init__(self, path, num_enemies, seed, buffer_size=1 << 20, start_frame=0, snapshot=None):
+        """
+        Append-only binary journal of a GamingEngine session with one fixed-size record per frame.
+
+        The header holds the session seed, the number of enemies and, when the journal does
+        not start with the session, the frame it starts at and a snapshot of the state at that
+        frame; each record holds the player input, the action code of every enemy and the
+        resulting player state deltas.
+
+        :param path: Path of the journal file to create.
+        :param num_enemies: Number of enemies in the recorded world.
+        :param seed: Seed (SeedSequence entropy) of the recorded engine: an int or a sequence of
+                     ints, stored as JSON.
+        :param buffer_size: Size of the file write buffer in bytes.
+        :param start_frame: Frame number of the first record.
+        :param snapshot: GameSnapshot of the engine before the first record (None to replay
+                         from the seeded initial state).
+        """
+        self.num_enemies = num_enemies
+        if isinstance(seed, np.ndarray):
+            seed = seed.tolist()
+        seed_bytes = json.dumps(seed, default=int).encode()  # default converts numpy integers
+        if snapshot is None:
+            buffer_bytes, score, state_bytes = b'', 0, b''
+        else:
+            buffer_bytes, score = snapshot.buffer.tobytes(), snapshot.score
+            state_bytes = json.dumps(snapshot.rng_states).encode()
+        self.file = open(path, 'wb', buffering=buffer_size)
+        self.file.write(JOURNAL_MAGIC + struct.pack('<HIH', JOURNAL_VERSION, num_enemies, len(seed_bytes)) + seed_bytes)
+        self.file.write(JOURNAL_START.pack(start_frame, score, len(buffer_bytes), len(state_bytes)))
+        self.file.write(buffer_bytes + state_bytes)
+        self.record_buffer = bytearray(JOURNAL_RECORD.size + num_enemies)
+        self.record_actions = np.frombuffer(self.record_buffer, np.int8, num_enemies, JOURNAL_RECORD.size)
+
+    def record(self, frame, input_code, ai_actions, player_dx, player_dy, health_delta, score_delta):
+        """
+        Append one frame to the journal.
+        """
+        JOURNAL_RECORD.pack_into(self.record_buffer, 0, frame, input_code, player_dx, player_dy,
+                                 health_delta, score_delta)
+        self.record_actions[:] = ai_actions
+        self.file.write(self.record_buffer)
+
+    def close(self):
+        """
+        Flush and close the journal.
+        """
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _read_journal_header(journal_file, path):
+    preamble = journal_file.read(len(JOURNAL_MAGIC) + 8)
+    if preamble[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+        raise ValueError(f"{path} is not a Glide replay journal.")
+    version, num_enemies, seed_length = struct.unpack('<HIH', preamble[len(JOURNAL_MAGIC):])
+    if version > JOURNAL_VERSION:
+        raise ValueError(f"{path} was written by a newer journal version ({version}).")
+    seed_bytes = journal_file.read(seed_length)
+    seed = json.loads(seed_bytes) if version >= 3 else int.from_bytes(seed_bytes, 'little')
+    start_frame, snapshot = 0, None
+    if version >= 2:
+        start_frame, score, buffer_length, state_length = JOURNAL_START.unpack(journal_file.read(JOURNAL_START.size))
+        if buffer_length:
+            buffer = np.frombuffer(journal_file.read(buffer_length), dtype=np.uint8).copy()
+            snapshot = GameSnapshot(buffer, score, json.loads(journal_file.read(state_length)), start_frame)
+    return seed, num_enemies, start_frame, snapshot
+
+
+def read_journal(path):
+    """
+    Load a replay journal.
+
+    :param path: Path of the journal file.
+    :return: The session seed, the number of enemies and a structured array of frame records.
+    """
+    with open(path, 'rb') as journal_file:
+        seed, num_enemies, _, _ = _read_journal_header(journal_file, path)
+        record_type = np.dtype([
+            ('frame', '<u4'), ('input', 'u1'), ('player_dx', '<f4'), ('player_dy', '<f4'),
+            ('health_delta', '<i4'), ('score_delta', '<i4'), ('ai_actions', 'i1', (num_enemies,))
+        ])
+        # Fixed-size records map straight onto a structured array
+        records = np.fromfile(journal_file, dtype=record_type)
+    return seed, num_enemies, records
+
+
+def read_journal_start(path):
+    """
+    Read where a replay journal starts.
+
+    :param path: Path of the journal file.
+    :return: The frame of the first record and the GameSnapshot of the state before it
+             (None when the journal starts from the seeded initial state).
+    """
+    with open(path, 'rb') as journal_file:
+        _, _, start_frame, snapshot = _read_journal_header(journal_file, path)
+    return start_frame, snapshot
+
+
+def replay_journal(path, verify=True):
+    """
+    Re-execute a recorded session headlessly and as fast as possible.
+
+    :param path: Path of the journal file.
+    :param verify: Compare every frame's state deltas with the recorded ones.
+    :return: A dictionary with the replay statistics and the number of diverging frames.
+    """
+    seed, num_enemies, records = read_journal(path)
+    start_frame, snapshot = read_journal_start(path)
+    engine = GamingEngine(render_backend=HeadlessRenderBackend(), seed=seed, num_enemies=num_enemies)
+    if snapshot is not None:
+        engine.game_state.restore(snapshot)
+        # Inputs and AI actions come from the journal; only the generators both engines have matter
+        for name, generator in engine.generators().items():
+            if name in snapshot.rng_states:
+                generator.bit_generator.state = snapshot.rng_states[name]
+        engine.frame = start_frame
+    player = engine.game_state.player
+    mismatches = 0
+    start_time = time.perf_counter()
+    for record in records:
+        before = (player.x_position, player.y_position, player.health, engine.game_state.score)
+        engine.step(INPUTS[record['input']], record['ai_actions'])
+        player = engine.game_state.player  # The game may have been reset
+        if verify:
+            expected = (record['player_dx'], record['player_dy'], record['health_delta'], record['score_delta'])
+            actual = (player.x_position - before[0], player.y_position - before[1],
+                      player.health - before[2], engine.game_state.score - before[3])
+            if not np.allclose(expected, actual, atol=1e-4):
+                mismatches += 1
+    elapsed_time = time.perf_counter() - start_time
+    return {
+        "frames": len(records),
+        "elapsed_seconds": elapsed_time,
+        "frames_per_second": len(records) / elapsed_time if elapsed_time > 0 else float('inf'),
+        "mismatches": mismatches,
+        "engine": engine
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,354 @@
+# glide_system.py
+
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+from .scanner import DataScanner
+from .processor import DataProcessor
+from .decision_maker import DecisionMaker, LinUCBPolicy
+
+
+class PipelineStage:
+    def __init__(self, name, function=None, workers=1, factory=None):
+        """
+        One stage of a Glide pipeline.
+
+        :param name: Name of the stage, used in metrics.
+        :param function: Callable applied to every item; returning None drops the item.
+                         Must be picklable when the pipeline runs stages in processes, and is
+                         shared by all of the stage's workers when it runs them in threads.
+        :param workers: Number of workers running this stage concurrently.
+        :param factory: Zero-argument callable building the function, called once per worker,
+                        for stateful functions that must not be shared between workers.
+                        Give either function or factory.
+        """
+        if workers < 1:
+            raise ValueError("A stage needs at least one worker.")
+        if (function is None) == (factory is None):
+            raise ValueError("Give either a function or a factory.")
+        self.name = name
+        self.function = function
+        self.factory = factory
+        self.workers = workers
+
+    def build(self):
+        """
+        Return the function one worker of this stage applies.
+        """
+        return self.factory() if self.factory is not None else self.function
+
+
+class StageCounters:
+    def __init__(self, context):
+        """
+        Shared counters for one stage, usable from threads and from processes.
+
+        :param context: The multiprocessing context the counters are created in.
+        """
+        self.items = context.Value('q', 0)
+        self.errors = context.Value('q', 0)
+        self.busy_seconds = context.Value('d', 0.0)
+        self.finished_workers = context.Value('i', 0)
+        self.flushed_workers = context.Value('i', 0)
+        self.max_queue_depth = context.Value('i', 0)
+
+
+def queue_depth(work_queue):
+    """
+    Return the number of items waiting in a queue, or None if the platform cannot tell.
+    """
+    try:
+        return work_queue.qsize()
+    except NotImplementedError:  # multiprocessing queues on macOS
+        return None
+
+
+def _stage_worker(function, workers, input_queue, output_queue, downstream_workers, counters, downstream_counters):
+    """
+    Worker loop shared by thread and process workers.
+
+    None on the input queue is the end-of-stream marker; the last worker of a stage to see
+    it forwards one marker to every worker of the next stage.
+    """
+    while True:
+        item = input_queue.get()
+        if item is None:
+            with counters.finished_workers.get_lock():
+                counters.finished_workers.value += 1
+                last_worker = counters.finished_workers.value == workers
+            if last_worker:
+                # Process queues send from a background thread, so wait until the other
+                # workers' results are flushed before the markers can overtake them
+                while counters.flushed_workers.value < workers - 1:
+                    time.sleep(0.001)
+                for _ in range(downstream_workers):
+                    output_queue.put(None)
+            else:
+                if hasattr(output_queue, 'join_thread'):
+                    output_queue.close()
+                    output_queue.join_thread()
+                with counters.flushed_workers.get_lock():
+                    counters.flushed_workers.value += 1
+            return
+
+        start = time.perf_counter()
+        try:
+            result = function(item)
+        except Exception as e:
+            print(f"Error in pipeline stage: {e}")
+            with counters.errors.get_lock():
+                counters.errors.value += 1
+            continue
+        finally:
+            with counters.busy_seconds.get_lock():
+                counters.busy_seconds.value += time.perf_counter() - start
+
+        with counters.items.get_lock():
+            counters.items.value += 1
+        if result is not None:
+            output_queue.put(result)
+            if downstream_counters is not None:
+                depth = queue_depth(output_queue)
+                if depth is not None and depth > downstream_counters.max_queue_depth.value:
+                    downstream_counters.max_queue_depth.value = depth
+
+
+class ScanStage:
+    def __init__(self, scanner=None):
+        self.scanner = scanner if scanner else DataScanner()
+
+    def __call__(self, batch):
+        return self.scanner.scan_numeric_data(batch)
+
+
+class ProcessStage:
+    def __init__(self, processor=None):
+        self.processor = processor if processor else DataProcessor()
+
+    def __call__(self, scanned_data):
+        if not scanned_data:
+            return None
+        self.processor.scan_data(scanned_data)
+        self.processor.filter_data(lambda item: isinstance(item, (int, float)))
+        return self.processor.analyze_numeric_data()
+
+
+class DecideStage:
+    def __init__(self, decision_maker=None, lock=None):
+        """
+        Decide on every item's statistics with a DecisionMaker.
+
+        :param decision_maker: The DecisionMaker (default is one with an untrained model, which
+                               falls back to the rules).
+        :param lock: Optional lock held while using the model, when a LearnStage updates it.
+        """
+        self.decision_maker = decision_maker if decision_maker else DecisionMaker()
+        self.lock = lock
+
+    def __call__(self, stats):
+        scenario = {'factor_1': stats['mean'], 'factor_2': stats['median'], 'factor_3': stats['std_dev']}
+        with self.lock if self.lock is not None else nullcontext():
+            # Fall back to the rules until the decision model has been trained
+            if hasattr(self.decision_maker.model, 'n_features_in_'):
+                decision = self.decision_maker.make_decision(scenario)
+            else:
+                decision = self.decision_maker.rule_based_decision(scenario)
+        return scenario, decision
+
+
+class LearnStage:
+    def __init__(self, decision_maker, lock=None, feedback_function=None, seed=None):
+        """
+        Collect feedback on every decision and feed it back to the decide stage's model.
+
+        :param decision_maker: The DecisionMaker of the decide stage; its model must learn
+                               online (e.g. LinUCBPolicy) for the feedback to be used.
+        :param lock: The lock shared with the DecideStage.
+        :param feedback_function: Callable(scenario, decision) returning the reward (1 for
+                                  success, 0 for failure); default simulates a success 80% of
+                                  the time, like FeedbackLoop.collect_feedback.
+        :param seed: Seed of the simulated feedback.
+        """
+        self.decision_maker = decision_maker
+        self.lock = lock
+        self.feedback_function = feedback_function
+        self.rng = np.random.default_rng(seed)
+
+    def __call__(self, item):
+        scenario, decision = item
+        if self.feedback_function is not None:
+            feedback = self.feedback_function(scenario, decision)
+        else:
+            feedback = int(self.rng.random() < 0.8)
+        if hasattr(self.decision_maker.model, 'update'):
+            with self.lock if self.lock is not None else nullcontext():
+                self.decision_maker.record_feedback(scenario, [decision], [feedback])
+        return decision, feedback
+
+
+def default_stages(seed=None):
+    """
+    Build the standard scan -> process -> decide -> learn pipeline from the Glide components.
+
+    Scanning and processing hold per-item state, so every worker gets its own scanner and
+    processor. The decide and learn stages share one online LinUCBPolicy, guarded by a lock:
+    every decision is learned from as soon as its feedback arrives. Because the model is
+    shared in memory, these stages need the thread executor.
+
+    :param seed: Seed of the simulated feedback.
+    """
+    decision_maker = DecisionMaker(LinUCBPolicy())
+    lock = threading.Lock()
+    return [
+        PipelineStage('scan', factory=ScanStage),
+        PipelineStage('process', factory=ProcessStage),
+        PipelineStage('decide', DecideStage(decision_maker, lock)),
+        PipelineStage('learn', LearnStage(decision_maker, lock, seed=seed))
+    ]
+
+
+class GlideSystem:
+    def __init__(self, stages=None, queue_size=64, executor='thread'):
+        """
+        Compose Glide components into a pipeline whose stages run concurrently.
+
+        Each stage runs on its own worker(s) and stages are connected by bounded queues,
+        so scanning, processing, deciding and learning overlap, and a slow stage applies
+        back-pressure upstream instead of letting queues grow without limit. With more
+        than one worker per stage, output order is not preserved. In process mode, large
+        frames should travel through a shared_frames.SharedFrameRing so that only small
+        descriptors are pickled between stages.
+
+        :param stages: List of PipelineStage (default is scan -> process -> decide -> learn,
+                       see default_stages).
+        :param queue_size: Capacity of each queue between stages.
+        :param executor: 'thread' or 'process'.
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError("executor must be 'thread' or 'process'.")
+        if executor == 'process' and not stages:
+            raise ValueError("The default stages share a model in memory; run them with the thread executor.")
+        self.stages = stages if stages else default_stages()
+        self.queue_size = queue_size
+        self.executor = executor
+        self.context = multiprocessing.get_context()
+        self.counters = []
+        self.queues = []
+        self.elapsed_time = None
+        self.feed_error = None
+
+    def _make_queue(self, maxsize):
+        if self.executor == 'process':
+            return self.context.Queue(maxsize)
+        return queue.Queue(maxsize)
+
+    def _start_workers(self):
+        self.counters = [StageCounters(self.context) for _ in self.stages]
+        self.queues = [self._make_queue(self.queue_size) for _ in self.stages]
+        self.output_queue = self._make_queue(0)  # Unbounded, drained by run()
+
+        workers = []
+        for index, stage in enumerate(self.stages):
+            is_last = index == len(self.stages) - 1
+            arguments = [
+                None,  # The stage function, built per worker below
+                stage.workers,
+                self.queues[index],
+                self.output_queue if is_last else self.queues[index + 1],
+                1 if is_last else self.stages[index + 1].workers,
+                self.counters[index],
+                None if is_last else self.counters[index + 1]
+            ]
+            for worker_index in range(stage.workers):
+                name = f"glide-{stage.name}-{worker_index}"
+                arguments[0] = stage.build()
+                if self.executor == 'process':
+                    worker = self.context.Process(target=_stage_worker, args=tuple(arguments), name=name, daemon=True)
+                else:
+                    worker = threading.Thread(target=_stage_worker, args=tuple(arguments), name=name, daemon=True)
+                worker.start()
+                workers.append(worker)
+        return workers
+
+    def _feed(self, source):
+        first_queue, first_counters = self.queues[0], self.counters[0]
+        try:
+            for item in source:
+                first_queue.put(item)  # Blocks while the first stage is saturated
+                depth = queue_depth(first_queue)
+                if depth is not None and depth > first_counters.max_queue_depth.value:
+                    first_counters.max_queue_depth.value = depth
+        except BaseException as e:
+            self.feed_error = e  # Re-raised by run() once the pipeline has drained
+        finally:
+            # Always end the stream, or the workers and run() would wait forever
+            for _ in range(self.stages[0].workers):
+                first_queue.put(None)
+
+    def run(self, source):
+        """
+        Push every item of the source through the pipeline and wait for it to drain.
+
+        :param source: An iterable of items for the first stage (e.g. batches of raw data).
+        :return: A list with the output of the last stage for every item that made it through.
+        :raises: The source's exception, if iterating over it failed; the items read before
+                 the failure are still processed first.
+        """
+        start_time = time.perf_counter()
+        self.feed_error = None
+        workers = self._start_workers()
+        feeder = threading.Thread(target=self._feed, args=(source,), name="glide-feeder", daemon=True)
+        feeder.start()
+
+        results = []
+        while True:
+            result = self.output_queue.get()
+            if result is None:
+                break
+            results.append(result)
+
+        feeder.join()
+        for worker in workers:
+            worker.join()
+        self.elapsed_time = time.perf_counter() - start_time
+        if self.feed_error is not None:
+            raise self.feed_error
+        return results
+
+    def metrics(self):
+        """
+        Return per-stage throughput and queue statistics of the last run.
+
+        :return: A dictionary keyed by stage name.
+        """
+        metrics = {}
+        for stage, counters, stage_queue in zip(self.stages, self.counters, self.queues):
+            items = counters.items.value
+            busy_seconds = counters.busy_seconds.value
+            metrics[stage.name] = {
+                "workers": stage.workers,
+                "items": items,
+                "errors": counters.errors.value,
+                "busy_seconds": busy_seconds,
+                "throughput_per_second": items / self.elapsed_time if self.elapsed_time else 0.0,
+                "capacity_per_second": items / busy_seconds * stage.workers if busy_seconds > 0 else None,
+                "queue_depth": queue_depth(stage_queue),
+                "max_queue_depth": counters.max_queue_depth.value
+            }
+        return metrics
+
+
+# Example usage
+if __name__ == "__main__":
+    import numpy as np
+
+    glide_system = GlideSystem()
+    batches = (list(np.random.rand(100)) for _ in range(20))
+    results = glide_system.run(batches)
+    print(f"Completed {len(results)} pipeline runs.")
+    print("Pipeline metrics:", glide_system.metrics())
@@ -0,0 +1,237 @@
+# out_of_core.py
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of the current process in megabytes.
+
+    This is the high-water mark over the whole lifetime of the process, not of any one
+    shard or training run.
+
+    :return: Peak RSS in MB, or None if the platform does not expose it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+class ShardReader:
+    def __init__(self, shard_paths, chunk_size=50000, label_column='label'):
+        """
+        Stream labelled rows from on-disk shards in fixed-size chunks.
+
+        NPY shards are memory-mapped and hold the features followed by the label
+        in the last column (the layout used by feedback_loop.DataCollector).
+        Parquet shards hold one column per feature plus a label column (the layout
+        used by adaptive_learning.DataCollector) and require pyarrow.
+
+        :param shard_paths: Paths to .npy or .parquet shard files.
+        :param chunk_size: Maximum number of rows held in memory per chunk.
+        :param label_column: Name of the label column in Parquet shards.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer.")
+        self.shard_paths = list(shard_paths)
+        self.chunk_size = chunk_size
+        self.label_column = label_column
+
+    def iter_shard(self, path):
+        """
+        Yield (features, labels) chunks from a single shard.
+
+        :param path: Path to a .npy or .parquet shard.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.npy':
+            yield from self._iter_npy(path)
+        elif extension == '.parquet':
+            yield from self._iter_parquet(path)
+        else:
+            raise ValueError(f"Unsupported shard format: {path}")
+
+    def __iter__(self):
+        """
+        Yield (features, labels) chunks from every shard in order.
+        """
+        for path in self.shard_paths:
+            yield from self.iter_shard(path)
+
+    def _iter_npy(self, path):
+        data = np.load(path, mmap_mode='r')
+        if data.ndim != 2 or data.shape[1] < 2:
+            raise ValueError(f"Shard {path} must be a 2-D array of features followed by a label column.")
+        for start in range(0, data.shape[0], self.chunk_size):
+            # np.array copies only this chunk out of the memory map
+            chunk = np.array(data[start:start + self.chunk_size])
+            yield chunk[:, :-1], chunk[:, -1]
+
+    def _iter_parquet(self, path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet shards requires pyarrow to be installed.") from e
+
+        parquet_file = pq.ParquetFile(path)
+        feature_columns = [name for name in parquet_file.schema_arrow.names if name != self.label_column]
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_size):
+            features = np.column_stack([batch.column(name).to_numpy() for name in feature_columns])
+            labels = batch.column(self.label_column).to_numpy()
+            yield features, labels
+
+
+class OutOfCoreTrainer:
+    def __init__(self, mode='incremental', model=None, classes=(0, 1), chunk_size=50000,
+                 trees_per_shard=10, max_rows_per_shard=200000, trace_memory=False):
+        """
+        Train a model on datasets larger than RAM by streaming shards from disk.
+
+        In 'incremental' mode every chunk is passed to the model's partial_fit.
+        In 'bagging' mode a small random forest is fitted on each shard (capped at
+        max_rows_per_shard rows) and the trees are merged into a single forest.
+        Either way, at most one chunk (or one capped shard) is resident at a time.
+
+        :param mode: 'incremental' or 'bagging'.
+        :param model: Incremental learner with partial_fit (default SGDClassifier).
+        :param classes: All class labels, required up front by partial_fit.
+        :param chunk_size: Number of rows read from disk at a time.
+        :param trees_per_shard: Number of trees fitted per shard in bagging mode.
+        :param max_rows_per_shard: Row cap per shard in bagging mode.
+        :param trace_memory: Measure the peak memory allocated while training on each shard
+                             with tracemalloc (slows training down).
+        """
+        if mode not in ('incremental', 'bagging'):
+            raise ValueError("mode must be 'incremental' or 'bagging'.")
+        self.mode = mode
+        self.model = model
+        self.classes = np.asarray(classes)
+        self.chunk_size = chunk_size
+        self.trees_per_shard = trees_per_shard
+        self.max_rows_per_shard = max_rows_per_shard
+        self.trace_memory = trace_memory
+        self.stats = {}
+        self.shard_stats = []
+
+    def train(self, shard_paths):
+        """
+        Train on every shard and record throughput and memory statistics.
+
+        stats holds the totals of the run, with the peak RSS of the whole process;
+        shard_stats holds the rows, time and (with trace_memory) peak traced memory of
+        every shard.
+
+        :param shard_paths: Paths to .npy or .parquet shard files.
+        :return: The trained model.
+        """
+        reader = ShardReader(shard_paths, chunk_size=self.chunk_size)
+        self.shard_stats = []
+        start_time = time.perf_counter()
+        if self.mode == 'incremental':
+            model, rows = self._train_incremental(reader)
+        else:
+            model, rows = self._train_bagging(reader)
+        elapsed_time = time.perf_counter() - start_time
+
+        self.model = model
+        self.stats = {
+            "rows": rows,
+            "shards": len(reader.shard_paths),
+            "training_time_seconds": elapsed_time,
+            "rows_per_second": rows / elapsed_time if elapsed_time > 0 else float('inf'),
+            "process_peak_rss_mb": peak_rss_mb()
+        }
+        return model
+
+    @contextmanager
+    def _measure_shard(self, path):
+        # Yields the shard's statistics for the caller to add its rows to
+        shard = {"path": path, "rows": 0}
+        started_tracing = False
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started_tracing = True
+        start_time = time.perf_counter()
+        try:
+            yield shard
+        finally:
+            shard["training_time_seconds"] = time.perf_counter() - start_time
+            if self.trace_memory:
+                shard["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                if started_tracing:
+                    tracemalloc.stop()
+            self.shard_stats.append(shard)
+
+    def _train_incremental(self, reader):
+        model = self.model
+        if model is None:
+            from sklearn.linear_model import SGDClassifier
+            model = SGDClassifier(loss='log_loss')
+        if not hasattr(model, 'partial_fit'):
+            raise ValueError("Incremental mode requires a model that implements partial_fit.")
+
+        rows = 0
+        for path in reader.shard_paths:
+            with self._measure_shard(path) as shard:
+                for features, labels in reader.iter_shard(path):
+                    model.partial_fit(features, labels, classes=self.classes)
+                    shard["rows"] += len(labels)
+            rows += shard["rows"]
+        return model, rows
+
+    def _train_bagging(self, reader):
+        from sklearn.ensemble import RandomForestClassifier
+
+        forest = None
+        rows = 0
+        for path in reader.shard_paths:
+            with self._measure_shard(path) as shard:
+                features, labels = self._read_capped_shard(reader, path)
+                if len(labels) == 0:
+                    continue
+                shard_forest = RandomForestClassifier(n_estimators=self.trees_per_shard)
+                shard_forest.fit(features, labels)
+                shard["rows"] = len(labels)
+            rows += len(labels)
+
+            if forest is None:
+                forest = shard_forest
+            elif not np.array_equal(forest.classes_, shard_forest.classes_):
+                raise ValueError(f"Shard {path} does not contain every class; cannot merge its trees.")
+            else:
+                forest.estimators_ += shard_forest.estimators_
+                forest.n_estimators = len(forest.estimators_)
+
+        if forest is None:
+            raise ValueError("No rows found in the provided shards.")
+        return forest, rows
+
+    def _read_capped_shard(self, reader, path):
+        feature_chunks, label_chunks = [], []
+        remaining = self.max_rows_per_shard
+        for features, labels in reader.iter_shard(path):
+            feature_chunks.append(features[:remaining])
+            label_chunks.append(labels[:remaining])
+            remaining -= len(label_chunks[-1])
+            if remaining <= 0:
+                break
+        if not label_chunks:
+            return np.empty((0, 0)), np.empty(0)
+        return np.concatenate(feature_chunks), np.concatenate(label_chunks)
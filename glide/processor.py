@@ -2,7 +2,6 @@
 
 import time
 import numpy as np
-import cv2  # OpenCV for image processing
 from typing import List, Any
 
 class DataProcessor:
@@ -86,6 +85,7 @@ class DataProcessor:
         :return: Processed image with extracted features.
         """
         print("Processing image data...")
+        import cv2  # OpenCV for image processing
         try:
             # Read image using OpenCV
             image = cv2.imread(image_path)
@@ -0,0 +1,215 @@
+# profiler.py
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+
+
+class _Span:
+    __slots__ = ('thread_state', 'name', 'start', 'child_time')
+
+    def __init__(self, thread_state, name):
+        self.thread_state = thread_state
+        self.name = name
+
+    def __enter__(self):
+        self.child_time = 0
+        self.thread_state.stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        state = self.thread_state
+        stack = state.stack
+        path = ";".join(span.name for span in stack)
+        stack.pop()
+        duration = end - self.start
+        if stack:
+            stack[-1].child_time += duration
+        self_time = duration - self.child_time
+        # (stack path, start ns, duration ns, self time ns)
+        state.records.append((path, self.start, duration, self_time))
+        totals = state.totals.get(path)
+        if totals is None:
+            totals = state.totals[path] = [0, 0, 0]
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] += self_time
+        return False
+
+
+class _ThreadState:
+    def __init__(self, max_records):
+        self.stack = []
+        self.records = deque(maxlen=max_records)  # Most recent spans, for the timeline
+        self.totals = {}  # Stack path -> [count, total ns, self ns] over every span
+        self.thread_id = threading.get_ident()
+        self.thread_name = threading.current_thread().name
+
+
+def span(profiler, name):
+    """
+    Return a span of an optional profiler, so instrumented code does not have to check for one.
+
+    :param profiler: A SpanProfiler, or None when profiling is off.
+    :param name: Name of the span.
+    :return: The profiler's span context manager, or a no-op context manager.
+    """
+    return profiler.span(name) if profiler else nullcontext()
+
+
+class SpanProfiler:
+    def __init__(self, max_records=100000):
+        """
+        Lightweight, opt-in hierarchical latency profiler.
+
+        Code marks stages with `with profiler.span("name"):` or the `@profiler.profile()` decorator.
+        Spans nest per thread, and each thread records finished spans in its own buffers, so
+        recording takes no lock. The buffers can be exported as Chrome trace JSON
+        (chrome://tracing, Perfetto) or as collapsed stacks for flame-graph tools.
+
+        Memory stays bounded in long-running sessions: each thread keeps only its most recent
+        spans for the timeline, while per-path counts and times are aggregated in place, so the
+        summary and collapsed stacks still cover every span.
+
+        :param max_records: Number of most recent spans kept per thread for the trace export.
+        """
+        self.max_records = max_records
+        self.local = threading.local()
+        self.thread_states = []
+        self.registry_lock = threading.Lock()  # Only taken once per thread, on its first span
+        self.pid = os.getpid()
+
+    def _thread_state(self):
+        state = getattr(self.local, 'state', None)
+        if state is None:
+            state = self.local.state = _ThreadState(self.max_records)
+            with self.registry_lock:
+                self.thread_states.append(state)
+        return state
+
+    def span(self, name):
+        """
+        Return a context manager timing the enclosed block as a span nested in the current one.
+
+        :param name: Name of the span (a stage name, e.g. "physics").
+        """
+        return _Span(self._thread_state(), name)
+
+    def profile(self, name=None):
+        """
+        Decorator recording every call of a function as a span.
+
+        :param name: Span name (default the function's qualified name).
+        """
+        def decorator(function):
+            span_name = name if name else function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def records(self):
+        """
+        Return the most recent finished spans of every thread as
+        (thread state, stack path, start ns, duration ns, self time ns).
+        """
+        with self.registry_lock:
+            states = list(self.thread_states)
+        return [(state,) + record for state in states for record in list(state.records)]
+
+    def clear(self):
+        """
+        Drop all recorded spans.
+        """
+        with self.registry_lock:
+            for state in self.thread_states:
+                state.records.clear()
+                state.totals.clear()
+
+    def summary(self):
+        """
+        Aggregate every span recorded so far by stack path.
+
+        :return: A dictionary mapping each path to its call count and total/self time in milliseconds.
+        """
+        summary = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "self_ms": 0.0})
+        for path, (count, duration, self_time) in self._totals():
+            entry = summary[path]
+            entry["count"] += count
+            entry["total_ms"] += duration / 1e6
+            entry["self_ms"] += self_time / 1e6
+        return dict(summary)
+
+    def _totals(self):
+        with self.registry_lock:
+            states = list(self.thread_states)
+        return [(path, tuple(totals)) for state in states for path, totals in list(state.totals.items())]
+
+    def chrome_trace(self, path=None):
+        """
+        Export the most recent spans in the Chrome trace event format.
+
+        :param path: Optional JSON file to write the trace to.
+        :return: The trace as a dictionary.
+        """
+        events = []
+        thread_names = {}
+        for state, stack_path, start, duration, _ in self.records():
+            thread_names[state.thread_id] = state.thread_name
+            events.append({
+                "name": stack_path.rsplit(";", 1)[-1],
+                "ph": "X",  # Complete event
+                "ts": start / 1000,  # Microseconds
+                "dur": duration / 1000,
+                "pid": self.pid,
+                "tid": state.thread_id
+            })
+        for thread_id, thread_name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path:
+            with open(path, 'w') as f:
+                json.dump(trace, f)
+        return trace
+
+    def collapsed_stacks(self, path=None):
+        """
+        Export spans as collapsed stacks ("outer;inner self_time_us" per line) for flame graphs.
+
+        :param path: Optional text file to write the stacks to.
+        :return: The collapsed stacks as a string.
+        """
+        self_times = defaultdict(int)
+        for stack_path, (_, _, self_time) in self._totals():
+            self_times[stack_path] += self_time
+        text = "".join(f"{stack_path} {self_time // 1000}\n" for stack_path, self_time in sorted(self_times.items()))
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+
+# Example usage
+if __name__ == "__main__":
+    profiler = SpanProfiler()
+
+    @profiler.profile("work")
+    def work():
+        with profiler.span("compute"):
+            sum(range(100000))
+
+    with profiler.span("main"):
+        for _ in range(3):
+            work()
+    print(profiler.collapsed_stacks())
+    print("Summary:", profiler.summary())
@@ -2,8 +2,7 @@
 
 import time
 import numpy as np
-import cv2  # OpenCV for image scanning
-from typing import List, Any
+from typing import List, Any, Union
 
 class DataScanner:
     def __init__(self):
@@ -38,7 +37,7 @@ class DataScanner:
         self.scanned_data = [str(item) for item in text_data]  # Convert all items to strings
         return self.scanned_data
 
-    def scan_numeric_data(self, numeric_data: List[int, float]):
+    def scan_numeric_data(self, numeric_data: List[Union[int, float]]):
         """
         Scan and process numeric data (e.g., financial records, sensor readings).
         
@@ -57,6 +56,7 @@ class DataScanner:
         :return: Processed image data (grayscale image).
         """
         print("Scanning image data...")
+        import cv2  # OpenCV for image scanning
         try:
             # Read image using OpenCV
             image = cv2.imread(image_path)
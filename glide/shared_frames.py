@@ -0,0 +1,239 @@
+# shared_frames.py
+
+import multiprocessing
+import sys
+from multiprocessing import shared_memory
+import numpy as np
+
+# Slot states, kept in the shared header so every process sees the same view of the ring
+FREE = 0
+WRITING = 1
+READY = 2
+
+
+class FrameDescriptor:
+    __slots__ = ('slot', 'shape', 'dtype', 'generation')
+
+    def __init__(self, slot, shape, dtype, generation):
+        """
+        Small, picklable handle to a frame stored in a SharedFrameRing.
+
+        Only this descriptor crosses process boundaries; the frame itself stays in shared memory.
+
+        :param slot: Index of the ring slot holding the frame.
+        :param shape: Shape of the frame.
+        :param dtype: NumPy dtype string of the frame.
+        :param generation: Write generation of the slot, used to detect stale descriptors.
+        """
+        self.slot = slot
+        self.shape = shape
+        self.dtype = dtype
+        self.generation = generation
+
+    def __getstate__(self):
+        return (self.slot, self.shape, self.dtype, self.generation)
+
+    def __setstate__(self, state):
+        self.slot, self.shape, self.dtype, self.generation = state
+
+    def __repr__(self):
+        return f"FrameDescriptor(slot={self.slot}, shape={self.shape}, dtype={self.dtype!r}, generation={self.generation})"
+
+
+def _attach_shared_memory(name):
+    # Python 3.13+ can skip the resource tracker for segments owned by another process
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedFrameRing:
+    def __init__(self, num_slots, slot_nbytes, context=None):
+        """
+        A ring of fixed-size frame slots in shared memory, for zero-copy hand-off between processes.
+
+        A producer copies a frame into a free slot once and passes on a FrameDescriptor; consumers
+        map the slot directly and release it when done, after which the slot is reused. When every
+        slot is in use, writers block, which bounds memory and applies back-pressure.
+
+        The ring pickles by name, so it can be passed to worker processes as part of their
+        arguments (e.g. inside a pipeline stage) and re-attaches to the same segment there.
+
+        :param num_slots: Number of frames that can be in flight at once.
+        :param slot_nbytes: Capacity of one slot in bytes (e.g. 640 * 480 for 8-bit grayscale frames).
+        :param context: The multiprocessing context used for the lock and semaphore.
+        """
+        if num_slots < 1 or slot_nbytes < 1:
+            raise ValueError("num_slots and slot_nbytes must be positive integers.")
+        context = context if context else multiprocessing.get_context()
+        self.num_slots = num_slots
+        self.slot_nbytes = slot_nbytes
+        self.lock = context.Lock()
+        self.free_slots = context.Semaphore(num_slots)
+        header_nbytes = 2 * num_slots * np.dtype(np.int64).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=header_nbytes + num_slots * slot_nbytes)
+        self.owner = True
+        self._map_header()
+        self.states[:] = FREE
+        self.generations[:] = 0
+
+    def _map_header(self):
+        header = np.ndarray((2, self.num_slots), dtype=np.int64, buffer=self.shm.buf)
+        self.states, self.generations = header[0], header[1]
+        self.data_offset = header.nbytes
+
+    def __getstate__(self):
+        return {
+            'name': self.shm.name,
+            'num_slots': self.num_slots,
+            'slot_nbytes': self.slot_nbytes,
+            'lock': self.lock,
+            'free_slots': self.free_slots
+        }
+
+    def __setstate__(self, state):
+        self.num_slots = state['num_slots']
+        self.slot_nbytes = state['slot_nbytes']
+        self.lock = state['lock']
+        self.free_slots = state['free_slots']
+        self.shm = _attach_shared_memory(state['name'])
+        self.owner = False
+        self._map_header()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def _slot_array(self, slot, shape, dtype):
+        offset = self.data_offset + slot * self.slot_nbytes
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+
+    def write(self, frame, timeout=None):
+        """
+        Copy a frame into a free slot, waiting for one if the ring is full.
+
+        :param frame: A NumPy array of at most slot_nbytes bytes.
+        :param timeout: Seconds to wait for a free slot (None waits forever).
+        :return: A FrameDescriptor for the stored frame.
+        """
+        frame = np.asarray(frame)
+        if frame.nbytes > self.slot_nbytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit in a {self.slot_nbytes}-byte slot.")
+        if not self.free_slots.acquire(timeout=timeout):
+            raise TimeoutError("No free slot in the shared frame ring.")
+
+        with self.lock:
+            slot = int(np.flatnonzero(self.states == FREE)[0])
+            self.states[slot] = WRITING
+            self.generations[slot] += 1
+            generation = int(self.generations[slot])
+
+        self._slot_array(slot, frame.shape, frame.dtype)[...] = frame
+        with self.lock:
+            self.states[slot] = READY
+        return FrameDescriptor(slot, frame.shape, frame.dtype.str, generation)
+
+    def view(self, descriptor):
+        """
+        Return a read-only, zero-copy view of a stored frame.
+
+        The view is only valid until the descriptor is released.
+
+        :param descriptor: A FrameDescriptor returned by write.
+        :return: A NumPy array backed by shared memory.
+        """
+        self._check_descriptor(descriptor)
+        frame = self._slot_array(descriptor.slot, descriptor.shape, np.dtype(descriptor.dtype))
+        frame.flags.writeable = False
+        return frame
+
+    def release(self, descriptor):
+        """
+        Return the slot of a consumed frame to the ring so it can be reused.
+
+        :param descriptor: A FrameDescriptor returned by write.
+        """
+        with self.lock:
+            self._check_descriptor(descriptor)
+            self.states[descriptor.slot] = FREE
+        self.free_slots.release()
+
+    def _check_descriptor(self, descriptor):
+        if not 0 <= descriptor.slot < self.num_slots:
+            raise ValueError(f"Slot {descriptor.slot} is outside the ring.")
+        if self.states[descriptor.slot] != READY or self.generations[descriptor.slot] != descriptor.generation:
+            raise ValueError(f"Stale descriptor: slot {descriptor.slot} has been released or reused.")
+
+    def slots_in_use(self):
+        """
+        Return the number of slots currently being written or waiting to be consumed.
+        """
+        return int(np.count_nonzero(self.states != FREE))
+
+    def close(self):
+        """
+        Detach from the shared memory; the process that created the ring also frees it.
+        """
+        # Drop NumPy views before closing, as the buffer cannot be closed while exported
+        self.states = self.generations = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SharedFrameWriter:
+    def __init__(self, ring, function=None):
+        """
+        Pipeline stage that stores the output of a function in a SharedFrameRing.
+
+        :param ring: The SharedFrameRing frames are written to.
+        :param function: Callable producing a frame from the stage input (default passes it through).
+        """
+        self.ring = ring
+        self.function = function
+
+    def __call__(self, item):
+        frame = self.function(item) if self.function else item
+        if frame is None:
+            return None
+        return self.ring.write(frame)
+
+
+class SharedFrameReader:
+    def __init__(self, ring, function):
+        """
+        Pipeline stage that applies a function to a frame in a SharedFrameRing, then frees its slot.
+
+        The function sees a read-only view of shared memory and must not keep it after returning.
+
+        :param ring: The SharedFrameRing frames are read from.
+        :param function: Callable applied to each frame.
+        """
+        self.ring = ring
+        self.function = function
+
+    def __call__(self, descriptor):
+        try:
+            return self.function(self.ring.view(descriptor))
+        finally:
+            self.ring.release(descriptor)
+
+
+# Example usage
+if __name__ == "__main__":
+    from glide.glide_system import GlideSystem, PipelineStage
+
+    with SharedFrameRing(num_slots=8, slot_nbytes=640 * 480) as ring:
+        stages = [
+            PipelineStage('scan', SharedFrameWriter(ring, lambda seed: np.random.default_rng(seed).integers(0, 256, (480, 640), dtype=np.uint8))),
+            PipelineStage('process', SharedFrameReader(ring, lambda frame: float(frame.mean())))
+        ]
+        glide_system = GlideSystem(stages=stages)
+        print("Mean frame intensities:", glide_system.run(range(16)))
+        print("Pipeline metrics:", glide_system.metrics())
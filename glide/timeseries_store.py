@@ -0,0 +1,231 @@
+# timeseries_store.py
+
+import json
+import os
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+TIMESTAMP = "timestamp"
+
+ROLLUPS = {
+    "sum": np.add.reduceat,
+    "min": np.minimum.reduceat,
+    "max": np.maximum.reduceat
+}
+
+
+class TimeSeriesStore:
+    def __init__(self, path, columns=None, chunk_size=65536):
+        """
+        Embedded, append-only, columnar time-series store.
+
+        Rows are buffered in memory and written as fixed-size chunks, one .npy file per column
+        per chunk, next to a manifest recording the time range of every chunk. Reads
+        memory-map only the chunks overlapping the requested time range, and binary-search
+        timestamps inside them, so queries touch a small part of a long history.
+
+        :param path: Directory holding the store (created if missing).
+        :param columns: Names of the value columns; may be omitted to reopen an existing store.
+        :param chunk_size: Number of rows per on-disk chunk.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer.")
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            if columns is not None and list(columns) != self.manifest["columns"]:
+                raise ValueError(f"Store at {path} holds columns {self.manifest['columns']}, not {list(columns)}.")
+        elif columns:
+            self.manifest = {"columns": list(columns), "chunks": []}
+            self._write_manifest()
+        else:
+            raise ValueError("columns are required to create a new store.")
+
+        self.columns = self.manifest["columns"]
+        self.buffer = {name: [] for name in [TIMESTAMP] + self.columns}
+        self.buffered_rows = 0
+        self.chunk_cache = {}
+
+    @property
+    def last_timestamp(self):
+        if self.buffered_rows:
+            return self.buffer[TIMESTAMP][-1][-1]
+        if self.manifest["chunks"]:
+            return self.manifest["chunks"][-1]["end"]
+        return None
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self.manifest["chunks"]) + self.buffered_rows
+
+    def append(self, timestamps, values):
+        """
+        Append rows to the store; timestamps must not go backwards.
+
+        :param timestamps: A timestamp or array of timestamps (e.g. seconds since the epoch).
+        :param values: A dictionary mapping every column name to a value or array of values.
+        """
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.float64))
+        if len(timestamps) == 0:
+            return
+        if np.any(np.diff(timestamps) < 0) or (self.last_timestamp is not None and timestamps[0] < self.last_timestamp):
+            raise ValueError("Timestamps must be appended in non-decreasing order.")
+        if set(values) != set(self.columns):
+            raise ValueError(f"Values must be given for exactly the columns {self.columns}.")
+
+        # Validate every column before buffering any, so a rejected append leaves the store unchanged
+        columns = {name: np.atleast_1d(np.asarray(values[name], dtype=np.float64)).ravel() for name in self.columns}
+        for name, column in columns.items():
+            if len(column) != len(timestamps):
+                raise ValueError(f"Column {name} has {len(column)} values for {len(timestamps)} timestamps.")
+
+        self.buffer[TIMESTAMP].append(timestamps)
+        for name, column in columns.items():
+            self.buffer[name].append(column)
+        self.buffered_rows += len(timestamps)
+
+        while self.buffered_rows >= self.chunk_size:
+            self._write_chunk(self.chunk_size)
+
+    def flush(self):
+        """
+        Write every buffered row to disk, as a final (possibly short) chunk.
+        """
+        if self.buffered_rows:
+            self._write_chunk(self.buffered_rows)
+
+    def _write_chunk(self, rows):
+        chunk_id = len(self.manifest["chunks"])
+        remaining = {}
+        for name, parts in self.buffer.items():
+            data = np.concatenate(parts)
+            np.save(self._chunk_path(chunk_id, name), data[:rows])
+            remaining[name] = [data[rows:]] if len(data) > rows else []
+        timestamps = self.buffer[TIMESTAMP]
+        start, end = float(timestamps[0][0]), float(np.concatenate(timestamps)[rows - 1])
+
+        self.buffer = remaining
+        self.buffered_rows -= rows
+        self.manifest["chunks"].append({"id": chunk_id, "rows": rows, "start": start, "end": end})
+        self._write_manifest()
+
+    def _write_manifest(self):
+        # Write-then-rename, so readers never see a partially written manifest
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        with open(manifest_path + ".tmp", 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def _chunk_path(self, chunk_id, name):
+        return os.path.join(self.path, f"chunk_{chunk_id:06d}_{name}.npy")
+
+    def _load_chunk(self, chunk_id):
+        if chunk_id not in self.chunk_cache:
+            self.chunk_cache[chunk_id] = {name: np.load(self._chunk_path(chunk_id, name), mmap_mode='r')
+                                          for name in [TIMESTAMP] + self.columns}
+        return self.chunk_cache[chunk_id]
+
+    def query(self, start=None, end=None, columns=None):
+        """
+        Return all rows with start <= timestamp < end.
+
+        :param start: Start of the range (None for the beginning of the history).
+        :param end: End of the range, exclusive (None for the latest row).
+        :param columns: Columns to return (default all).
+        :return: A dictionary of arrays, including the 'timestamp' column.
+        """
+        names = [TIMESTAMP] + list(columns if columns else self.columns)
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+
+        # Chunks are time-ordered, so the overlapping ones form a contiguous run
+        chunks = self.manifest["chunks"]
+        chunk_starts = np.array([chunk["start"] for chunk in chunks])
+        chunk_ends = np.array([chunk["end"] for chunk in chunks])
+        first = np.searchsorted(chunk_ends, start, side='left')
+        last = np.searchsorted(chunk_starts, end, side='left')
+
+        parts = {name: [] for name in names}
+        sources = [self._load_chunk(chunks[index]["id"]) for index in range(first, last)]
+        if self.buffered_rows:
+            sources.append({name: np.concatenate(self.buffer[name]) for name in names})
+        for source in sources:
+            timestamps = source[TIMESTAMP]
+            low = np.searchsorted(timestamps, start, side='left')
+            high = np.searchsorted(timestamps, end, side='left')
+            if high > low:
+                for name in names:
+                    parts[name].append(source[name][low:high])
+        return {name: np.concatenate(parts[name]) if parts[name] else np.empty(0) for name in names}
+
+    def rollup(self, interval, start=None, end=None, columns=None, aggregation="mean"):
+        """
+        Downsample a time range into fixed intervals.
+
+        :param interval: Width of each interval, in timestamp units.
+        :param start: Start of the range; intervals are aligned to it (default: first row in range).
+        :param end: End of the range, exclusive.
+        :param columns: Columns to aggregate (default all).
+        :param aggregation: 'mean', 'sum', 'min', 'max', 'count' or 'last'.
+        :return: A dictionary with the start of every non-empty interval and the aggregated columns.
+        """
+        if aggregation not in ("mean", "count", "last") and aggregation not in ROLLUPS:
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        rows = self.query(start, end, columns)
+        names = [name for name in rows if name != TIMESTAMP]
+        timestamps = rows[TIMESTAMP]
+        if len(timestamps) == 0:
+            return {TIMESTAMP: np.empty(0), **{name: np.empty(0) for name in names}}
+
+        origin = timestamps[0] if start is None else start
+        bins = np.floor((timestamps - origin) / interval).astype(np.int64)
+        # Rows are sorted by time, so each interval is a contiguous run starting where the bin changes
+        boundaries = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        counts = np.diff(np.r_[boundaries, len(timestamps)])
+
+        result = {TIMESTAMP: origin + bins[boundaries] * interval}
+        for name in names:
+            values = rows[name]
+            if aggregation == "mean":
+                result[name] = np.add.reduceat(values, boundaries) / counts
+            elif aggregation == "count":
+                result[name] = counts
+            elif aggregation == "last":
+                result[name] = values[boundaries + counts - 1]
+            else:
+                result[name] = ROLLUPS[aggregation](values, boundaries)
+        return result
+
+    def close(self):
+        """
+        Flush buffered rows and release memory maps.
+        """
+        self.flush()
+        self.chunk_cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    with TimeSeriesStore(tempfile.mkdtemp(), columns=['sales_data', 'market_trends'], chunk_size=1000) as store:
+        now = time.time()
+        for tick in range(50):
+            timestamps = now + tick + np.arange(100) / 100
+            store.append(timestamps, {'sales_data': np.random.rand(100) * 10000,
+                                      'market_trends': np.random.rand(100) * 10})
+        print(f"Stored {len(store)} rows in {len(store.manifest['chunks'])} chunks.")
+        print("Per-10s mean sales:", store.rollup(10, start=now, columns=['sales_data'])['sales_data'])
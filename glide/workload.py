@@ -0,0 +1,361 @@
+# workload.py
+
+import time
+import numpy as np
+from .gaming_engine import INPUTS
+
+
+class RowSource:
+    def __init__(self, num_features=3, noise=0.1):
+        """
+        Labelled numeric rows, like the data collectors of the examples: features followed by a
+        binary label that depends on the features, so models trained on the stream can learn.
+
+        :param num_features: Number of feature columns.
+        :param noise: Standard deviation of the noise added before thresholding the label.
+        """
+        self.num_features = num_features
+        self.noise = noise
+        self.weights = None
+
+    def reset(self):
+        """
+        Forget the label weights, so the next stream draws them again from its own seed.
+        """
+        self.weights = None
+
+    def generate(self, rng, count):
+        """
+        Generate a batch of rows.
+
+        :param rng: A numpy Generator.
+        :param count: Number of rows.
+        :return: An array of shape (count, num_features + 1), the label in the last column.
+        """
+        if self.weights is None:
+            self.weights = rng.normal(size=self.num_features)
+        features = rng.random((count, self.num_features))
+        scores = (features - 0.5) @ self.weights + rng.normal(0, self.noise, count)
+        return np.column_stack((features, scores > 0))
+
+
+class FrameSource:
+    def __init__(self, height=480, width=640, speed=4, noise=8):
+        """
+        Grayscale camera frames: a fixed textured scene panning sideways with per-frame sensor noise.
+
+        :param height: Frame height in pixels.
+        :param width: Frame width in pixels.
+        :param speed: Pixels the scene moves between consecutive frames.
+        :param noise: Amplitude of the uniform pixel noise.
+        """
+        self.height = height
+        self.width = width
+        self.speed = speed
+        self.noise = noise
+        self.scene = None
+        self.frame_index = 0
+
+    def reset(self):
+        """
+        Forget the scene and rewind to the first frame.
+        """
+        self.scene = None
+        self.frame_index = 0
+
+    def generate(self, rng, count):
+        """
+        Generate a batch of consecutive frames.
+
+        :param rng: A numpy Generator.
+        :param count: Number of frames.
+        :return: A uint8 array of shape (count, height, width).
+        """
+        if self.scene is None:
+            # Smooth gradient plus coarse texture, so edge detectors have something to find
+            rows = np.linspace(0, 160, self.height)[:, None]
+            texture = rng.integers(0, 64, (self.height // 16 + 1, self.width // 16 + 1)).repeat(16, 0).repeat(16, 1)
+            self.scene = (rows + texture[:self.height, :self.width]).astype(np.int16)
+
+        offsets = (self.frame_index + np.arange(count)) * self.speed % self.width
+        columns = (np.arange(self.width) + offsets[:, None]) % self.width
+        frames = self.scene[:, columns].transpose(1, 0, 2)
+        if self.noise:
+            frames = frames + rng.integers(-self.noise, self.noise + 1, frames.shape, dtype=np.int16)
+        self.frame_index += count
+        return np.clip(frames, 0, 255).astype(np.uint8)
+
+
+class SensorSource:
+    def __init__(self, num_beams=360, max_range=100.0, num_obstacles=4):
+        """
+        Lidar and radar sweeps around a vehicle, with obstacles slowly drifting in range.
+
+        :param num_beams: Beams per sweep.
+        :param max_range: Distance reported by beams that hit nothing.
+        :param num_obstacles: Number of obstacles in the scene.
+        """
+        self.num_beams = num_beams
+        self.max_range = max_range
+        self.num_obstacles = num_obstacles
+        self.obstacles = None
+
+    def reset(self):
+        """
+        Forget the obstacles, so the next stream places them again.
+        """
+        self.obstacles = None
+
+    def generate(self, rng, count):
+        """
+        Generate a batch of consecutive sweeps.
+
+        :param rng: A numpy Generator.
+        :param count: Number of sweeps.
+        :return: A dictionary with 'lidar' and 'radar' arrays of shape (count, num_beams).
+        """
+        if self.obstacles is None:
+            # (first beam, width in beams, distance, approach speed per sweep)
+            self.obstacles = np.column_stack((
+                rng.integers(0, self.num_beams, self.num_obstacles),
+                rng.integers(2, max(3, self.num_beams // 20), self.num_obstacles),
+                rng.uniform(10, self.max_range, self.num_obstacles),
+                rng.uniform(-0.2, 0.2, self.num_obstacles)
+            ))
+
+        sweeps = np.full((count, self.num_beams), self.max_range)
+        steps = np.arange(count)
+        beams = np.arange(self.num_beams)
+        for first, width, distance, speed in self.obstacles:
+            hit = (beams - first) % self.num_beams < width
+            distances = np.clip(distance - speed * steps, 1.0, self.max_range)
+            sweeps[:, hit] = np.minimum(sweeps[:, hit], distances[:, None])
+        self.obstacles[:, 2] = np.clip(self.obstacles[:, 2] - self.obstacles[:, 3] * count, 1.0, self.max_range)
+
+        lidar = sweeps + rng.normal(0, 0.05, sweeps.shape)
+        radar = sweeps + rng.normal(0, 0.5, sweeps.shape)
+        return {"lidar": np.clip(lidar, 0, self.max_range), "radar": np.clip(radar, 0, self.max_range)}
+
+
+class InputEventSource:
+    def __init__(self, inputs=INPUTS, repeat_probability=0.7):
+        """
+        Player input events: players tend to hold a direction, so each event repeats the previous
+        one with some probability and is otherwise drawn uniformly.
+
+        :param inputs: Input names.
+        :param repeat_probability: Probability that an event repeats the previous one.
+        """
+        self.inputs = np.asarray(inputs)
+        self.repeat_probability = repeat_probability
+        self.previous = None
+
+    def reset(self):
+        """
+        Forget the last event, so the next stream does not continue it.
+        """
+        self.previous = None
+
+    def generate(self, rng, count):
+        """
+        Generate a batch of input events.
+
+        :param rng: A numpy Generator.
+        :param count: Number of events.
+        :return: An array of input names.
+        """
+        choices = rng.integers(len(self.inputs), size=count)
+        repeats = rng.random(count) < self.repeat_probability
+        if self.previous is None:
+            repeats[0] = False
+        else:
+            choices[0] = np.where(repeats[0], self.previous, choices[0])
+        # Each repeating event takes the choice of the last non-repeating event before it
+        last_new = np.maximum.accumulate(np.where(repeats, 0, np.arange(count)))
+        events = choices[last_new]
+        self.previous = events[-1]
+        return self.inputs[events]
+
+
+class ConstantRate:
+    def __init__(self, rate):
+        """
+        A constant target rate.
+
+        :param rate: Items per second.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+
+    def __call__(self, elapsed):
+        return self.rate
+
+
+class BurstRate:
+    def __init__(self, rate, burst_factor=5.0, period=10.0, burst_duration=1.0):
+        """
+        A base rate with periodic bursts, e.g. 5x traffic for 1 second out of every 10.
+
+        :param rate: Base items per second.
+        :param burst_factor: Multiplier applied to the rate during bursts.
+        :param period: Seconds between the starts of consecutive bursts.
+        :param burst_duration: Length of each burst in seconds (at the end of each period).
+        """
+        if rate <= 0 or burst_factor <= 0:
+            raise ValueError("rate and burst_factor must be positive.")
+        if not 0 <= burst_duration <= period:
+            raise ValueError("burst_duration must be between 0 and period.")
+        self.rate = rate
+        self.burst_factor = burst_factor
+        self.period = period
+        self.burst_duration = burst_duration
+
+    def __call__(self, elapsed):
+        in_burst = elapsed % self.period >= self.period - self.burst_duration
+        return self.rate * self.burst_factor if in_burst else self.rate
+
+
+class WorkloadGenerator:
+    def __init__(self, source, rate, seed=None, tick=0.01, duration=None, max_items=None,
+                 max_batch=None, realtime=True):
+        """
+        Emits a seeded synthetic stream at a target rate, in batches.
+
+        The generator is an iterable of batches, so it can be passed directly to
+        GlideSystem.run, or pushed into any callable stage with feed(). Every tick it emits the
+        items due since the previous one (the integral of the rate), so the stream keeps its
+        target rate on average whatever the tick length. When the consumer falls behind, the
+        next batches grow (up to max_batch) to catch up, and report() shows the shortfall.
+
+        :param source: Item source with a generate(rng, count) method (e.g. RowSource, FrameSource),
+                       and optionally a reset() method, called at the start of every pass.
+        :param rate: Target items per second, or a callable mapping elapsed seconds to a rate
+                     (e.g. BurstRate).
+        :param seed: Seed of the stream; equal seeds give equal streams, and every pass over the
+                     generator replays the same stream.
+        :param tick: Seconds between batches.
+        :param duration: Stop after this many seconds of stream time.
+        :param max_items: Stop after emitting this many items.
+        :param max_batch: Largest batch emitted in one tick (default unlimited).
+        :param realtime: Pace batches on the wall clock; if False, stream time advances one tick
+                         per batch without sleeping, to measure how fast the consumer can go.
+        """
+        if duration is None and max_items is None:
+            raise ValueError("Either duration or max_items must be given.")
+        if tick <= 0:
+            raise ValueError("tick must be positive.")
+        self.source = source
+        self.rate = rate if callable(rate) else ConstantRate(rate)
+        self.seed = seed
+        self.tick = tick
+        self.duration = duration
+        self.max_items = max_items
+        self.max_batch = max_batch
+        self.realtime = realtime
+
+        self.emitted = 0
+        self.batches = 0
+        self.target_items = 0.0
+        self.stream_time = 0.0
+        self.wall_time = 0.0
+        self.max_lag = 0.0
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        reset = getattr(self.source, 'reset', None)
+        if reset is not None:
+            reset()  # Sources carry state between batches, e.g. the scene or the last input
+        self.emitted = self.batches = 0
+        self.target_items = self.stream_time = self.max_lag = 0.0
+        start = time.perf_counter()
+        due = 0.0  # Items owed by the schedule but not emitted yet
+        ticks = 0
+
+        while True:
+            ticks += 1
+            if self.realtime:
+                deadline = start + ticks * self.tick
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+                now = time.perf_counter() - start
+            else:
+                now = ticks * self.tick
+            if self.duration is not None:
+                now = min(now, self.duration)
+
+            increment = self.rate(self.stream_time) * (now - self.stream_time)
+            self.target_items += increment
+            due += increment
+            self.stream_time = now
+
+            count = int(due + 1e-9)  # Tolerate rounding error in the accumulated schedule
+            if self.max_batch is not None:
+                count = min(count, self.max_batch)
+            if self.max_items is not None:
+                count = min(count, self.max_items - self.emitted)
+            if count > 0:
+                batch = self.source.generate(rng, count)
+                due -= count
+                self.emitted += count
+                self.batches += 1
+                self.wall_time = time.perf_counter() - start
+                yield batch
+            self.wall_time = time.perf_counter() - start
+
+            if (self.max_items is not None and self.emitted >= self.max_items) or \
+                    (self.duration is not None and now >= self.duration):
+                break
+
+    def feed(self, consumer):
+        """
+        Push every batch of the stream into a callable, e.g. a pipeline stage function.
+
+        :param consumer: Callable taking one batch.
+        :return: The report of the run, with the time spent in the consumer added.
+        """
+        consumer_seconds = 0.0
+        for batch in self:
+            start = time.perf_counter()
+            consumer(batch)
+            consumer_seconds += time.perf_counter() - start
+        report = self.report()
+        report["consumer_seconds"] = consumer_seconds
+        return report
+
+    def report(self):
+        """
+        Compare the achieved rate of the last run with its target.
+
+        :return: A dictionary with the items emitted, target and achieved rates (items per second
+                 of wall time), their ratio and the largest delay behind schedule.
+        """
+        target_rate = self.target_items / self.stream_time if self.stream_time else 0.0
+        achieved_rate = self.emitted / self.wall_time if self.wall_time else 0.0
+        return {
+            "items": self.emitted,
+            "batches": self.batches,
+            "target_items": self.target_items,
+            "stream_seconds": self.stream_time,
+            "wall_seconds": self.wall_time,
+            "target_rate": target_rate,
+            "achieved_rate": achieved_rate,
+            "achieved_ratio": achieved_rate / target_rate if target_rate else 0.0,
+            "max_lag_seconds": self.max_lag
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    frames = WorkloadGenerator(FrameSource(), rate=30, seed=0, tick=1 / 30, duration=2)
+    print("Frames:", frames.feed(lambda batch: batch.mean()))
+
+    rows = WorkloadGenerator(RowSource(), rate=BurstRate(10000, burst_factor=5, period=1, burst_duration=0.2),
+                             seed=0, duration=2)
+    print("Rows:", rows.feed(lambda batch: batch[:, :-1].sum(axis=0)))
+
+    events = WorkloadGenerator(InputEventSource(), rate=1e6, seed=0, max_items=10 ** 7, realtime=False)
+    print("Input events, unpaced:", events.feed(lambda batch: np.unique(batch, return_counts=True)))
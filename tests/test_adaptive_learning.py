@@ -1,7 +1,11 @@
 # test_adaptive_learning.py
 
+import os
+import shutil
+import tempfile
 import unittest
-from adaptive_learning import AdaptiveLearningSystem
+import numpy as np
+from adaptive_learning import AdaptiveLearningSystem, ModelTrainer
 
 class TestAdaptiveLearningSystem(unittest.TestCase):
     
@@ -137,6 +141,35 @@ class TestAdaptiveLearningSystem(unittest.TestCase):
         self.adaptive_system = None
 
 
+class TestOutOfCoreTraining(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a temporary directory holding one shard of 500 rows.
+        This will be called before each test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        features = np.random.default_rng(0).random((500, 3))
+        self.shard_path = os.path.join(self.temp_dir, "shard.npy")
+        np.save(self.shard_path, np.column_stack((features, features[:, 0] > 0.5)))
+
+    def test_train_out_of_core(self):
+        """
+        Test out-of-core training through the trainer of a top-level import of the module.
+        """
+        print("Testing out-of-core training...")
+        model_trainer = ModelTrainer()
+        model = model_trainer.train_out_of_core([self.shard_path], mode='bagging', chunk_size=100)
+        self.assertEqual(model_trainer.stats["rows"], 500)
+        self.assertEqual(model.predict(np.random.rand(4, 3)).shape, (4,))
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        This will be called after each test.
+        """
+        shutil.rmtree(self.temp_dir)
+
 if __name__ == "__main__":
     # Run all the tests
     unittest.main()
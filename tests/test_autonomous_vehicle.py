@@ -0,0 +1,222 @@
+# test_autonomous_vehicle.py
+
+import os
+import sys
+import time
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+from autonomous_vehicle import AutonomousVehicle, DecisionEngine, SensorBufferPool, Sensors, VehicleController
+
+
+class QuietController(VehicleController):
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.actions = []
+
+    def _act(self, action):
+        self.actions.append(action)
+        if self.delay:
+            time.sleep(self.delay)
+
+    def steer(self, angle):
+        self._act('STEER')
+
+    def accelerate(self, speed):
+        self._act('THROTTLE')
+
+    def brake(self, brake_force):
+        self._act('BRAKE')
+
+    def stop(self):
+        self._act('STOP')
+
+
+def make_vehicle(delay=0.0):
+    sensors = Sensors(seed=0, camera_shape=(64, 48), num_beams=36)
+    engine = DecisionEngine(num_sectors=12, num_beams=36, camera_columns=48, camera_step=4)
+    return AutonomousVehicle(sensors, engine, QuietController(delay))
+
+
+class TestControlLoop(unittest.TestCase):
+
+    def test_overrun_cycles(self):
+        """
+        Test that cycles finishing after their deadline are counted and the missed periods skipped.
+        """
+        print("Testing overrun cycles...")
+        vehicle = make_vehicle(delay=0.02)
+        stats = vehicle.drive(period=0.005, max_cycles=3)
+        self.assertEqual(stats["cycles"], 3)
+        self.assertEqual(stats["overruns"], 3)
+        self.assertGreaterEqual(stats["missed_periods"], 3)
+        self.assertEqual(len(vehicle.controller.actions), 3)
+
+    def test_cycles_within_budget(self):
+        """
+        Test that a loop with a generous period neither overruns nor skips the camera.
+        """
+        print("Testing cycles within budget...")
+        vehicle = make_vehicle()
+        stats = vehicle.drive(period=0.05, max_cycles=3)
+        self.assertEqual(stats["overruns"], 0)
+        self.assertEqual(stats["camera_skips"], 0)
+        self.assertIn("analyze_camera", vehicle.cost_estimates)
+
+    def test_skipped_camera(self):
+        """
+        Test that the camera is skipped when it cannot fit, including on the very first cycle.
+        """
+        print("Testing skipped camera...")
+        vehicle = make_vehicle()
+        stats = vehicle.drive(period=1e-6, max_cycles=5)
+        self.assertEqual(stats["cycles"], 5)
+        self.assertGreater(stats["camera_skips"], 0)
+
+        # A known camera estimate decays while the camera is skipped, so it is retried later
+        vehicle.cost_estimates["camera"] = 10.0
+        self.assertFalse(vehicle.run_cycle(time.perf_counter() + 1.0))
+        self.assertAlmostEqual(vehicle.cost_estimates["camera"], 9.0)
+        vehicle.cost_estimates["camera"] = 0.0
+        self.assertTrue(vehicle.run_cycle(time.perf_counter() + 1.0))
+
+    def test_cost_estimates(self):
+        """
+        Test that stage cost estimates start at the first measurement and are then smoothed.
+        """
+        print("Testing cost estimates...")
+        vehicle = make_vehicle()
+        self.assertEqual(vehicle._timed("decide", lambda value: value + 1, 1), 2)
+        first = vehicle.cost_estimates["decide"]
+        self.assertGreater(first, 0.0)
+
+        vehicle.cost_estimates["decide"] = 1.0
+        vehicle._timed("decide", lambda: None)
+        self.assertAlmostEqual(vehicle.cost_estimates["decide"], 0.8, places=3)
+        vehicle._timed("decide", time.sleep, 0.01)
+        self.assertGreater(vehicle.cost_estimates["decide"], 0.8 * 0.8 + 0.2 * 0.01 - 1e-3)
+
+
+class TestDecisionEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = DecisionEngine(num_sectors=4, num_beams=8, camera_columns=8, camera_fov=90.0,
+                                     camera_step=1, obstacle_distance=2.0, ttc_threshold=5.0)
+
+    def readings(self, lidar, timestamp=None, camera=None):
+        return {'lidar': np.asarray(lidar, dtype=float), 'radar': np.full(8, 100.0), 'camera': camera,
+                'timestamp': timestamp, 'gps': {}}
+
+    def test_sector_fusion(self):
+        """
+        Test that the nearest return per sector is fused across sensors and triggers full braking.
+        """
+        print("Testing sector fusion...")
+        processed = self.engine.analyze_data(self.readings([50, 50, 1.5, 40, 50, 50, 50, 50]))
+        np.testing.assert_array_equal(processed['sector_distances'], [50, 1.5, 50, 50])
+        self.assertTrue(processed['obstacles_detected'])
+        self.assertEqual(processed['nearest_sector'], 1)
+        self.assertFalse(processed['camera_analyzed'])
+        self.assertEqual(self.engine.make_decision(processed), {'action': 'BRAKE', 'brake_force': 1.0})
+
+    def test_camera_sectors(self):
+        """
+        Test that camera columns are folded into the sectors they face.
+        """
+        print("Testing camera sectors...")
+        camera = np.full((4, 8), 100.0)
+        camera[:, 0] = 3.0  # Leftmost column, at a bearing of about -39 degrees: the last sector
+        processed = self.engine.analyze_data(self.readings(np.full(8, 50.0), camera=camera))
+        self.assertTrue(processed['camera_analyzed'])
+        self.assertEqual(processed['nearest_obstacle'], 3.0)
+        self.assertEqual(processed['nearest_sector'], 3)
+
+    def test_time_to_collision(self):
+        """
+        Test the time to collision of a closing obstacle and the slowing decision it triggers.
+        """
+        print("Testing time to collision...")
+        processed = self.engine.analyze_data(self.readings(np.full(8, 10.0), timestamp=0.0))
+        self.assertEqual(processed['min_time_to_collision'], np.inf)
+        self.assertEqual(self.engine.make_decision(processed), {'action': 'THROTTLE', 'speed': 30})
+
+        lidar = np.full(8, 10.0)
+        lidar[:2] = 8.0  # Sector 0 closes in at 2 per second
+        processed = self.engine.analyze_data(self.readings(lidar, timestamp=1.0))
+        self.assertAlmostEqual(processed['min_time_to_collision'], 4.0)
+        self.assertEqual(processed['time_to_collision'][1], np.inf)
+        self.assertEqual(self.engine.make_decision(processed), {'action': 'BRAKE', 'brake_force': 0.5})
+
+        with self.assertRaises(ValueError):
+            DecisionEngine(num_sectors=7, num_beams=360)
+
+    def test_camera_does_not_fake_closing_speed(self):
+        """
+        Test that a camera frame fused after a skipped one does not look like a closing obstacle.
+        """
+        print("Testing camera does not fake closing speed...")
+        self.engine.analyze_data(self.readings(np.full(8, 10.0), timestamp=0.0))
+        camera = np.full((4, 8), 5.0)
+        processed = self.engine.analyze_data(self.readings(np.full(8, 10.0), timestamp=1.0, camera=camera))
+        self.assertEqual(processed['nearest_obstacle'], 5.0)
+        self.assertEqual(processed['min_time_to_collision'], np.inf)
+        self.assertEqual(self.engine.make_decision(processed), {'action': 'THROTTLE', 'speed': 30})
+
+        # Dropping the camera again does not look like the obstacle moving away either
+        lidar = np.full(8, 10.0)
+        lidar[:2] = 8.0
+        processed = self.engine.analyze_data(self.readings(lidar, timestamp=2.0))
+        self.assertAlmostEqual(processed['min_time_to_collision'], 4.0)
+
+
+class TestSensorBufferPool(unittest.TestCase):
+
+    def test_double_buffering(self):
+        """
+        Test that writes go to the back buffer and are published as read-only views.
+        """
+        print("Testing double buffering...")
+        pool = SensorBufferPool(camera_shape=(4, 4), num_beams=8)
+        buffer, camera, lidar, radar = pool.begin_write()
+        self.assertEqual(buffer, 1)
+        lidar.fill(5.0)
+        pool.end_write(buffer, 1.0, has_camera=False)
+
+        readings = pool.read()
+        self.assertEqual((readings['buffer'], readings['timestamp']), (1, 1.0))
+        self.assertIsNone(readings['camera'])
+        self.assertTrue(np.all(readings['lidar'] == 5.0))
+        with self.assertRaises(ValueError):
+            readings['lidar'][0] = 0.0
+
+        # Writing the next readings leaves the published ones untouched
+        next_buffer, _, next_lidar, _ = pool.begin_write()
+        self.assertEqual(next_buffer, 0)
+        next_lidar.fill(7.0)
+        self.assertTrue(pool.validate(readings))
+        self.assertTrue(np.all(readings['lidar'] == 5.0))
+
+    def test_torn_reads(self):
+        """
+        Test that readings rewritten while in use, or read mid-write, fail validation.
+        """
+        print("Testing torn reads...")
+        pool = SensorBufferPool(camera_shape=(4, 4), num_beams=8)
+        buffer, _, _, _ = pool.begin_write()
+        pool.end_write(buffer, 1.0, has_camera=False)
+        readings = pool.read()
+
+        # The front buffer is rewritten in place, e.g. to add a camera frame
+        pool.begin_write(readings['buffer'])
+        self.assertFalse(pool.validate(readings))
+        self.assertFalse(pool.validate(pool.read()))  # Read while the write is in progress
+        pool.end_write(readings['buffer'], 1.0, has_camera=True)
+        self.assertFalse(pool.validate(readings))
+
+        readings = pool.read()
+        self.assertTrue(pool.validate(readings))
+        self.assertIsNotNone(readings['camera'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# test_benchmarks.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from run_benchmarks import BENCHMARKS, compare, run_benchmarks
+
+
+def report(**benchmarks):
+    """
+    Build a minimal report from (best ms per call, peak memory MB) pairs or skip reasons.
+    """
+    results = {}
+    for name, value in benchmarks.items():
+        if isinstance(value, str):
+            results[name] = {"skipped": value}
+        else:
+            best_ms, memory_mb = value
+            results[name] = {"latency_ms": {"best": best_ms}, "peak_memory_mb": memory_mb}
+    return {"benchmarks": results}
+
+class TestCompare(unittest.TestCase):
+
+    def test_pass(self):
+        """
+        Test that changes within the tolerance pass.
+        """
+        print("Testing comparison within tolerance...")
+        baseline = report(physics=(10.0, 5.0), step=(2.0, 1.0))
+        self.assertEqual(compare(report(physics=(11.0, 5.5), step=(1.5, 1.0)), baseline, 0.2), [])
+
+    def test_regression(self):
+        """
+        Test that slowdowns and memory growth beyond the tolerance are reported.
+        """
+        print("Testing regressions...")
+        baseline = report(physics=(10.0, 5.0), step=(2.0, 1.0))
+        regressions = compare(report(physics=(20.0, 5.0), step=(2.0, 3.0)), baseline, 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("physics: throughput 50% of baseline"))
+        self.assertTrue(regressions[1].startswith("step: peak memory"))
+
+    def test_floor_for_fast_benchmarks(self):
+        """
+        Test that a relative slowdown smaller than the absolute floor is not reported.
+        """
+        print("Testing the absolute floor...")
+        baseline = report(rules=(0.010, 0.0))
+        self.assertEqual(compare(report(rules=(0.030, 0.0)), baseline, 0.2), [])
+        self.assertEqual(len(compare(report(rules=(0.030, 0.0)), baseline, 0.2, floor_ms=0.01)), 1)
+
+    def test_missing_benchmark(self):
+        """
+        Test that benchmarks missing from either side, or skipped, are ignored.
+        """
+        print("Testing missing benchmarks...")
+        baseline = report(physics=(10.0, 5.0), edges="missing dependency: cv2")
+        current = report(step=(2.0, 1.0), edges=(1.0, 1.0))
+        self.assertEqual(compare(current, baseline, 0.2), [])
+        self.assertEqual(compare(baseline, current, 0.2), [])
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_report(self):
+        """
+        Test that a short run reports the best time over rounds and compares clean against itself.
+        """
+        print("Testing benchmark runs...")
+        self.assertIn("rule_based_decisions", BENCHMARKS)
+        result = run_benchmarks(["rule_based_decisions"], repeat=3, rounds=2)
+        self.assertEqual(result["environment"]["rounds"], 2)
+        metrics = result["benchmarks"]["rule_based_decisions"]
+        self.assertGreaterEqual(metrics["calls_per_sample"], 1)
+        self.assertLessEqual(metrics["latency_ms"]["best"], metrics["latency_ms"]["p50"])
+        self.assertEqual(compare(result, result, 0.2), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# test_business_intelligence.py
+
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+from business_intelligence import AnalyticsEngine, SufficientStatistics
+
+
+def sales_trend(start_tick, ticks=200, **options):
+    """
+    Feed sales growing by 0.7 per tick around 100 to an engine starting at start_tick.
+    """
+    engine = AnalyticsEngine(**options)
+    engine.tick = start_tick
+    rng = np.random.default_rng(0)
+    shape = (options['num_entities'], 50) if options.get('num_entities') else (50,)
+    for tick in range(ticks):
+        sales = 100 + 0.7 * tick + rng.normal(0, 1, shape)
+        results = engine.analyze({'market_trends': rng.random(shape), 'sales_data': sales})
+    return results['sales_trend'], engine
+
+class TestAnalyticsEngine(unittest.TestCase):
+
+    def test_trend_at_large_ticks(self):
+        """
+        Test that the sales trend does not depend on how long the session has been running.
+        """
+        print("Testing sales trend at large ticks...")
+        for options in ({}, {'window': 30}, {'decay': 1.0}, {'num_entities': 3}):
+            expected, engine = sales_trend(0, **options)
+            # The trend is the slope relative to the (weighted) mean sales level
+            level = engine.trend.xty[..., 0] / engine.trend.weight
+            np.testing.assert_allclose(expected, 0.7 / level, rtol=0.05)
+            for start_tick in (10 ** 6, 10 ** 7):
+                trend, _ = sales_trend(start_tick, **options)
+                np.testing.assert_allclose(trend, expected, rtol=1e-6)
+
+    def test_recenter(self):
+        """
+        Test that recentered statistics give the same slope as statistics of centered features.
+        """
+        print("Testing recentering...")
+        rng = np.random.default_rng(1)
+        features = rng.normal(1e6, 1.0, (40, 1))
+        targets = 3.0 * (features[:, 0] - 1e6) + rng.normal(0, 0.1, 40)
+        statistics = SufficientStatistics(1, window=2)
+        for batch in np.split(np.arange(40), 4):
+            statistics.update(features[batch] - 1e6 + 5, targets[batch])
+        statistics.recenter([5.0])
+        centered = SufficientStatistics(1, window=2)
+        for batch in np.split(np.arange(40), 4):
+            centered.update(features[batch] - 1e6, targets[batch])
+        np.testing.assert_allclose(statistics.xtx, centered.xtx, atol=1e-9)
+        np.testing.assert_allclose(statistics.solve(), centered.solve())
+        # The stored batches were shifted too, so dropping them later stays exact
+        statistics.update(features[:10] - 1e6, targets[:10])
+        centered.update(features[:10] - 1e6, targets[:10])
+        np.testing.assert_allclose(statistics.solve(), centered.solve())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# test_contextual_bandit.py
+
+import unittest
+import numpy as np
+from glide.decision_maker import DecisionMaker, LinUCBPolicy
+
+
+def rule_rewards(features, actions):
+    """
+    Reward 1 when the action matches DecisionMaker's rules, 0 otherwise.
+    """
+    best = DecisionMaker().rule_based_decisions(features)
+    return (best == actions).astype(float)
+
+
+class TestLinUCBPolicy(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a policy and a seeded generator of scenarios.
+        This will be called before each test.
+        """
+        self.policy = LinUCBPolicy(alpha=0.5)
+        self.rng = np.random.default_rng(0)
+
+    def test_incremental_inverse(self):
+        """
+        Test that Sherman-Morrison updates match inverting and solving from scratch.
+        """
+        print("Testing incremental LinUCB updates...")
+        features = self.rng.random((200, 3))
+        actions = self.rng.choice(self.policy.actions, 200)
+        rewards = self.rng.random(200)
+        self.policy.update(features, actions, rewards)
+
+        design = np.column_stack((features, np.ones(200)))
+        for index, action in enumerate(self.policy.actions):
+            x, y = design[actions == action], rewards[actions == action]
+            A = np.eye(4) + x.T @ x
+            np.testing.assert_allclose(self.policy.A_inv[index], np.linalg.inv(A), atol=1e-10)
+            np.testing.assert_allclose(self.policy.theta[index], np.linalg.solve(A, x.T @ y), atol=1e-10)
+        self.assertEqual(self.policy.updates, 200)
+
+    def test_learns_from_feedback(self):
+        """
+        Test that a DecisionMaker using the policy learns the rules from feedback alone.
+        """
+        print("Testing bandit decisions...")
+        decision_maker = DecisionMaker(self.policy)
+        for _ in range(100):
+            features = self.rng.random((50, 3))
+            actions = decision_maker.make_decisions(features)
+            decision_maker.record_feedback(features, actions, rule_rewards(features, actions))
+        self.assertEqual(len(decision_maker.history), 5000)
+
+        self.policy.alpha = 0.0  # Exploit only
+        features = self.rng.random((2000, 3))
+        self.assertGreater(rule_rewards(features, self.policy.select(features)).mean(), 0.8)
+        scenario = {'factor_1': 0.9, 'factor_2': 0.1, 'factor_3': 0.2}
+        self.assertEqual(decision_maker.make_decision(scenario), "Action_A")
+        decision_maker.record_feedback(scenario, "Action_A", 1)
+
+    def test_exploration_and_errors(self):
+        """
+        Test that untried actions get an exploration bonus, and invalid input is rejected.
+        """
+        print("Testing exploration bonus...")
+        scenario = np.array([[0.5, 0.5, 0.5]])
+        self.policy.fit(np.repeat(scenario, 20, axis=0), ["Action_A"] * 20, np.zeros(20))
+        self.assertNotEqual(self.policy.select(scenario)[0], "Action_A", "A poorly rewarded action should be avoided.")
+        with self.assertRaises(ValueError):
+            self.policy.select(np.zeros((1, 2)))
+        with self.assertRaises(ValueError):
+            self.policy.update(scenario, ["Action_A", "Action_B"], [1, 0])
+        with self.assertRaises(ValueError):
+            DecisionMaker().record_feedback(scenario, ["Action_A"], [1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 # test_decision_maker.py
 
 import unittest
+import numpy as np
 from decision_maker import DecisionMaker
 
 class TestDecisionMaker(unittest.TestCase):
@@ -126,6 +127,31 @@ class TestDecisionMaker(unittest.TestCase):
         self.decision_maker = None
 
 
+class TestBatchedDecisions(unittest.TestCase):
+
+    def test_rule_based_decisions_match_scalar_rules(self):
+        """
+        Test that the vectorized rules agree with rule_based_decision on every scenario.
+        """
+        print("Testing vectorized rule-based decisions...")
+        decision_maker = DecisionMaker()
+        features = np.random.default_rng(3).random((500, 3))
+        batched = decision_maker.rule_based_decisions(features)
+        expected = [decision_maker.rule_based_decision({'factor_1': f1, 'factor_2': f2, 'factor_3': f3})
+                    for f1, f2, f3 in features]
+        self.assertEqual(batched.tolist(), expected)
+
+    def test_make_decisions_uses_one_model_call(self):
+        """
+        Test that make_decisions predicts the whole batch with the trained model.
+        """
+        print("Testing batched model decisions...")
+        decision_maker = DecisionMaker()
+        decision_maker.train_model(np.array([[0.9, 0.1, 0.5], [0.1, 0.9, 0.5]]), np.array(["Action_A", "Action_B"]))
+        decisions = decision_maker.make_decisions([[0.95, 0.05, 0.5], [0.05, 0.95, 0.5]])
+        self.assertEqual(decisions.tolist(), ["Action_A", "Action_B"])
+
+
 if __name__ == "__main__":
     # Run all the tests
     unittest.main()
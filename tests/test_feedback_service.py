@@ -0,0 +1,117 @@
+# test_feedback_service.py
+
+import unittest
+import numpy as np
+from glide.feedback_service import ShardedFeedbackService
+
+
+def naive_retrains(batches, failure_threshold=3):
+    """
+    Replay feedback one event at a time, as FeedbackLoop would, with streaks reset after each batch.
+    """
+    streaks, retrains = {}, []
+    for agent_ids, feedback in batches:
+        worst = {}
+        for agent_id, success in zip(agent_ids, feedback):
+            streaks[agent_id] = 0 if success else streaks.get(agent_id, 0) + 1
+            worst[agent_id] = max(worst.get(agent_id, 0), streaks[agent_id])
+        for agent_id, streak in worst.items():
+            if streak >= failure_threshold:
+                retrains.append(agent_id)
+                streaks[agent_id] = 0
+    return sorted(retrains), streaks
+
+
+def failing_retrain(agent_ids):
+    raise RuntimeError("Retraining failed")
+
+
+class TestShardedFeedbackService(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up seeded feedback batches from 50 agents.
+        This will be called before each test.
+        """
+        rng = np.random.default_rng(0)
+        self.batches = [(rng.integers(0, 50, 40), (rng.random(40) < 0.5).astype(int)) for _ in range(20)]
+
+    def check_service(self, service):
+        for agent_ids, feedback in self.batches:
+            service.submit(agent_ids, feedback)
+        retrains, streaks = naive_retrains(self.batches)
+        np.testing.assert_array_equal(service.retrain_requests(), retrains)
+        self.assertEqual(len(service.retrain_requests()), 0, "Retrain requests should be handed out once.")
+        for agent_id in range(50):
+            agent = service.agent(agent_id)
+            self.assertEqual(agent["failure_streak"] if agent else 0, streaks.get(agent_id, 0))
+
+        metrics = service.metrics()
+        self.assertEqual(metrics["events"], 800)
+        self.assertEqual(metrics["successes"] + metrics["failures"], 800)
+        self.assertEqual(metrics["retrains"], len(retrains))
+        self.assertEqual(len(metrics["shards"]), 3)
+
+    def test_inline(self):
+        """
+        Test batched retrain decisions against event-by-event replay, in the calling process.
+        """
+        print("Testing inline feedback shards...")
+        self.check_service(ShardedFeedbackService(num_shards=3, executor='inline', capacity=2))
+
+    def test_process(self):
+        """
+        Test batched retrain decisions against event-by-event replay, in shard processes.
+        """
+        print("Testing feedback shard processes...")
+        with ShardedFeedbackService(num_shards=3, executor='process') as service:
+            self.check_service(service)
+
+    def test_sharding(self):
+        """
+        Test the agent to shard mapping and input validation.
+        """
+        print("Testing agent sharding...")
+        service = ShardedFeedbackService(num_shards=4, executor='inline')
+        shards = service.shard_of(np.arange(4000))
+        self.assertEqual(int(service.shard_of(11)), shards[11])
+        # Hashed ids spread evenly, even when they are all multiples of the shard count
+        for agent_ids in (np.arange(4000), np.arange(0, 16000, 4)):
+            counts = np.bincount(service.shard_of(agent_ids), minlength=4)
+            self.assertTrue(np.all(np.abs(counts - 1000) < 100), counts)
+        service.submit([1000001], [1])
+        self.assertEqual(service.agent(1000001)["successes"], 1)
+        self.assertIsNone(service.agent(7))
+        with self.assertRaises(ValueError):
+            service.submit([1, 2], [1])
+        with self.assertRaises(ValueError):
+            ShardedFeedbackService(executor='thread')
+
+    def test_large_ids(self):
+        """
+        Test that memory follows the number of agents, not the size of their ids.
+        """
+        print("Testing large agent ids...")
+        agent_ids = [2 ** 40, 2 ** 62, 3, 2 ** 40]
+        for executor in ('inline', 'process'):
+            with ShardedFeedbackService(num_shards=2, executor=executor, capacity=2, failure_threshold=2) as service:
+                service.submit(agent_ids, [0, 1, 1, 0])
+                np.testing.assert_array_equal(service.retrain_requests(), [2 ** 40])
+                self.assertEqual(service.agent(2 ** 62)["successes"], 1)
+                self.assertEqual(service.metrics()["agents"], 3)
+                if executor == 'inline':
+                    self.assertLessEqual(max(len(shard.agent_ids) for shard in service.shards), 4)
+
+    def test_dead_shard(self):
+        """
+        Test that a query fails instead of hanging when a shard process has died.
+        """
+        print("Testing dead shard processes...")
+        service = ShardedFeedbackService(num_shards=2, executor='process', retrain_function=failing_retrain)
+        service.submit(np.arange(10).repeat(3), np.zeros(30))  # Every agent is due for retraining
+        with self.assertRaises(RuntimeError):
+            service.metrics()
+        service.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# test_game_simulation.py
+
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+from game_simulation import (ATTACK, DEFEND, LEFT, RIGHT, BatchGameSimulation, DecisionMaker, rule_based_policy,
+                             run_simulation_farm)
+
+
+def defend_policy(enemy_position, position, health):
+    return np.full(len(position), DEFEND)
+
+class TestBatchGameSimulation(unittest.TestCase):
+
+    def test_rule_based_policy_matches_decision_maker(self):
+        """
+        Test that the vectorized policy makes the same decisions as DecisionMaker.
+        """
+        print("Testing the vectorized rule-based policy...")
+        enemy_position = np.arange(11)
+        position = np.full(11, 5)
+        actions = rule_based_policy(enemy_position, position, np.full(11, 100))
+        codes = {'ATTACK': ATTACK, 'right': RIGHT, 'left': LEFT}
+        for enemy, action in zip(enemy_position, actions):
+            decision = DecisionMaker().make_decision({'enemy_position': enemy}, {'position': 5})
+            self.assertEqual(codes[decision.get('direction', decision['action'])], action)
+
+    def test_worlds_end_when_health_runs_out(self):
+        """
+        Test that seeded batches are reproducible and that worlds end at zero health.
+        """
+        print("Testing lockstep game worlds...")
+        first = BatchGameSimulation(300, seed=2).run(max_frames=200)
+        second = BatchGameSimulation(300, seed=np.random.default_rng(2)).run(max_frames=200)
+        for name in first:
+            np.testing.assert_array_equal(first[name], second[name])
+        ended = first['frames_survived'] < 200
+        self.assertTrue(ended.any())
+        self.assertTrue(np.all(first['health'][ended] <= 0))
+        self.assertTrue(np.all(first['scores'][ended] >= 10), "Each attack costs 10 of the 100 health.")
+
+class TestSimulationFarm(unittest.TestCase):
+
+    def test_farm(self):
+        """
+        Test that the farm covers every world across shards and is reproducible.
+        """
+        print("Testing the game simulation farm...")
+        summary = run_simulation_farm(1000, max_frames=50, workers=2, seed=3)
+        self.assertEqual(set(summary), {'scores', 'frames_survived', 'health'})
+        self.assertEqual(summary['frames_survived']['count'], 1000)
+        self.assertLessEqual(summary['frames_survived']['max'], 50)
+        self.assertEqual(summary, run_simulation_farm(1000, max_frames=50, workers=2, seed=3))
+
+    def test_farm_evaluates_policy(self):
+        """
+        Test that the farm evaluates the given policy.
+        """
+        print("Testing policy evaluation...")
+        summary = run_simulation_farm(100, max_frames=20, seed=4, policy=defend_policy)
+        self.assertEqual(summary['frames_survived']['min'], 20, "Defending never loses health.")
+        self.assertEqual(summary['health']['min'], 200)
+        self.assertEqual(summary['scores']['max'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,17 @@
 # test_gaming_engine.py
 
+import io
+import os
+import shutil
+import tempfile
+import time
 import unittest
-from gaming_engine import GamingEngine
+from contextlib import redirect_stdout
+import numpy as np
+from gaming_engine import (GamingEngine, GameState, PhysicsEngine, SpatialHashGrid, FrameProfiler, Player, Enemy,
+                           AIDecisionMaker, NPCPolicy, RandomPolicy, ModelPolicy, WorldBatch, SimulationFarm, SnapshotRing,
+                           HeadlessRenderBackend, BinaryFrameLogBackend, read_frame_log, frame_size,
+                           read_journal, read_journal_start, replay_journal, JOURNAL_RECORD, IDLE, MOVE, ATTACK)
 from decision_maker import DecisionMaker
 
 class TestGamingEngine(unittest.TestCase):
@@ -137,6 +147,496 @@ class TestGamingEngine(unittest.TestCase):
         self.decision_maker = None
 
 
+class TestEntityStore(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a game state backed by the struct-of-arrays entity store.
+        """
+        self.game_state = GameState(num_enemies=1000, rng=np.random.default_rng(0))
+        self.physics_engine = PhysicsEngine()
+
+    def test_proxy_views_share_storage(self):
+        """
+        Test that the player and enemy proxies read and write the underlying arrays.
+        """
+        print("Testing entity proxy views...")
+        self.game_state.player.move("UP")
+        self.assertEqual(self.game_state.entities.positions[0, 1], 1, "The player proxy should write to the store.")
+        enemy = self.game_state.enemies[-1]
+        enemy.health -= 5
+        self.assertEqual(self.game_state.entities.health[-1], 45, "Enemy proxies should write to the store.")
+        self.assertEqual(len(self.game_state.enemies), 1000)
+
+    def test_apply_ai_actions_accepts_names_and_codes(self):
+        """
+        Test that AI actions can be given as names or as integer action codes.
+        """
+        print("Testing AI action encoding...")
+        before = self.game_state.entities.enemy_positions.copy()
+        codes = np.full(1000, IDLE, dtype=np.int8)
+        codes[:10] = MOVE
+        self.game_state.apply_ai_actions(codes)
+        moved = np.any(self.game_state.entities.enemy_positions != before, axis=1)
+        self.assertEqual(np.count_nonzero(moved), 10, "Only moving enemies should change position.")
+
+        small_state = GameState(num_enemies=3)
+        small_state.apply_ai_actions(["IDLE", "MOVE", "IDLE"])
+        self.assertEqual([enemy.action for enemy in small_state.enemies], ["IDLE", "MOVE", "IDLE"])
+
+    def test_vectorized_gravity_and_collisions(self):
+        """
+        Test that gravity and collision damage are applied to the whole store at once.
+        """
+        print("Testing vectorized physics...")
+        entities = self.game_state.entities
+        entities.enemy_positions[:] = [5.0, 5.0]
+        entities.enemy_positions[:3] = [0.5, 0.0]
+        self.physics_engine.update(self.game_state)
+        self.assertTrue(np.allclose(entities.enemy_positions[3:, 1], 4.9), "Gravity should pull airborne enemies down.")
+        self.assertEqual(self.game_state.player.health, 70, "Each colliding enemy should deal 10 damage.")
+
+    def test_standalone_entities(self):
+        """
+        Test that Player and Enemy can still be created on their own.
+        """
+        print("Testing standalone entities...")
+        player = Player()
+        enemy = Enemy()
+        self.assertEqual(player.health, 100)
+        self.assertEqual(enemy.health, 50)
+        enemy.perform_action("MOVE")
+        self.assertEqual(enemy.action, "MOVE")
+        self.assertTrue(self.physics_engine.detect_collision(player, player))
+
+
+class TestSpatialHashGrid(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a random cloud of positions dense enough to contain many collisions.
+        """
+        self.positions = np.random.default_rng(1).uniform(-20, 20, size=(2000, 2))
+        self.grid = SpatialHashGrid(cell_size=1.0)
+        self.grid.build(self.positions)
+
+    def brute_force_pairs(self):
+        offsets = np.abs(self.positions[:, None, :] - self.positions[None, :, :])
+        hits = (offsets < 1).all(axis=2)
+        first, second = np.nonzero(np.triu(hits, k=1))
+        return set(zip(first.tolist(), second.tolist()))
+
+    def test_candidate_pairs_cover_all_collisions(self):
+        """
+        Test that narrow-phase filtering of the candidates matches the O(n^2) result.
+        """
+        print("Testing broad-phase candidate pairs...")
+        pairs = self.grid.candidate_pairs()
+        hits = PhysicsEngine.overlaps(self.positions[pairs[:, 0]], self.positions[pairs[:, 1]])
+        found = set(map(tuple, pairs[hits].tolist()))
+        self.assertEqual(found, self.brute_force_pairs(), "The broad phase should not miss any collision.")
+        self.assertEqual(len(set(map(tuple, pairs.tolist()))), len(pairs), "Candidate pairs should be unique.")
+
+    def test_rebuild_reuses_previous_order(self):
+        """
+        Test that rebuilding after small moves gives the same sorted keys as a fresh grid.
+        """
+        print("Testing broad-phase rebuilds...")
+        self.positions += np.random.default_rng(2).normal(0, 0.3, self.positions.shape)
+        self.grid.build(self.positions)
+        fresh = SpatialHashGrid(cell_size=1.0)
+        fresh.build(self.positions)
+        np.testing.assert_array_equal(self.grid.sorted_keys, fresh.sorted_keys)
+        self.assertEqual(sorted(self.grid.order.tolist()), list(range(len(self.positions))))
+        self.test_candidate_pairs_cover_all_collisions()
+
+    def test_point_query(self):
+        """
+        Test that point queries return every entity that collides with the point.
+        """
+        print("Testing broad-phase point queries...")
+        point = np.array([[0.25, -0.5]])
+        _, candidates = self.grid.query(point)
+        hits = candidates[PhysicsEngine.overlaps(self.positions[candidates], point[0])]
+        expected = np.flatnonzero(PhysicsEngine.overlaps(self.positions, point[0]))
+        self.assertEqual(sorted(hits.tolist()), expected.tolist())
+
+    def test_enemy_collisions_in_game_state(self):
+        """
+        Test that the physics engine reports overlapping enemies.
+        """
+        print("Testing enemy-vs-enemy collisions...")
+        game_state = GameState(num_enemies=4)
+        game_state.entities.enemy_positions[:] = [[0, 0], [0.5, 0.5], [5, 5], [-5, 5]]
+        pairs = PhysicsEngine().find_enemy_collisions(game_state)
+        self.assertEqual(pairs.tolist(), [[0, 1]])
+
+    def test_enemy_separation_in_update(self):
+        """
+        Test that the update resolves enemy overlaps found by the broad phase when enabled.
+        """
+        print("Testing enemy separation...")
+        game_state = GameState(num_enemies=4)
+        game_state.entities.enemy_positions[:] = [[0, 0], [0.5, 0], [5, 0], [-5, 0]]
+        before = game_state.entities.enemy_positions.copy()
+        PhysicsEngine().update(game_state)
+        np.testing.assert_array_equal(game_state.entities.enemy_positions, before, "Separation should be opt-in.")
+
+        PhysicsEngine(enemy_collisions=True).update(game_state)
+        np.testing.assert_allclose(game_state.entities.enemy_positions[:, 0], [-0.25, 0.75, 5, -5])
+        self.assertEqual(len(PhysicsEngine().find_enemy_collisions(game_state)), 0)
+
+
+class TestFixedTimestepLoop(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a gaming engine with a fast tick rate.
+        """
+        self.gaming_engine = GamingEngine(tick_rate=200.0)
+
+    def test_headless_run_is_bounded(self):
+        """
+        Test that a headless run stops after max_steps and profiles every phase.
+        """
+        print("Testing bounded headless run...")
+        with redirect_stdout(io.StringIO()):
+            steps = self.gaming_engine.update(max_steps=25, realtime=False)
+        self.assertEqual(steps, 25, "The loop should stop after max_steps.")
+        summary = self.gaming_engine.profiler.summary()
+        for phase in FrameProfiler.PHASES:
+            self.assertEqual(summary[phase]["count"], 25, f"Phase '{phase}' should be timed every frame.")
+        histogram = self.gaming_engine.profiler.histogram("physics", bins=5)
+        self.assertEqual(sum(histogram["counts"]), 25)
+
+    def test_realtime_pacing(self):
+        """
+        Test that realtime mode paces steps at the configured tick rate.
+        """
+        print("Testing realtime pacing...")
+        alphas = []
+        self.gaming_engine.interpolation_hook = lambda game_state, alpha: alphas.append(alpha)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            steps = self.gaming_engine.update(max_steps=10)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(steps, 10)
+        self.assertGreaterEqual(elapsed, 9 / 200.0, "Steps should not run faster than the tick rate.")
+        self.assertLess(elapsed, 1.0, "Steps should not be padded with a fixed sleep.")
+        self.assertTrue(alphas and all(0 <= alpha < 1 for alpha in alphas), "Interpolation alpha should be in [0, 1).")
+
+    def test_rolling_window(self):
+        """
+        Test that the profiler keeps only the most recent samples.
+        """
+        print("Testing rolling profiler window...")
+        profiler = FrameProfiler(window=3)
+        for duration in (0.001, 0.002, 0.003, 0.004):
+            profiler.record("render", duration)
+        self.assertEqual(profiler.summary()["render"]["count"], 3)
+        self.assertAlmostEqual(profiler.summary()["render"]["max_ms"], 4.0)
+
+
+class TestRenderBackends(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a temporary directory for frame logs.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "frames.bin")
+
+    def test_headless_backend_is_silent(self):
+        """
+        Test that the headless backend produces no console output.
+        """
+        print("Testing headless rendering...")
+        gaming_engine = GamingEngine(render_backend=HeadlessRenderBackend())
+        output = io.StringIO()
+        with redirect_stdout(output):
+            gaming_engine.game_state.apply_ai_actions(np.full(5, ATTACK, dtype=np.int8))
+            gaming_engine.update(max_steps=10, realtime=False)
+        self.assertNotIn("Enemy at", output.getvalue(), "Headless runs should not print frames or attacks.")
+
+    def test_binary_frame_log_round_trip(self):
+        """
+        Test that frames written to the binary log can be replayed offline.
+        """
+        print("Testing binary frame log round trip...")
+        game_state = GameState(num_enemies=7)
+        with BinaryFrameLogBackend(self.log_path) as backend:
+            for _ in range(3):
+                game_state.apply_ai_actions(["MOVE"] * 7)
+                backend.render(game_state)
+        self.assertEqual(os.path.getsize(self.log_path), 6 + 3 * frame_size(8), "Frames should be fixed-size records.")
+
+        frames = list(read_frame_log(self.log_path))
+        self.assertEqual([frame["frame"] for frame in frames], [0, 1, 2])
+        last = frames[-1]
+        self.assertTrue(np.allclose(last["positions"], game_state.entities.positions))
+        self.assertEqual(last["health"][0], 100)
+        self.assertTrue(np.all(last["actions"][1:] == MOVE))
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        print("Cleaning up after test...")
+        shutil.rmtree(self.temp_dir)
+
+
+class TestBatchedNPCPolicy(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a large game state for batched decisions.
+        """
+        self.game_state = GameState(num_enemies=10000, rng=np.random.default_rng(2))
+
+    def test_seeded_random_policy(self):
+        """
+        Test that the default policy decides for every enemy at once and is reproducible.
+        """
+        print("Testing seeded random NPC policy...")
+        first = AIDecisionMaker(seed=7).make_decision(self.game_state)
+        second = AIDecisionMaker(seed=7).make_decision(self.game_state)
+        self.assertEqual(first.shape, (10000,))
+        self.assertEqual(first.dtype, np.int8)
+        self.assertTrue(np.array_equal(first, second), "Equal seeds should give equal decisions.")
+        self.assertEqual(set(np.unique(first).tolist()), {IDLE, MOVE, ATTACK})
+
+    def test_model_policy_with_decision_maker(self):
+        """
+        Test that a batched DecisionMaker model can drive every NPC in one call.
+        """
+        print("Testing model-driven NPC policy...")
+        decision_maker = DecisionMaker()
+        # Attack when close to the player, otherwise move
+        decision_maker.train_model(np.array([[0.5, 0.5, 50], [8.0, 8.0, 50]]), np.array(["ATTACK", "MOVE"]))
+        ai_decision_maker = AIDecisionMaker(policy=ModelPolicy(decision_maker))
+        self.game_state.entities.enemy_positions[:] = [9.0, 9.0]
+        self.game_state.entities.enemy_positions[:100] = [0.2, 0.2]
+        actions = ai_decision_maker.make_decision(self.game_state)
+        self.assertTrue(np.all(actions[:100] == ATTACK))
+        self.assertTrue(np.all(actions[100:] == MOVE))
+        self.game_state.apply_ai_actions(actions)
+        self.assertEqual(self.game_state.enemies[0].action, "ATTACK")
+
+
+class TestSimulationFarm(unittest.TestCase):
+
+    def test_world_batch_is_seeded(self):
+        """
+        Test that lockstep worlds are reproducible and end when the player dies.
+        """
+        print("Testing lockstep world batch...")
+        first = WorldBatch(500, rng=np.random.default_rng(4)).run(max_frames=300)
+        second = WorldBatch(500, rng=np.random.default_rng(4)).run(max_frames=300)
+        self.assertTrue(np.array_equal(first["frames_survived"], second["frames_survived"]))
+        self.assertTrue(np.all(first["frames_survived"] <= 300))
+        dead = first["frames_survived"] < 300
+        self.assertTrue(np.all(first["health"][dead] <= 0), "Worlds should only end early when the player dies.")
+
+    def test_farm_aggregates_shards(self):
+        """
+        Test that sharded runs aggregate results across every world.
+        """
+        print("Testing sharded simulation farm...")
+        farm = SimulationFarm(num_worlds=1000, seed=5, workers=2)
+        summary = farm.run(max_frames=50)
+        self.assertEqual(farm.stats["shards"], 2)
+        for name in ("frames_survived", "health"):
+            self.assertEqual(summary[name]["count"], 1000, f"'{name}' should cover every world.")
+        self.assertLessEqual(summary["frames_survived"]["max"], 50)
+        self.assertEqual(farm.stats["frames_simulated"], int(farm.results["frames_survived"].sum()))
+
+    def test_farm_evaluates_policy(self):
+        """
+        Test that the farm runs the given NPC policy, and that ended worlds stay frozen.
+        """
+        print("Testing policy evaluation in the simulation farm...")
+        class StillPolicy(NPCPolicy):
+            def decide(self, entities):
+                return np.full(entities.enemy_health.shape, IDLE, dtype=np.int8)
+
+        batch = WorldBatch(200, rng=np.random.default_rng(6), policy=StillPolicy())
+        start = batch.enemy_positions.copy()
+        batch.run(max_frames=20)
+        # Idle enemies only fall, and never below the ground they started above
+        np.testing.assert_array_equal(batch.enemy_positions[:, :, 0], start[:, :, 0])
+
+        batch.alive[:100] = False
+        frozen = (batch.player_position[:100].copy(), batch.enemy_positions[:100].copy())
+        batch.step()
+        np.testing.assert_array_equal(batch.player_position[:100], frozen[0])
+        np.testing.assert_array_equal(batch.enemy_positions[:100], frozen[1], "Gravity should skip ended worlds.")
+
+        decision_maker = DecisionMaker()
+        decision_maker.train_model(np.array([[0.5, 0.5, 50], [8.0, 8.0, 50]]), np.array(["ATTACK", "MOVE"]))
+        farm = SimulationFarm(num_worlds=100, seed=7, policy=ModelPolicy(decision_maker))
+        summary = farm.run(max_frames=30)
+        self.assertEqual(summary["frames_survived"]["count"], 100)
+
+
+    def test_shards_draw_independent_policy_streams(self):
+        """
+        Test that every shard gets its own copy of a seeded policy, with its own random stream.
+        """
+        print("Testing per-shard policy generators...")
+        policy = RandomPolicy(np.random.default_rng(8))
+        state = policy.rng.bit_generator.state
+        first, second = (policy.spawn(child) for child in np.random.SeedSequence(9).spawn(2))
+        self.assertIsNot(first, policy)
+        entities = WorldBatch(50, rng=np.random.default_rng(0))
+        self.assertFalse(np.array_equal(first.decide(entities), second.decide(entities)))
+        self.assertEqual(policy.rng.bit_generator.state, state, "The farm's own policy should not be consumed.")
+
+        summaries = [SimulationFarm(num_worlds=200, seed=10, workers=2, policy=RandomPolicy(np.random.default_rng(8)))
+                     .run(max_frames=30) for _ in range(2)]
+        self.assertEqual(summaries[0], summaries[1], "Seeded farms should be reproducible.")
+
+
+class TestSnapshotRestore(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a seeded, headless gaming engine.
+        """
+        self.gaming_engine = GamingEngine(render_backend=HeadlessRenderBackend(), seed=11)
+
+    def run_steps(self, steps):
+        with redirect_stdout(io.StringIO()):
+            self.gaming_engine.update(max_steps=steps, realtime=False)
+        return self.gaming_engine.game_state.entities.buffer.copy()
+
+    def test_seeded_engines_are_deterministic(self):
+        """
+        Test that two engines with the same seed simulate identical worlds.
+        """
+        print("Testing deterministic seeding...")
+        other_engine = GamingEngine(render_backend=HeadlessRenderBackend(), seed=11)
+        with redirect_stdout(io.StringIO()):
+            other_engine.update(max_steps=30, realtime=False)
+        self.assertTrue(np.array_equal(self.run_steps(30), other_engine.game_state.entities.buffer))
+
+    def test_restore_and_resimulate(self):
+        """
+        Test that restoring a snapshot and re-simulating reproduces the same frames.
+        """
+        print("Testing snapshot restore and re-simulation...")
+        self.run_steps(5)
+        snapshot = self.gaming_engine.snapshot()
+        first_run = self.run_steps(20)
+        self.gaming_engine.restore(snapshot)
+        self.assertEqual(self.gaming_engine.frame, 5)
+        second_run = self.run_steps(20)
+        self.assertTrue(np.array_equal(first_run, second_run), "Re-simulation after restore should be identical.")
+
+    def test_snapshot_ring_rollback(self):
+        """
+        Test that the snapshot ring reuses slots and rejects frames it no longer holds.
+        """
+        print("Testing snapshot ring rollback...")
+        ring = SnapshotRing(capacity=4)
+        states = {}
+        for frame in range(10):
+            ring.save(self.gaming_engine, frame)
+            states[frame] = self.run_steps(1)
+        ring.restore(self.gaming_engine, 7)
+        self.assertEqual(self.gaming_engine.frame, 7, "Rolling back should rewind the frame number.")
+        self.assertTrue(np.array_equal(self.run_steps(1), states[7]))
+        self.assertEqual(self.gaming_engine.frame, 8)
+        with self.assertRaises(KeyError):
+            ring.restore(self.gaming_engine, 2)
+
+    def test_restore_rejects_other_world_sizes(self):
+        """
+        Test that a snapshot cannot be restored into a world of a different size.
+        """
+        print("Testing snapshot size validation...")
+        snapshot = GameState(num_enemies=3).snapshot()
+        with self.assertRaises(ValueError):
+            GameState(num_enemies=4).restore(snapshot)
+
+
+class TestReplayJournal(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a temporary directory for replay journals.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_path = os.path.join(self.temp_dir, "session.journal")
+
+    def record_session(self, steps, **engine_options):
+        gaming_engine = GamingEngine(render_backend=HeadlessRenderBackend(), **engine_options)
+        with gaming_engine.start_journal(self.journal_path), redirect_stdout(io.StringIO()):
+            gaming_engine.update(max_steps=steps, realtime=False)
+        return gaming_engine
+
+    def test_fixed_size_records(self):
+        """
+        Test that every frame is written as one fixed-size record.
+        """
+        print("Testing journal record layout...")
+        self.record_session(50, seed=21, num_enemies=8)
+        seed, num_enemies, records = read_journal(self.journal_path)
+        self.assertEqual((num_enemies, len(records)), (8, 50))
+        self.assertEqual(records['frame'].tolist(), list(range(50)))
+        self.assertEqual(records.dtype.itemsize, JOURNAL_RECORD.size + 8)
+
+    def test_replay_reproduces_session(self):
+        """
+        Test that an unseeded session replays to exactly the same final state.
+        """
+        print("Testing headless journal replay...")
+        # Enough enemies for collisions, damage and resets to occur during the session
+        recorded_engine = self.record_session(300, num_enemies=400)
+        result = replay_journal(self.journal_path)
+        self.assertEqual(result["frames"], 300)
+        self.assertEqual(result["mismatches"], 0, "Replayed frames should match the recorded deltas.")
+        self.assertTrue(np.array_equal(result["engine"].game_state.entities.buffer,
+                                       recorded_engine.game_state.entities.buffer))
+
+    def test_replay_with_sequence_seed(self):
+        """
+        Test that sessions seeded with a sequence of ints, as numpy accepts, are journaled and replayed.
+        """
+        print("Testing journals of sequence-seeded sessions...")
+        recorded_engine = self.record_session(50, seed=[3, 2 ** 40], num_enemies=8)
+        seed, _, _ = read_journal(self.journal_path)
+        self.assertEqual(seed, [3, 2 ** 40])
+        result = replay_journal(self.journal_path)
+        self.assertEqual(result["mismatches"], 0)
+        self.assertTrue(np.array_equal(result["engine"].game_state.entities.buffer,
+                                       recorded_engine.game_state.entities.buffer))
+
+    def test_replay_from_mid_session(self):
+        """
+        Test that a journal started after the first frame replays from the state it started at.
+        """
+        print("Testing mid-session journal replay...")
+        gaming_engine = GamingEngine(render_backend=HeadlessRenderBackend(), num_enemies=400)
+        with redirect_stdout(io.StringIO()):
+            gaming_engine.update(max_steps=100, realtime=False)
+            with gaming_engine.start_journal(self.journal_path):
+                gaming_engine.update(max_steps=50, realtime=False)
+        start_frame, snapshot = read_journal_start(self.journal_path)
+        self.assertEqual(start_frame, 100)
+        result = replay_journal(self.journal_path)
+        self.assertEqual(result["mismatches"], 0)
+        self.assertEqual(result["engine"].frame, 150)
+        self.assertTrue(np.array_equal(result["engine"].game_state.entities.buffer,
+                                       gaming_engine.game_state.entities.buffer))
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        print("Cleaning up after test...")
+        shutil.rmtree(self.temp_dir)
+
+
 if __name__ == "__main__":
     # Run all the tests
     unittest.main()
@@ -0,0 +1,126 @@
+# test_glide_system.py
+
+import unittest
+from glide.glide_system import GlideSystem, PipelineStage, default_stages
+
+
+def double(item):
+    return item * 2
+
+
+def drop_odd(item):
+    return item if item % 2 == 0 else None
+
+
+def fail_on_three(item):
+    if item == 3:
+        raise ValueError("Bad item")
+    return item
+
+
+def failing_source():
+    yield 1
+    yield 2
+    raise IOError("Source disconnected")
+
+
+class TestGlideSystem(unittest.TestCase):
+
+    def test_default_pipeline(self):
+        """
+        Test that batches flow through scan -> process -> decide -> learn.
+        """
+        print("Testing the default Glide pipeline...")
+        stages = default_stages(seed=0)
+        glide_system = GlideSystem(stages=stages, queue_size=2)
+        batches = [[0.9, 0.1, 0.2, 'text'], [0.2, 0.3, 0.9], [0.5, 0.5, 0.5]]
+        results = glide_system.run(batches)
+        self.assertEqual(len(results), 3, "Every batch should produce a result.")
+        for decision, feedback in results:
+            self.assertIn(decision, ["Action_A", "Action_B", "Action_C"])
+            self.assertIn(feedback, [0, 1])
+        metrics = glide_system.metrics()
+        self.assertEqual(list(metrics), ['scan', 'process', 'decide', 'learn'])
+        self.assertTrue(all(stage["items"] == 3 for stage in metrics.values()))
+        self.assertTrue(all(stage["errors"] == 0 for stage in metrics.values()))
+        policy = stages[2].function.decision_maker.model
+        self.assertIs(stages[3].function.decision_maker.model, policy, "Learning should update the deciding model.")
+        self.assertEqual(policy.updates, 3)
+
+    def test_per_worker_stage_objects(self):
+        """
+        Test that stage factories give every worker its own stateful object.
+        """
+        print("Testing per-worker stage objects...")
+        stages = default_stages(seed=1)
+        stages[0].workers = stages[1].workers = 3
+        results = GlideSystem(stages=stages).run([[float(index), 1.0, 2.0] for index in range(60)])
+        self.assertEqual(len(results), 60)
+        built = [stages[0].build() for _ in range(2)]
+        self.assertIsNot(built[0].scanner, built[1].scanner)
+        with self.assertRaises(ValueError):
+            GlideSystem(executor='process')
+        with self.assertRaises(ValueError):
+            PipelineStage('both', double, factory=lambda: double)
+
+    def test_metrics_and_backpressure(self):
+        """
+        Test that stages with several workers process every item and queues stay bounded.
+        """
+        print("Testing pipeline metrics and bounded queues...")
+        stages = [PipelineStage('double', double, workers=3), PipelineStage('filter', drop_odd, workers=2)]
+        glide_system = GlideSystem(stages=stages, queue_size=4)
+        results = glide_system.run(range(200))
+        self.assertEqual(sorted(results), [item * 2 for item in range(200)])
+        metrics = glide_system.metrics()
+        self.assertEqual(metrics['double']["items"], 200)
+        self.assertLessEqual(metrics['filter']["max_queue_depth"], 4, "Queues should never exceed their capacity.")
+        self.assertEqual(metrics['filter']["queue_depth"], 0, "Queues should be drained after a run.")
+        self.assertGreater(metrics['double']["throughput_per_second"], 0)
+
+    def test_stage_errors_are_counted(self):
+        """
+        Test that a failing item is dropped and counted without stopping the pipeline.
+        """
+        print("Testing pipeline error handling...")
+        glide_system = GlideSystem(stages=[PipelineStage('check', fail_on_three)])
+        results = glide_system.run(range(5))
+        self.assertEqual(results, [0, 1, 2, 4])
+        self.assertEqual(glide_system.metrics()['check']["errors"], 1)
+
+    def test_failing_source(self):
+        """
+        Test that a failing source ends the stream and its error reaches the caller.
+        """
+        print("Testing failing pipeline sources...")
+        for executor in ('thread', 'process'):
+            glide_system = GlideSystem(stages=[PipelineStage('double', double)], executor=executor)
+            with self.assertRaises(IOError):
+                glide_system.run(failing_source())
+            self.assertEqual(glide_system.metrics()['double']["items"], 2, "Items read before the failure should flow.")
+
+    def test_process_executor(self):
+        """
+        Test that stages can run in separate processes.
+        """
+        print("Testing process-based pipeline stages...")
+        stages = [PipelineStage('double', double), PipelineStage('filter', drop_odd, workers=2)]
+        glide_system = GlideSystem(stages=stages, queue_size=8, executor='process')
+        results = glide_system.run(range(50))
+        self.assertEqual(sorted(results), [item * 2 for item in range(50)])
+        self.assertEqual(glide_system.metrics()['filter']["items"], 50)
+
+    def test_invalid_configuration(self):
+        """
+        Test that invalid executors and worker counts raise a ValueError.
+        """
+        print("Testing invalid pipeline configuration...")
+        with self.assertRaises(ValueError):
+            GlideSystem(executor='cluster')
+        with self.assertRaises(ValueError):
+            PipelineStage('empty', double, workers=0)
+
+
+if __name__ == "__main__":
+    # Run all the tests
+    unittest.main()
@@ -0,0 +1,72 @@
+# test_init.py
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import-time budget for `import glide`, in seconds
+IMPORT_TIME_BUDGET = 0.05
+
+HEAVY_MODULES = ["numpy", "pandas", "sklearn", "cv2"]
+
+
+def run_in_fresh_interpreter(code):
+    """
+    Run code in a new interpreter (so nothing is already imported) and return its JSON output.
+    """
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPOSITORY_ROOT, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestPackageImport(unittest.TestCase):
+
+    def test_import_is_fast_and_light(self):
+        """
+        Test that importing the package stays within budget and loads no heavy dependency.
+        """
+        print("Testing package import time...")
+        result = run_in_fresh_interpreter(
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import glide\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+        )
+        self.assertEqual(result["loaded"], [], "Importing glide should not import heavy dependencies.")
+        self.assertLess(result["elapsed"], IMPORT_TIME_BUDGET, "Importing glide exceeded its time budget.")
+
+    def test_attributes_load_lazily(self):
+        """
+        Test that accessing a class imports only what that class needs.
+        """
+        print("Testing lazy attribute loading...")
+        result = run_in_fresh_interpreter(
+            "import json, sys\n"
+            "import glide\n"
+            "engine = glide.GamingEngine\n"
+            "scanner = glide.DataScanner()\n"
+            f"print(json.dumps({{'name': engine.__name__, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))"
+        )
+        self.assertEqual(result["name"], "GamingEngine")
+        self.assertEqual(result["loaded"], ["numpy"], "Only numpy should be needed by the engine and scanner.")
+
+    def test_public_attributes(self):
+        """
+        Test that every advertised attribute resolves and unknown names raise AttributeError.
+        """
+        print("Testing public package attributes...")
+        import glide
+        for name in glide.__all__:
+            self.assertTrue(callable(getattr(glide, name)), f"glide.{name} should resolve.")
+        with self.assertRaises(AttributeError):
+            glide.ResearchTools
+
+
+if __name__ == "__main__":
+    # Run all the tests
+    unittest.main()
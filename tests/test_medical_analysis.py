@@ -0,0 +1,197 @@
+# test_medical_analysis.py
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+from medical_analysis import DiagnosisMaker, DiagnosisService, ModelTrainer
+
+
+def make_records(size=120, seed=0):
+    rng = np.random.default_rng(seed)
+    records = pd.DataFrame({
+        'age': rng.integers(20, 80, size=size),
+        'blood_pressure': rng.integers(80, 180, size=size),
+        'cholesterol': rng.integers(150, 300, size=size)
+    })
+    records['disease'] = (records['blood_pressure'] > 130).astype(int)
+    return records
+
+class FixedRiskModel:
+    """
+    A stand-in model whose risk score is the first feature.
+    """
+    def predict_proba(self, features):
+        return np.column_stack((1 - features[:, 0], features[:, 0]))
+
+class TestDiagnosisService(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up labelled patient records and a directory for saved models.
+        """
+        print("Setting up test environment...")
+        self.data = make_records()
+        self.directory = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.directory, "model.pkl")
+
+    def test_train_serving_model(self):
+        """
+        Test that the serving model scales raw records itself and is calibrated by default.
+        """
+        print("Testing serving model training...")
+        features = self.data.drop(columns='disease').to_numpy(dtype=float)
+        labels = self.data['disease'].to_numpy()
+        calibrated = ModelTrainer().train_serving_model(features, labels)
+        raw = ModelTrainer().train_serving_model(features, labels, calibration=None)
+        self.assertEqual(type(calibrated).__name__, 'CalibratedClassifierCV')
+        self.assertEqual(type(raw).__name__, 'Pipeline')
+        for model in (calibrated, raw):
+            probabilities = model.predict_proba(features)[:, 1]
+            self.assertEqual(probabilities.shape, (len(features),))
+            self.assertGreater(np.mean((probabilities >= 0.5) == labels), 0.9)
+
+    def test_load_or_train(self):
+        """
+        Test that the model is trained once, saved, and loaded by later services without retraining.
+        """
+        print("Testing load or train...")
+        service = DiagnosisService(ModelTrainer(), model_path=self.model_path, calibration=None)
+        service.load_or_train(self.data)
+        self.assertEqual(service.train_count, 1)
+        self.assertTrue(os.path.exists(self.model_path))
+
+        # The pickled model and training statistics round-trip unchanged
+        restored = DiagnosisService(ModelTrainer(), model_path=self.model_path, calibration=None)
+        restored.load_or_train(self.data)
+        self.assertEqual(restored.train_count, 0)
+        self.assertEqual(restored.trained_at, service.trained_at)
+        np.testing.assert_array_equal(restored.reference_mean, service.reference_mean)
+        np.testing.assert_array_equal(restored.reference_std, service.reference_std)
+        features = self.data.drop(columns='disease')
+        np.testing.assert_array_equal(restored.predict_proba(features), service.predict_proba(features))
+
+    def test_drift_score(self):
+        """
+        Test that drift is the largest feature mean shift in training standard deviations.
+        """
+        print("Testing drift score...")
+        service = DiagnosisService(ModelTrainer(), calibration=None)
+        service.train(self.data)
+        features = self.data.drop(columns='disease').to_numpy(dtype=float)
+        self.assertAlmostEqual(service.drift_score(features), 0.0)
+
+        shifted = features.copy()
+        shifted[:, 2] += 2 * service.reference_std[2]
+        shifted[:, 0] += 0.5 * service.reference_std[0]
+        self.assertAlmostEqual(service.drift_score(shifted), 2.0)
+
+    def test_maybe_retrain(self):
+        """
+        Test that the model is retrained only on schedule or when the data drifts.
+        """
+        print("Testing scheduled and drift retraining...")
+        service = DiagnosisService(ModelTrainer(), retrain_interval=3600.0, drift_threshold=0.5, calibration=None)
+        service.train(self.data)
+        self.assertIsNone(service.maybe_retrain(make_records(seed=1)))
+        self.assertEqual(service.train_count, 1)
+
+        drifted = self.data.copy()
+        drifted['age'] += 30
+        self.assertEqual(service.maybe_retrain(drifted), 'drift')
+        self.assertEqual(service.train_count, 2)
+        self.assertAlmostEqual(service.drift_score(drifted.drop(columns='disease')), 0.0)
+
+        service.trained_at = time.time() - 3601.0
+        self.assertEqual(service.maybe_retrain(drifted), 'schedule')
+        self.assertEqual(service.train_count, 3)
+
+    def test_latency_stats(self):
+        """
+        Test that prediction latency is recorded per batch and summarized per diagnosis.
+        """
+        print("Testing latency statistics...")
+        service = DiagnosisService(ModelTrainer(), latency_window=2, calibration=None)
+        with self.assertRaises(ValueError):
+            service.predict_proba(self.data.drop(columns='disease'))
+        self.assertEqual(service.latency_stats(), {"batches": 0})
+
+        service.train(self.data)
+        features = self.data.drop(columns='disease')
+        for size in (30, 10, 5):
+            service.predict_proba(features[:size])
+        stats = service.latency_stats()
+        self.assertEqual(stats["batches"], 2)  # Only the most recent batches are kept
+        self.assertEqual(stats["diagnoses"], 15)
+        self.assertGreater(stats["mean_ms"], 0.0)
+        self.assertLessEqual(stats["p50_ms"], stats["p95_ms"])
+        self.assertLessEqual(stats["p95_ms"], stats["p99_ms"])
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        """
+        print("Cleaning up after test...")
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+class TestDiagnosisMaker(unittest.TestCase):
+
+    def test_threshold_sweep_matches_brute_force(self):
+        """
+        Test the sweep's precision and recall against counting flagged patients at every threshold.
+        """
+        print("Testing threshold sweep...")
+        rng = np.random.default_rng(0)
+        risk_scores = np.round(rng.random(500), 2)  # Rounded so many patients share a score
+        labels = (rng.random(500) < risk_scores).astype(int)
+        thresholds = np.concatenate((np.linspace(0, 1, 101), [0.005, 0.995, 1.5]))
+        sweep = DiagnosisMaker().threshold_sweep(risk_scores, labels, thresholds)
+
+        for index, threshold in enumerate(thresholds):
+            flagged = risk_scores >= threshold
+            true_positives = np.count_nonzero(flagged & (labels == 1))
+            precision = true_positives / flagged.sum() if flagged.any() else 1.0
+            recall = true_positives / np.count_nonzero(labels == 1)
+            self.assertEqual(sweep['flagged'][index], flagged.sum())
+            self.assertAlmostEqual(sweep['precision'][index], precision)
+            self.assertAlmostEqual(sweep['recall'][index], recall)
+
+    def test_tune_threshold(self):
+        """
+        Test that ties in precision go to the highest threshold, which becomes the default.
+        """
+        print("Testing threshold tuning...")
+        maker = DiagnosisMaker()
+        risk_scores, labels = np.array([0.2, 0.6, 0.8]), np.array([0, 1, 1])
+        # 0.3 and 0.5 both flag exactly the diseased patients; 0.7 misses one
+        self.assertEqual(maker.tune_threshold(risk_scores, labels, thresholds=[0.1, 0.3, 0.5, 0.7]), 0.5)
+        self.assertEqual(maker.threshold, 0.5)
+        self.assertEqual(maker.tune_threshold(risk_scores, labels, min_recall=0.5, thresholds=[0.1, 0.3, 0.5, 0.7]),
+                         0.7)
+        with self.assertRaises(ValueError):
+            maker.tune_threshold(risk_scores, np.zeros(3), thresholds=[0.1, 0.3])
+
+    def test_diagnose_batch(self):
+        """
+        Test that batch diagnoses flag risk scores at or above the threshold, as the single-patient path does.
+        """
+        print("Testing batch diagnosis...")
+        maker = DiagnosisMaker(threshold=0.4)
+        features = np.array([[0.1, 7.0], [0.4, 7.0], [0.9, 7.0]])
+        result = maker.diagnose_batch(FixedRiskModel(), features)
+        np.testing.assert_array_equal(result['risk_score'], [0.1, 0.4, 0.9])
+        np.testing.assert_array_equal(result['diagnosis'], ['Healthy', 'Diseased', 'Diseased'])
+        np.testing.assert_array_equal(maker.diagnose_batch(FixedRiskModel(), features, threshold=0.5)['diagnosis'],
+                                      ['Healthy', 'Healthy', 'Diseased'])
+
+        self.assertEqual(maker.make_diagnosis(FixedRiskModel(), (features, None)), 'Diseased')
+        self.assertEqual(maker.make_diagnosis(FixedRiskModel(), (features[:1], None)), 'Healthy')
+
+if __name__ == "__main__":
+    unittest.main()
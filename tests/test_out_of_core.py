@@ -0,0 +1,114 @@
+# test_out_of_core.py
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from glide.feedback_loop import ModelTrainer
+from glide.out_of_core import ShardReader, OutOfCoreTrainer
+
+class TestOutOfCoreTrainer(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a temporary directory holding a few NPY shards.
+        This will be called before each test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.shard_paths = []
+        for shard_index in range(3):
+            features = rng.random((1000, 3))
+            labels = (features[:, 0] > 0.5).astype(float)  # Learnable label
+            path = os.path.join(self.temp_dir, f"shard_{shard_index}.npy")
+            np.save(path, np.column_stack((features, labels)))
+            self.shard_paths.append(path)
+
+    def test_shard_reader_chunks(self):
+        """
+        Test that the shard reader never yields more than chunk_size rows at a time.
+        """
+        print("Testing shard chunking...")
+        reader = ShardReader(self.shard_paths, chunk_size=256)
+        chunks = list(reader)
+        self.assertTrue(all(len(labels) <= 256 for _, labels in chunks), "Chunks should be capped at chunk_size.")
+        self.assertEqual(sum(len(labels) for _, labels in chunks), 3000, "Every row should be streamed exactly once.")
+        self.assertEqual(chunks[0][0].shape[1], 3, "The label column should be split from the features.")
+
+    def test_incremental_training(self):
+        """
+        Test that incremental mode learns from streamed chunks and reports statistics.
+        """
+        print("Testing incremental out-of-core training...")
+        trainer = OutOfCoreTrainer(mode='incremental', chunk_size=500)
+        model = trainer.train(self.shard_paths)
+        self.assertEqual(trainer.stats["rows"], 3000, "All rows should be used for training.")
+        self.assertGreater(trainer.stats["rows_per_second"], 0, "Throughput should be reported.")
+        self.assertIn("process_peak_rss_mb", trainer.stats, "Peak RSS should be reported.")
+        self.assertEqual([shard["rows"] for shard in trainer.shard_stats], [1000, 1000, 1000])
+        predictions = model.predict(np.array([[0.9, 0.5, 0.5], [0.1, 0.5, 0.5]]))
+        self.assertEqual(list(predictions), [1.0, 0.0], "The model should learn the labelling rule.")
+
+    def test_bagging_merges_shard_forests(self):
+        """
+        Test that bagging mode merges one small forest per shard into a single model.
+        """
+        print("Testing bagging over shards...")
+        trainer = OutOfCoreTrainer(mode='bagging', trees_per_shard=4, max_rows_per_shard=600)
+        model = trainer.train(self.shard_paths)
+        self.assertEqual(len(model.estimators_), 12, "The forest should hold the trees of every shard.")
+        self.assertEqual(trainer.stats["rows"], 1800, "Each shard should be capped at max_rows_per_shard.")
+        self.assertEqual(model.predict_proba(np.random.rand(5, 3)).shape, (5, 2))
+
+    def test_per_shard_memory(self):
+        """
+        Test that traced peak memory is measured separately for every shard.
+        """
+        print("Testing per-shard memory statistics...")
+        trainer = OutOfCoreTrainer(mode='incremental', chunk_size=1000, trace_memory=True)
+        trainer.train(self.shard_paths[:1] + [self._write_shard(10000)])
+        small, large = trainer.shard_stats
+        self.assertEqual((small["rows"], large["rows"]), (1000, 10000))
+        self.assertGreater(small["peak_traced_mb"], 0)
+        # Both shards are read 1000 rows at a time, so the larger one should not peak much higher
+        self.assertLess(large["peak_traced_mb"], small["peak_traced_mb"] * 3)
+
+    def test_model_trainer_wrapper(self):
+        """
+        Test that ModelTrainer.train_out_of_core trains a model and exposes the statistics.
+        """
+        print("Testing ModelTrainer.train_out_of_core...")
+        model_trainer = ModelTrainer()
+        model = model_trainer.train_out_of_core(self.shard_paths, mode='bagging', chunk_size=500)
+        self.assertEqual(model_trainer.stats["rows"], 3000)
+        self.assertEqual(len(model.estimators_), 30, "The default bagging mode fits 10 trees per shard.")
+
+    def _write_shard(self, rows):
+        features = np.random.default_rng(1).random((rows, 3))
+        path = os.path.join(self.temp_dir, f"shard_{rows}.npy")
+        np.save(path, np.column_stack((features, features[:, 0] > 0.5)))
+        return path
+
+    def test_invalid_inputs(self):
+        """
+        Test that invalid modes and shard formats raise a ValueError.
+        """
+        print("Testing invalid out-of-core inputs...")
+        with self.assertRaises(ValueError):
+            OutOfCoreTrainer(mode='unknown')
+        with self.assertRaises(ValueError):
+            list(ShardReader([os.path.join(self.temp_dir, "data.csv")]))
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        This will be called after each test.
+        """
+        print("Cleaning up after test...")
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == "__main__":
+    # Run all the tests
+    unittest.main()
@@ -0,0 +1,117 @@
+# test_profiler.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from glide.profiler import SpanProfiler, span
+from glide.gaming_engine import GamingEngine, HeadlessRenderBackend
+
+class TestSpanProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a fresh profiler.
+        This will be called before each test.
+        """
+        self.profiler = SpanProfiler()
+
+    def test_nested_spans(self):
+        """
+        Test that nested spans record their stack path and self time.
+        """
+        print("Testing nested spans...")
+        with self.profiler.span("outer"):
+            with self.profiler.span("inner"):
+                time.sleep(0.02)
+        summary = self.profiler.summary()
+        self.assertEqual(set(summary), {"outer", "outer;inner"})
+        self.assertGreaterEqual(summary["outer;inner"]["total_ms"], 20)
+        self.assertLess(summary["outer"]["self_ms"], summary["outer;inner"]["self_ms"],
+                        "Time spent in a child should not count as the parent's self time.")
+
+    def test_decorator_and_threads(self):
+        """
+        Test that decorated functions are recorded separately in each thread.
+        """
+        print("Testing decorated spans across threads...")
+
+        @self.profiler.profile()
+        def work():
+            return sum(range(1000))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.profiler.thread_states), 4, "Each thread should get its own buffer.")
+        name = work.__qualname__
+        self.assertEqual(self.profiler.summary()[name]["count"], 4)
+
+    def test_exports(self):
+        """
+        Test the Chrome trace and collapsed-stack exports.
+        """
+        print("Testing profile exports...")
+        with self.profiler.span("frame"):
+            with self.profiler.span("physics"):
+                pass
+        path = os.path.join(tempfile.mkdtemp(), "trace.json")
+        self.profiler.chrome_trace(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        complete = [event for event in events if event["ph"] == "X"]
+        self.assertEqual(sorted(event["name"] for event in complete), ["frame", "physics"])
+        self.assertTrue(all(event["dur"] >= 0 for event in complete))
+        lines = self.profiler.collapsed_stacks().splitlines()
+        self.assertEqual([line.split()[0] for line in lines], ["frame", "frame;physics"])
+        self.profiler.clear()
+        self.assertEqual(self.profiler.summary(), {})
+
+    def test_bounded_records(self):
+        """
+        Test that only the most recent spans are kept while the summary still counts every span.
+        """
+        print("Testing bounded span records...")
+        profiler = SpanProfiler(max_records=10)
+        for _ in range(100):
+            with profiler.span("frame"):
+                with profiler.span("physics"):
+                    pass
+        self.assertEqual(len(profiler.records()), 10)
+        self.assertEqual(len(profiler.chrome_trace()["traceEvents"]), 11)  # Plus the thread name
+        summary = profiler.summary()
+        self.assertEqual(summary["frame"]["count"], 100)
+        self.assertEqual(summary["frame;physics"]["count"], 100)
+        self.assertEqual(len(profiler.collapsed_stacks().splitlines()), 2)
+
+    def test_optional_span(self):
+        """
+        Test the span helper with and without a profiler.
+        """
+        print("Testing optional spans...")
+        with span(None, "frame"):
+            pass
+        with span(self.profiler, "frame"):
+            pass
+        self.assertEqual(self.profiler.summary()["frame"]["count"], 1)
+
+    def test_engine_stages(self):
+        """
+        Test that the gaming engine reports a span for each stage of its loop.
+        """
+        print("Testing gaming engine spans...")
+        engine = GamingEngine(seed=1, render_backend=HeadlessRenderBackend(), span_profiler=self.profiler)
+        engine.update(max_steps=5, realtime=False)
+        summary = self.profiler.summary()
+        for path in ["frame", "frame;render", "frame;step;input", "frame;step;ai", "frame;step;physics"]:
+            self.assertIn(path, summary)
+        self.assertEqual(summary["frame;step"]["count"], 5)
+
+
+if __name__ == "__main__":
+    # Run all the tests
+    unittest.main()
@@ -0,0 +1,105 @@
+# test_shared_frames.py
+
+import multiprocessing
+import unittest
+import numpy as np
+from glide.glide_system import GlideSystem, PipelineStage
+from glide.shared_frames import SharedFrameRing, SharedFrameWriter, SharedFrameReader
+
+
+def make_frame(seed):
+    return np.full((48, 64), seed, dtype=np.uint8)
+
+
+def frame_sum(frame):
+    return int(frame.sum(dtype=np.int64))
+
+
+def read_in_child(ring, descriptor, results):
+    results.put(frame_sum(ring.view(descriptor)))
+    ring.release(descriptor)
+
+
+class TestSharedFrameRing(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a small shared frame ring.
+        This will be called before each test.
+        """
+        self.ring = SharedFrameRing(num_slots=2, slot_nbytes=48 * 64)
+
+    def test_write_view_release(self):
+        """
+        Test that a frame round-trips through shared memory and its slot is reused.
+        """
+        print("Testing shared frame round trip...")
+        frame = make_frame(7)
+        descriptor = self.ring.write(frame)
+        view = self.ring.view(descriptor)
+        np.testing.assert_array_equal(view, frame)
+        self.assertFalse(view.flags.writeable, "Views of shared frames should be read-only.")
+        self.assertEqual(self.ring.slots_in_use(), 1)
+        self.ring.release(descriptor)
+        self.assertEqual(self.ring.slots_in_use(), 0)
+        with self.assertRaises(ValueError):
+            self.ring.view(descriptor)  # Stale after release
+
+    def test_full_ring_blocks(self):
+        """
+        Test that writers wait for a free slot and oversize frames are rejected.
+        """
+        print("Testing shared frame ring back-pressure...")
+        first = self.ring.write(make_frame(1))
+        self.ring.write(make_frame(2))
+        with self.assertRaises(TimeoutError):
+            self.ring.write(make_frame(3), timeout=0.05)
+        self.ring.release(first)
+        self.assertEqual(self.ring.view(self.ring.write(make_frame(3)))[0, 0], 3)
+        with self.assertRaises(ValueError):
+            self.ring.write(np.zeros((49, 64), dtype=np.uint8))
+
+    def test_attach_in_spawned_process(self):
+        """
+        Test that a ring pickled into a spawned process maps the same shared memory.
+        """
+        print("Testing shared frame ring in a spawned process...")
+        context = multiprocessing.get_context('spawn')
+        ring = SharedFrameRing(num_slots=2, slot_nbytes=48 * 64, context=context)
+        try:
+            descriptor = ring.write(make_frame(3))
+            results = context.Queue()
+            process = context.Process(target=read_in_child, args=(ring, descriptor, results))
+            process.start()
+            self.assertEqual(results.get(timeout=30), 3 * 48 * 64)
+            process.join()
+            self.assertEqual(ring.slots_in_use(), 0, "The child should have released the slot.")
+        finally:
+            ring.close()
+
+    def test_pipeline_passes_descriptors(self):
+        """
+        Test that process-based pipeline stages exchange frames through the ring.
+        """
+        print("Testing shared frames in a process pipeline...")
+        stages = [
+            PipelineStage('scan', SharedFrameWriter(self.ring, make_frame)),
+            PipelineStage('process', SharedFrameReader(self.ring, frame_sum), workers=2)
+        ]
+        glide_system = GlideSystem(stages=stages, queue_size=4, executor='process')
+        results = glide_system.run(range(20))
+        self.assertEqual(sorted(results), [seed * 48 * 64 for seed in range(20)])
+        self.assertEqual(self.ring.slots_in_use(), 0, "Every slot should be released after the run.")
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        This will be called after each test.
+        """
+        print("Cleaning up after test...")
+        self.ring.close()
+
+
+if __name__ == "__main__":
+    # Run all the tests
+    unittest.main()
@@ -0,0 +1,116 @@
+# test_timeseries_store.py
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from glide.timeseries_store import TimeSeriesStore
+
+class TestTimeSeriesStore(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Set up a store holding 1000 rows, one per second, in chunks of 128 rows.
+        This will be called before each test.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = TimeSeriesStore(self.temp_dir, columns=['sales', 'trend'], chunk_size=128)
+        self.timestamps = np.arange(1000, dtype=float)
+        for start in range(0, 1000, 100):
+            block = self.timestamps[start:start + 100]
+            self.store.append(block, {'sales': block * 2, 'trend': np.ones(100)})
+
+    def test_chunks_and_reopen(self):
+        """
+        Test that full chunks reach disk and a reopened store sees every row.
+        """
+        print("Testing chunked storage...")
+        self.assertEqual(len(self.store.manifest["chunks"]), 7, "Full chunks should be written as they fill.")
+        self.assertEqual(len(self.store), 1000)
+        self.store.close()
+        reopened = TimeSeriesStore(self.temp_dir)
+        self.assertEqual(reopened.columns, ['sales', 'trend'])
+        self.assertEqual(len(reopened), 1000)
+        np.testing.assert_array_equal(reopened.query()['sales'], self.timestamps * 2)
+
+    def test_range_query(self):
+        """
+        Test that range queries span chunks and the in-memory buffer.
+        """
+        print("Testing range queries...")
+        rows = self.store.query(120, 950, columns=['sales'])
+        np.testing.assert_array_equal(rows['timestamp'], np.arange(120, 950))
+        np.testing.assert_array_equal(rows['sales'], np.arange(120, 950) * 2)
+        self.assertNotIn('trend', rows)
+        self.assertEqual(len(self.store.query(5000, 6000)['timestamp']), 0)
+
+    def test_rollup(self):
+        """
+        Test downsampled rollups with several aggregations.
+        """
+        print("Testing rollups...")
+        means = self.store.rollup(100, start=0, columns=['sales'])
+        np.testing.assert_array_equal(means['timestamp'], np.arange(0, 1000, 100))
+        np.testing.assert_allclose(means['sales'], np.arange(0, 1000, 100) * 2 + 99)
+        counts = self.store.rollup(300, start=0, aggregation="count")
+        np.testing.assert_array_equal(counts['trend'], [300, 300, 300, 100])
+        maxima = self.store.rollup(500, start=100, end=900, aggregation="max")
+        np.testing.assert_array_equal(maxima['sales'], [1198, 1798])
+        with self.assertRaises(ValueError):
+            self.store.rollup(10, aggregation="median")
+
+    def test_append_only(self):
+        """
+        Test that out-of-order timestamps and mismatched columns are rejected.
+        """
+        print("Testing append-only validation...")
+        with self.assertRaises(ValueError):
+            self.store.append([10.0], {'sales': [1.0], 'trend': [1.0]})
+        with self.assertRaises(ValueError):
+            self.store.append([2000.0], {'sales': [1.0]})
+
+    def test_rejected_append_leaves_store_unchanged(self):
+        """
+        Test that an append rejected for a short column buffers nothing.
+        """
+        print("Testing rejected appends...")
+        length, last_timestamp = len(self.store), self.store.last_timestamp
+        buffered_parts = [len(parts) for parts in self.store.buffer.values()]
+        with self.assertRaises(ValueError):
+            self.store.append([2000.0, 2001.0], {'sales': [1.0, 2.0], 'trend': [1.0]})
+        self.assertEqual(len(self.store), length)
+        self.assertEqual(self.store.last_timestamp, last_timestamp)
+        self.assertEqual([len(parts) for parts in self.store.buffer.values()], buffered_parts)
+
+        # The store still accepts valid rows and returns them aligned
+        self.store.append([2000.0], {'sales': [5.0], 'trend': [6.0]})
+        self.store.flush()
+        tail = self.store.query(999.0)
+        np.testing.assert_array_equal(tail['sales'], [1998.0, 5.0])
+        np.testing.assert_array_equal(tail['trend'], [1.0, 6.0])
+
+    def test_empty_append(self):
+        """
+        Test that appending no rows to a non-empty store is a no-op.
+        """
+        print("Testing empty appends...")
+        length, last_timestamp = len(self.store), self.store.last_timestamp
+        buffered_parts = [len(parts) for parts in self.store.buffer.values()]
+        self.store.append([], {'sales': [], 'trend': []})
+        self.assertEqual(len(self.store), length)
+        self.assertEqual(self.store.last_timestamp, last_timestamp)
+        self.assertEqual([len(parts) for parts in self.store.buffer.values()], buffered_parts)
+
+    def tearDown(self):
+        """
+        Clean up after each test.
+        This will be called after each test.
+        """
+        print("Cleaning up after test...")
+        self.store.chunk_cache = {}
+        shutil.rmtree(self.temp_dir)
+
+
+if __name__ == "__main__":
+    # Run all the tests
+    unittest.main()
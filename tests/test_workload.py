@@ -0,0 +1,85 @@
+# test_workload.py
+
+import unittest
+import numpy as np
+from glide.gaming_engine import INPUTS
+from glide.glide_system import GlideSystem, PipelineStage
+from glide.workload import (BurstRate, FrameSource, InputEventSource, RowSource, SensorSource,
+                            WorkloadGenerator)
+
+class TestWorkloadGenerator(unittest.TestCase):
+
+    def test_sources(self):
+        """
+        Test the shapes of every source and that equal seeds give equal streams.
+        """
+        print("Testing workload sources...")
+        rows = list(WorkloadGenerator(RowSource(num_features=4), rate=1000, seed=1, duration=1, realtime=False))
+        self.assertEqual(np.concatenate(rows).shape, (1000, 5))
+        again = list(WorkloadGenerator(RowSource(num_features=4), rate=1000, seed=1, duration=1, realtime=False))
+        np.testing.assert_array_equal(np.concatenate(rows), np.concatenate(again))
+
+        frames = FrameSource(height=48, width=64).generate(np.random.default_rng(0), 3)
+        self.assertEqual((frames.shape, frames.dtype), ((3, 48, 64), np.uint8))
+        sweeps = SensorSource(num_beams=36).generate(np.random.default_rng(0), 5)
+        self.assertEqual(sweeps["lidar"].shape, (5, 36))
+        self.assertTrue(np.all(sweeps["radar"] <= 100))
+        events = InputEventSource().generate(np.random.default_rng(0), 100)
+        self.assertTrue(set(events) <= set(INPUTS))
+
+    def test_repeated_passes(self):
+        """
+        Test that a second pass over the same generator replays the same stream for every source.
+        """
+        print("Testing repeated passes...")
+        for source in (RowSource(), FrameSource(height=16, width=32), InputEventSource()):
+            generator = WorkloadGenerator(source, rate=100, seed=3, tick=0.1, duration=0.5, realtime=False)
+            first, second = list(generator), list(generator)
+            self.assertEqual(len(first), len(second))
+            for batch, again in zip(first, second):
+                np.testing.assert_array_equal(batch, again)
+        generator = WorkloadGenerator(SensorSource(num_beams=36), rate=100, seed=3, tick=0.1, duration=0.5,
+                                      realtime=False)
+        first, second = list(generator), list(generator)
+        for batch, again in zip(first, second):
+            np.testing.assert_array_equal(batch["lidar"], again["lidar"])
+
+    def test_burst_rate(self):
+        """
+        Test that bursts multiply the number of items emitted while they last.
+        """
+        print("Testing burst patterns...")
+        generator = WorkloadGenerator(RowSource(), rate=BurstRate(100, burst_factor=4, period=1, burst_duration=0.25),
+                                      seed=0, tick=0.05, duration=2, realtime=False)
+        sizes = [len(batch) for batch in generator]
+        # 0.75 s at 100/s and 0.25 s at 400/s per period
+        self.assertEqual(sum(sizes), 350)
+        self.assertEqual(max(sizes), 20)
+        self.assertEqual(min(sizes), 5)
+        self.assertAlmostEqual(generator.report()["target_rate"], 175)
+
+    def test_realtime_rate(self):
+        """
+        Test that a paced stream reaches its target rate and reports it.
+        """
+        print("Testing paced rate...")
+        report = WorkloadGenerator(InputEventSource(), rate=2000, seed=0, duration=0.5).feed(lambda batch: None)
+        self.assertEqual(report["items"], 1000)
+        self.assertAlmostEqual(report["target_rate"], 2000)
+        self.assertGreater(report["achieved_ratio"], 0.9)
+        self.assertLess(report["achieved_ratio"], 1.1)
+
+    def test_feeds_pipeline(self):
+        """
+        Test the generator as the source of a Glide pipeline.
+        """
+        print("Testing pipeline feeding...")
+        generator = WorkloadGenerator(RowSource(), rate=10000, seed=0, max_items=5000, max_batch=100, realtime=False)
+        system = GlideSystem(stages=[PipelineStage("count", len)])
+        self.assertEqual(sum(system.run(generator)), 5000)
+        self.assertEqual(system.metrics()["count"]["items"], 50)
+        with self.assertRaises(ValueError):
+            WorkloadGenerator(RowSource(), rate=100)
+
+if __name__ == "__main__":
+    unittest.main()